@@ -17,20 +17,36 @@ def __():
 
     import prompt_library.common.llm_module as llm_module
     import prompt_library.common.prompt_library_module as prompt_library_module
+    import prompt_library.common.rankings_store as rankings_store
 
-    return json, llm_module, mo, prompt_library_module, pyperclip
+    from prompt_library.common.execution_log import get_default_execution_log
+    from prompt_library.common.response_cache import SQLiteResponseCache
+
+    # Shared across runs: unchanged (prompt, model, temperature) triples are answered from disk
+    response_cache = SQLiteResponseCache()
+    return (
+        SQLiteResponseCache,
+        get_default_execution_log,
+        json,
+        llm_module,
+        mo,
+        prompt_library_module,
+        pyperclip,
+        rankings_store,
+        response_cache,
+    )
 
 
 @app.cell
 def __(prompt_library_module):
-    map_testable_prompts: dict = prompt_library_module.pull_in_testable_prompts()
+    map_testable_prompts = prompt_library_module.index_testable_prompts(watch=True)
     return (map_testable_prompts,)
 
 
 @app.cell
 def __(llm_module):
-    llm_o1_mini, llm_o1_preview = llm_module.build_o1_series()
-    llm_gpt_4o_latest, llm_gpt_4o_mini = llm_module.build_openai_latest_and_fastest()
+    llm_o1_mini, llm_o1_preview = llm_module.build_stack("o1_series")
+    llm_gpt_4o_latest, llm_gpt_4o_mini = llm_module.build_stack("openai_latest_and_fastest")
     # llm_sonnet = llm_module.build_sonnet_3_5()
     # gemini_1_5_pro, gemini_1_5_flash = llm_module.build_gemini_duo()
     # gemini_1_5_pro_2, gemini_1_5_flash_2 = llm_module.build_gemini_1_2_002()
@@ -131,65 +147,94 @@ def __(form, map_testable_prompts, mo, prompt_style):
 
 
 @app.cell
-def __(form, llm_module, map_testable_prompts, mo, prompt_library_module):
+def __(
+    form,
+    get_default_execution_log,
+    llm_module,
+    map_testable_prompts,
+    mo,
+    prompt_library_module,
+    response_cache,
+):
     mo.stop(not form.value, "")
 
-    all_prompt_responses = []
+    selected_prompt_names = form.value["prompts"]
+    selected_models = form.value["models"]
+    selected_prompts = [map_testable_prompts[name] for name in selected_prompt_names]
 
-    total_executions = len(form.value["prompts"]) * len(form.value["models"])
+    total_executions = len(selected_prompts) * len(selected_models)
 
     with mo.status.progress_bar(
         title="Running prompts on selected models...",
         total=total_executions,
         remove_on_exit=True,
     ) as prog_bar:
-        for selected_prompt_name in form.value["prompts"]:
-            selected_prompt = map_testable_prompts[selected_prompt_name]
-            prompt_responses = []
-
-            for model in form.value["models"]:
-                model_name = model.model_id
-                prog_bar.update(
-                    title=f"Prompting '{model_name}' with '{selected_prompt_name}'",
-                    increment=1,
-                )
-                raw_prompt_response = llm_module.prompt_with_temp(model, selected_prompt, form.value["temp"])
-                prompt_responses.append({
-                    "model_id": model_name,
-                    "model": model,
-                    "output": raw_prompt_response,
-                })
-
-            # Create a new list without the 'model' key for each response
-            list_model_execution_dict = [
-                {k: v for k, v in response.items() if k != "model"} for response in prompt_responses
-            ]
-
-            # Record the execution
-            execution_filepath = prompt_library_module.record_llm_execution(
-                prompt=selected_prompt,
-                list_model_execution_dict=list_model_execution_dict,
-                prompt_template=selected_prompt_name,
+
+        def on_result(result):
+            prog_bar.update(
+                title=f"'{result.model_id}' answered '{selected_prompt_names[result.prompt_index]}'",
+                increment=1,
             )
-            print(f"Execution record saved to: {execution_filepath}")
 
-            all_prompt_responses.append({
-                "prompt_name": selected_prompt_name,
-                "prompt": selected_prompt,
-                "responses": prompt_responses,
-                "execution_filepath": execution_filepath,
-            })
+        # All (prompt, model) pairs run concurrently, bounded per provider
+        execution_results = llm_module.prompt_many(
+            selected_models,
+            selected_prompts,
+            temperature=form.value["temp"],
+            cache=response_cache,
+            on_result=on_result,
+        )
+
+    # Results are ordered by prompt, then by model
+    execution_log = get_default_execution_log()
+    all_prompt_responses = []
+    for prompt_index, selected_prompt_name in enumerate(selected_prompt_names):
+        prompt_results = execution_results[
+            prompt_index * len(selected_models) : (prompt_index + 1) * len(selected_models)
+        ]
+        list_model_execution_dict = [
+            {
+                "model_id": result.model_id,
+                "output": result.output if result.error is None else f"Error: {result.error}",
+                "duration_seconds": result.duration_seconds,
+                **({"error": result.error} if result.error else {}),
+            }
+            for result in prompt_results
+        ]
+        execution_id = prompt_library_module.record_llm_execution(
+            prompt=selected_prompts[prompt_index],
+            list_model_execution_dict=list_model_execution_dict,
+            prompt_template=selected_prompt_name,
+            store=execution_log,
+        )
+
+        all_prompt_responses.append({
+            "prompt_name": selected_prompt_name,
+            "prompt": selected_prompts[prompt_index],
+            "responses": [
+                {**response, "model": selected_models[result.model_index]}
+                for response, result in zip(list_model_execution_dict, prompt_results, strict=True)
+            ],
+            "execution_id": execution_id,
+        })
+
+    # Write every execution of this run in one batch
+    execution_log.flush()
+    print(f"Recorded {len(all_prompt_responses)} execution(s) to {execution_log.directory}")
     return (
         all_prompt_responses,
-        execution_filepath,
+        execution_id,
+        execution_log,
+        execution_results,
         list_model_execution_dict,
-        model,
-        model_name,
+        on_result,
         prog_bar,
-        prompt_responses,
-        raw_prompt_response,
-        selected_prompt,
+        prompt_index,
+        prompt_results,
+        selected_models,
         selected_prompt_name,
+        selected_prompt_names,
+        selected_prompts,
         total_executions,
     )
 
@@ -311,10 +356,10 @@ def __(all_prompt_responses, copy_to_clipboard, form, mo):
 
 @app.cell
 def __(
+    all_prompt_responses,
     copy_to_clipboard,
-    get_rankings,
     mo,
-    prompt_library_module,
+    rankings_store,
     results_table,
     score_button,
     set_rankings,
@@ -326,18 +371,17 @@ def __(
     combined_output = "\n\n".join(outputs)
 
     if score_button.value:
-        # Increment scores for selected models
-        current_rankings = get_rankings()
-        for row in selected_rows:
-            model_id = row["Model"]
-            for ranking in current_rankings:
-                if ranking.llm_model_id == model_id:
-                    ranking.score += 1
-                    break
-
-        # Save updated rankings
-        set_rankings(current_rankings)
-        prompt_library_module.save_rankings(current_rankings)
+        # One ballot per prompt run and submission: the selected models beat the other models shown for that prompt
+        store = rankings_store.get_rankings_store()
+        for voted_prompt in all_prompt_responses:
+            winners = [row["Model"] for row in selected_rows if row["Prompt"] == voted_prompt["prompt_name"]]
+            if winners:
+                current_rankings = store.record_vote(
+                    winners,
+                    ballot_id=rankings_store.new_ballot_id(voted_prompt["execution_id"]),
+                    shown=[response["model_id"] for response in voted_prompt["responses"]],
+                )
+        set_rankings(store.rankings())
 
         mo.md(f"Scored {len(selected_rows)} model(s)")
     else:
@@ -346,16 +390,16 @@ def __(
     return (
         combined_output,
         current_rankings,
-        model_id,
         outputs,
-        ranking,
-        row,
         selected_rows,
+        store,
+        voted_prompt,
+        winners,
     )
 
 
 @app.cell
-def __(all_prompt_responses, form, mo, prompt_library_module):
+def __(all_prompt_responses, form, mo, rankings_store):
     mo.stop(not form.value, mo.md(""))
     mo.stop(not all_prompt_responses, mo.md(""))
 
@@ -364,7 +408,7 @@ def __(all_prompt_responses, form, mo, prompt_library_module):
     load_ranking_button = mo.ui.run_button(label="🔐 Load Rankings")
 
     # Load existing rankings
-    get_rankings, set_rankings = mo.state(prompt_library_module.get_rankings())
+    get_rankings, set_rankings = mo.state(rankings_store.get_rankings_store().rankings())
 
     mo.hstack(
         [
@@ -391,25 +435,26 @@ def __():
 def __(
     form,
     mo,
-    prompt_library_module,
+    rankings_store,
     reset_ranking_button,
     set_rankings,
 ):
     mo.stop(not form.value, mo.md(""))
     mo.stop(not reset_ranking_button.value, mo.md(""))
 
-    set_rankings(prompt_library_module.reset_rankings([model.model_id for model in form.value["models"]]))
+    # Starts a new round, the vote history is kept
+    set_rankings(rankings_store.get_rankings_store().reset([model.model_id for model in form.value["models"]]))
 
     # mo.md("Rankings reset successfully")
     return
 
 
 @app.cell
-def __(form, load_ranking_button, mo, prompt_library_module, set_rankings):
+def __(form, load_ranking_button, mo, rankings_store, set_rankings):
     mo.stop(not form.value, mo.md(""))
     mo.stop(not load_ranking_button.value, mo.md(""))
 
-    set_rankings(prompt_library_module.get_rankings())
+    set_rankings(rankings_store.get_rankings_store().rankings())
     return
 
 
@@ -451,5 +496,29 @@ def __(get_rankings, mo):
     )
 
 
+@app.cell
+def __(get_rankings, mo, rankings_store):
+    import prompt_library.common.ratings as ratings
+
+    # Refit on every vote (get_rankings changes), Bradley-Terry accounts for which models were shown
+    get_rankings()
+    model_ratings = ratings.fit_ratings(rankings_store.get_rankings_store().votes())
+    mo.ui.table(
+        data=[
+            {
+                "Model": rating.model_id,
+                "Rating": round(rating.rating),
+                "95% CI": f"{round(rating.lower)} - {round(rating.upper)}",
+                "Wins": rating.wins,
+                "Comparisons": rating.comparisons,
+            }
+            for rating in model_ratings
+        ],
+        selection=None,
+        label="Model Ratings (Bradley-Terry)",
+    )
+    return model_ratings, ratings
+
+
 if __name__ == "__main__":
     app.run()
@@ -38,8 +38,8 @@ def __(llm_module: Any) -> tuple[Any, Any, Any, Any, dict[str, Any]]:
     Returns:
         Tuple[Any, Any, Any, Any, Dict[str, Any]]: Tuple containing initialized LLM models and a models dictionary.
     """
-    llm_o1_mini, llm_o1_preview = llm_module.build_o1_series()
-    llm_gpt_4o_latest, llm_gpt_4o_mini = llm_module.build_openai_latest_and_fastest()
+    llm_o1_mini, llm_o1_preview = llm_module.build_stack("o1_series")
+    llm_gpt_4o_latest, llm_gpt_4o_mini = llm_module.build_stack("openai_latest_and_fastest")
     # llm_sonnet = llm_module.build_sonnet_3_5()
     # gemini_1_5_pro, gemini_1_5_flash = llm_module.build_gemini_duo()
     # gemini_1_5_pro_2, gemini_1_5_flash_2 = llm_module.build_gemini_1_2_002()
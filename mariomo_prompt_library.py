@@ -14,21 +14,21 @@ def __():
 
     import marimo as mo
 
-    from prompt_library.common import llm_module, prompt_library_module
+    from prompt_library.common import llm_module, prompt_library_module, prompt_search
 
-    return llm_module, mo, prompt_library_module, re
+    return llm_module, mo, prompt_library_module, prompt_search, re
 
 
 @app.cell
 def __(prompt_library_module):
-    map_prompt_library: dict = prompt_library_module.pull_in_prompt_library()
+    map_prompt_library = prompt_library_module.index_prompt_library(watch=True)
     return (map_prompt_library,)
 
 
 @app.cell
 def __(llm_module):
-    llm_o1_mini, llm_o1_preview = llm_module.build_o1_series()
-    llm_gpt_4o_latest, llm_gpt_4o_mini = llm_module.build_openai_latest_and_fastest()
+    llm_o1_mini, llm_o1_preview = llm_module.build_stack("o1_series")
+    llm_gpt_4o_latest, llm_gpt_4o_mini = llm_module.build_stack("openai_latest_and_fastest")
     # llm_sonnet = llm_module.build_sonnet_3_5()
     # gemini_1_5_pro, gemini_1_5_flash = llm_module.build_gemini_duo()
 
@@ -57,8 +57,18 @@ def __():
 
 
 @app.cell
-def __(map_prompt_library, mo, models):
-    prompt_keys = list(map_prompt_library.keys())
+def __(mo):
+    prompt_search_box = mo.ui.text(label="Search prompts", placeholder="e.g. backstory helldivers", full_width=True)
+    prompt_search_box
+    return (prompt_search_box,)
+
+
+@app.cell
+def __(map_prompt_library, mo, models, prompt_search, prompt_search_box):
+    if prompt_search_box.value.strip():
+        prompt_keys = [result.path for result in prompt_search.search_prompt_library(prompt_search_box.value, limit=50)]
+    else:
+        prompt_keys = list(map_prompt_library.keys())
     prompt_dropdown = mo.ui.dropdown(
         options=prompt_keys,
         label="Select a Prompt",
@@ -3,28 +3,27 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import inspect
 import logging
+import os
+import threading
 
 from collections.abc import Awaitable, Callable, Coroutine, Iterable, Sequence
+from dataclasses import dataclass
 from functools import partial, wraps
 from typing import Any, Dict, List, Optional, ParamSpec, Set, Tuple, Type, TypeVar, Union, cast
 
-import anyio
-import asyncer
 import rich
 import typer
 
 from loguru import logger
-from rich.pretty import pprint
 from typer import Typer
 from typer.core import TyperCommand, TyperGroup
 from typer.models import CommandFunctionType
 
 import prompt_library
 
-from prompt_library.bot_logger import get_logger
-
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -32,6 +31,178 @@ R = TypeVar("R")
 
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Set to "0" to run async commands on the default asyncio loop even when uvloop is installed
+USE_UVLOOP = os.getenv("PROMPT_LIBRARY_UVLOOP", "1") != "0"
+# Set to run async commands in asyncio debug mode, which reports every slow callback with its source
+ASYNCIO_DEBUG = bool(os.getenv("PROMPT_LIBRARY_ASYNCIO_DEBUG"))
+# Seconds a callback may block the event loop before it is reported, 0 disables the lag monitor
+SLOW_CALLBACK_DURATION = float(os.getenv("PROMPT_LIBRARY_SLOW_CALLBACK_DURATION", "0.1"))
+
+
+@dataclass
+class LoopStats:
+    """Instrumentation of the event loop of a CommandRunner.
+
+    Attributes:
+        commands: Number of coroutines run.
+        stalls: Number of times the loop was blocked for longer than the slow callback duration.
+        max_lag: Longest time the loop was blocked, in seconds.
+    """
+
+    commands: int = 0
+    stalls: int = 0
+    max_lag: float = 0.0
+
+
+class CommandRunner:
+    """Run the coroutines of async commands on one event loop reused across commands.
+
+    From synchronous code, e.g. the CLI, coroutines run on an asyncio.Runner kept for the lifetime of the
+    runner, so chained commands share the loop and everything bound to it (HTTP clients, semaphores).
+    When a loop is already running in the calling thread, e.g. in a notebook, the coroutine runs on a
+    background thread with its own long-lived loop and the call blocks until it completes.
+
+    While a coroutine runs, a monitor task measures how late the loop wakes it up and logs a warning when
+    a callback blocked the loop for longer than `slow_callback_duration`. In debug mode asyncio itself
+    reports each slow callback with its source; debug mode always uses the default asyncio loop.
+
+    Args:
+        use_uvloop: Use uvloop when it is installed. Defaults to USE_UVLOOP.
+        debug: Run the loop in asyncio debug mode. Defaults to ASYNCIO_DEBUG.
+        slow_callback_duration: Seconds a callback may block the loop before it is reported, 0 disables
+            the lag monitor. Defaults to SLOW_CALLBACK_DURATION.
+    """
+
+    def __init__(
+        self,
+        use_uvloop: bool = USE_UVLOOP,
+        debug: bool = ASYNCIO_DEBUG,
+        slow_callback_duration: float = SLOW_CALLBACK_DURATION,
+    ) -> None:
+        self.use_uvloop = use_uvloop
+        self.debug = debug
+        self.slow_callback_duration = slow_callback_duration
+        self.stats = LoopStats()
+        self._runner: asyncio.Runner | None = None
+        # Held for the whole run of a coroutine on the runner; the background loop has its own lock, so a
+        # nested or concurrent run falling back to it never waits for the runner
+        self._runner_lock = threading.Lock()
+        self._background_lock = threading.Lock()
+        self._background_loop: asyncio.AbstractEventLoop | None = None
+        self._background_thread: threading.Thread | None = None
+
+    def _loop_factory(self) -> Callable[[], asyncio.AbstractEventLoop] | None:
+        if self.use_uvloop and not self.debug:
+            try:
+                import uvloop
+            except ImportError:
+                return None
+            return uvloop.new_event_loop
+        return None
+
+    def _configure(self, loop: asyncio.AbstractEventLoop) -> asyncio.AbstractEventLoop:
+        if self.debug:
+            loop.set_debug(True)
+            if self.slow_callback_duration > 0:
+                loop.slow_callback_duration = self.slow_callback_duration
+        return loop
+
+    async def _monitor_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.slow_callback_duration / 2
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = loop.time() - expected
+            self.stats.max_lag = max(self.stats.max_lag, lag)
+            if lag >= self.slow_callback_duration:
+                self.stats.stalls += 1
+                logger.warning(f"Event loop blocked for {lag:.3f}s, a callback is doing blocking work")
+
+    async def _instrumented(self, coro: Awaitable[R]) -> R:
+        self.stats.commands += 1
+        if self.slow_callback_duration <= 0:
+            return await coro
+        monitor = asyncio.create_task(self._monitor_lag())
+        try:
+            return await coro
+        finally:
+            monitor.cancel()
+
+    def _get_background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._background_lock:
+            if self._background_loop is None:
+                factory = self._loop_factory() or asyncio.new_event_loop
+                loop = self._background_loop = self._configure(factory())
+                self._background_thread = threading.Thread(
+                    target=loop.run_forever, name="prompt_library-command-loop", daemon=True
+                )
+                self._background_thread.start()
+            return self._background_loop
+
+    def run(self, coro: Coroutine[Any, Any, R]) -> R:
+        """Run a coroutine to completion and return its result.
+
+        Args:
+            coro: The coroutine of an async command.
+
+        Returns:
+            The result of the coroutine.
+
+        Raises:
+            RuntimeError: If called from a coroutine running on the background loop of this runner, which
+                would wait on itself; await the coroutine instead.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is None and self._runner_lock.acquire(blocking=False):
+            try:
+                if self._runner is None:
+                    self._runner = asyncio.Runner(debug=self.debug, loop_factory=self._loop_factory())
+                self._configure(self._runner.get_loop())
+                return self._runner.run(self._instrumented(coro))
+            finally:
+                self._runner_lock.release()
+
+        # A loop is running in this thread, or another thread is using the runner
+        if running_loop is not None and running_loop is self._background_loop:
+            coro.close()
+            raise RuntimeError("Cannot block on an async command from the command loop, await it instead")
+        future = asyncio.run_coroutine_threadsafe(self._instrumented(coro), self._get_background_loop())
+        return future.result()
+
+    def close(self) -> None:
+        """Close the event loops, cancelling any task still pending."""
+        with self._runner_lock:
+            if self._runner is not None:
+                self._runner.close()
+                self._runner = None
+        with self._background_lock:
+            if self._background_loop is not None:
+                loop, thread = self._background_loop, self._background_thread
+                self._background_loop = self._background_thread = None
+                loop.call_soon_threadsafe(loop.stop)
+                if thread is not None:
+                    thread.join()
+                loop.close()
+
+
+_command_runner: CommandRunner | None = None
+_command_runner_lock = threading.Lock()
+
+
+def get_command_runner() -> CommandRunner:
+    """Return the process-wide runner shared by every async command."""
+    global _command_runner
+    with _command_runner_lock:
+        if _command_runner is None:
+            _command_runner = CommandRunner()
+            atexit.register(_command_runner.close)
+        return _command_runner
+
 
 class AsyncTyperImproved(Typer):
     @staticmethod
@@ -41,16 +212,9 @@ class AsyncTyperImproved(Typer):
     ) -> CommandFunctionType:
         if inspect.iscoroutinefunction(f):
 
-            @wraps(f)
-            async def async_runner(*args: Any, **kwargs: Any) -> Any:
-                return await f(*args, **kwargs)
-
             @wraps(f)
             def sync_runner(*args: Any, **kwargs: Any) -> Any:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    return async_runner(*args, **kwargs)
-                return loop.run_until_complete(async_runner(*args, **kwargs))
+                return get_command_runner().run(f(*args, **kwargs))
 
             return decorator(cast(CommandFunctionType, sync_runner))
         return decorator(f)
@@ -153,7 +317,7 @@ class AsyncTyper(Typer):
 
             @wraps(f)
             def runner(*args: Any, **kwargs: Any) -> Any:
-                return asyncer.runnify(f)(*args, **kwargs)
+                return get_command_runner().run(f(*args, **kwargs))
 
             decorator(runner)
         else:
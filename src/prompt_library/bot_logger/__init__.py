@@ -7,8 +7,11 @@ This module provides functions and utilities for configuring and managing loggin
 It includes functions for setting up the global logger, handling exceptions, and filtering log messages.
 
 Functions:
-    global_log_config(log_level: LOG_LEVEL, json: bool = False) -> None:
-        Configure the global logger with the specified log level and format.
+    global_log_config(log_level: LOG_LEVEL, json: bool = False, production: bool | None = None) -> None:
+        Configure the global logger with the specified log level, format and profile.
+
+    serialize_record(record: Record) -> str:
+        Serialize a log record to a JSON line, with orjson when it is installed.
 
     get_logger(name: str = "prompt_library") -> Logger:
         Get a logger instance with the specified name.
@@ -41,6 +44,9 @@ Constants:
 Classes:
     Pii(str):
         A custom string class that masks sensitive data in logs based on the log_pii setting.
+
+    BatchingSink:
+        A loguru sink writing messages in batches from a background thread, dropping them when its queue is full.
 """
 # pylint: disable=no-member
 # pylint: disable=consider-using-tuple
@@ -65,13 +71,18 @@ import contextvars
 import functools
 import gc
 import inspect
+import json
 import logging
 import os
+import queue
 import re
 import sys
+import threading
 import time
+import traceback
 
-from datetime import UTC, datetime, timezone
+from datetime import UTC, date, datetime, timezone
+from datetime import time as dt_time
 from logging import Logger, LogRecord
 from pathlib import Path
 from pprint import pformat
@@ -81,20 +92,24 @@ from types import FrameType
 from typing import TYPE_CHECKING, Any, Deque, Dict, Literal, Optional, Union, cast
 
 import loguru
-import pysnooper
-import vcr
 
 from loguru import logger
 from loguru._defaults import LOGURU_FORMAT
-from tqdm import tqdm
 
-from prompt_library.models.loggers import LoggerModel, LoggerPatch
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 
 if TYPE_CHECKING:
     from better_exceptions.log import BetExcLogger
+    from loguru import Message, Record
     from loguru._logger import Logger as _Logger
 
+    from prompt_library.models.loggers import LoggerModel
+
 
 LOGLEVEL_MAPPING = {
     50: "CRITICAL",
@@ -140,6 +155,11 @@ NEW_LOGGER_FORMAT = (
 )
 
 
+# "production" logs through a BatchingSink without variable values in tracebacks, see global_log_config
+LOG_PROFILE = os.getenv("LOG_PROFILE", "development")
+# Messages the production sink may hold before it starts dropping them
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
 LOG_LEVEL = Literal[
     "TRACE",
     "DEBUG",
@@ -220,21 +240,23 @@ def _log_warning(exc: BaseException, dev_mode: bool = False) -> None:
         logger.warning(exc)
 
 
-def filter_out_serialization_errors(record: dict[str, Any]):
-    # Patterns to match the log messages you want to filter out
-    patterns = [
+# Patterns to match the log messages you want to filter out, combined so each record is searched once
+SERIALIZATION_ERROR_PATTERN = re.compile(
+    "|".join([
         r"Orjson serialization failed:",
         r"Failed to serialize .* to JSON:",
         r"Object of type .* is not JSON serializable",
         # Failed to deepcopy input: TypeError("cannot pickle '_thread.RLock' object") | {}
-        r".*Failed to deepcopy input:.*",
-        r".*logging:callHandlers.*",
-    ]
+        r"Failed to deepcopy input:",
+        r"logging:callHandlers",
+    ])
+)
+
 
+def filter_out_serialization_errors(record: dict[str, Any]):
     # Check if the log message matches any of the patterns
-    for pattern in patterns:
-        if re.search(pattern, record["message"]):
-            return False  # Filter out this message
+    if SERIALIZATION_ERROR_PATTERN.search(record["message"]):
+        return False  # Filter out this message
 
     return True  # Keep all other messages
 
@@ -293,6 +315,8 @@ class TqdmOutputStream:
         Args:
             string (str): The string to write.
         """
+        from tqdm import tqdm
+
         tqdm.write(string, file=sys.stderr, end="")
 
     def isatty(self) -> bool:
@@ -627,16 +651,167 @@ def logger_wraps(*, entry=True, exit=True, level="DEBUG"):
     return wrapper
 
 
+def _json_default(value: Any) -> str:
+    # Same output as orjson for the types it handles natively, str for anything else
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _json_dumps(data: dict[str, Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # e.g. integers over 64 bits, let the standard library handle them
+            pass
+    return json.dumps(data, default=_json_default)
+
+
+def serialize_record(record: Record) -> str:
+    """Serialize a log record to a single JSON line, with orjson when it is installed.
+
+    Bound extras are serialized as they are, objects that are not JSON types are converted with str.
+
+    Args:
+        record: The log record.
+
+    Returns:
+        The JSON line, newline terminated.
+    """
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "process": record["process"].id,
+        "thread": record["thread"].name,
+        "extra": record["extra"],
+    }
+    exception = record["exception"]
+    if exception is not None:
+        data["exception"] = "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+    return _json_dumps(data) + "\n"
+
+
+def _message_only(record: Record) -> str:
+    # A callable format stops loguru from formatting the exception, serialize_record does it
+    return "{message}"
+
+
+class BatchingSink:
+    """Loguru sink writing messages from a background thread, in batches.
+
+    Logging calls only format the message and put it on a bounded queue. A writer thread takes everything
+    queued so far and writes it with a single call, so under load many messages share one write and
+    flush. When the queue is full the message is dropped and counted instead of blocking the caller.
+
+    Loguru flushes stream sinks after every message, so the sink deliberately has no `flush` method; use
+    `drain` to wait until everything queued is written.
+
+    Args:
+        stream: The stream to write to. Defaults to sys.stdout.
+        max_queue_size: Maximum number of messages waiting to be written. Defaults to LOG_QUEUE_SIZE.
+        batch_size: Maximum number of messages per write. Defaults to 1000.
+        serializer: Turns the record of a message into the written line, e.g. serialize_record. Defaults
+            to writing the message as formatted by loguru.
+
+    Example:
+        >>> sink = BatchingSink(serializer=serialize_record)
+        >>> logger.add(sink, format=_message_only, level="INFO")
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream: Any = None,
+        max_queue_size: int | None = None,
+        batch_size: int = 1000,
+        serializer: Any = None,
+    ) -> None:
+        self._stream = stream or sys.stdout
+        self._queue: queue.Queue[Any] = queue.Queue(max_queue_size or LOG_QUEUE_SIZE)
+        self._batch_size = batch_size
+        self._serializer = serializer
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="prompt_library-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: Message) -> None:
+        """Queue a message, dropping it if the queue is full."""
+        line = self._serializer(message.record) if self._serializer is not None else str(message)
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [line for line in batch if line is not self._STOP]
+            try:
+                if lines:
+                    self._stream.write("".join(lines))
+                    self._stream.flush()
+                    self.written += len(lines)
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"Failed to write {len(lines)} log messages: {e!r}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(lines) < len(batch):
+                return
+
+    def drain(self) -> None:
+        """Wait until every queued message is written."""
+        self._queue.join()
+
+    def stop(self) -> None:
+        """Write the queued messages and stop the writer thread, called by loguru when the sink is removed."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+        if self.dropped:
+            self._stream.write(f"prompt_library: dropped {self.dropped} log messages, the log queue was full\n")
+            self._stream.flush()
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of messages written, dropped and waiting in the queue."""
+        return {"written": self.written, "dropped": self.dropped, "queued": self._queue.qsize()}
+
+
 # @pysnooper.snoop()
 # @pysnooper.snoop(thread_info=True)
 # FIXME: https://github.com/abnerjacobsen/fastapi-mvc-loguru-demo/blob/main/mvc_demo/core/loguru_logs.py
 # SOURCE: https://loguru.readthedocs.io/en/stable/api/logger.html#loguru._logger.Logger
-def global_log_config(log_level: str | int = logging.DEBUG, json: bool = False) -> _Logger:
+def global_log_config(
+    log_level: str | int = logging.DEBUG, json: bool = False, production: bool | None = None
+) -> _Logger:
     """Configure global logging settings.
 
+    The development profile pretty-prints bound payloads and shows variable values in tracebacks. The
+    production profile writes through a BatchingSink so logging calls never wait on I/O, skips the
+    tracebacks' variable values and renders payloads on one line.
+
+    In both profiles records below `log_level` are discarded before any formatting, so pass arguments
+    lazily (`logger.debug("Read {}", path)` rather than an f-string) on hot paths.
+
     Args:
         log_level: The log level to use. Defaults to logging.DEBUG.
         json: Whether to format logs as JSON. Defaults to False.
+        production: Use the production profile. Defaults to the LOG_PROFILE environment variable.
 
     Returns:
         The configured logger instance.
@@ -651,8 +826,10 @@ def global_log_config(log_level: str | int = logging.DEBUG, json: bool = False)
     global _old_log_dir, _old_console_log_level, _old_backup_count
     # SOURCE: https://github.com/acgnhiki/blrec/blob/975fa2794a3843a883597acd5915a749a4e196c8/src/blrec/logging/configure_logging.py#L21
 
-    if isinstance(log_level, str) and (log_level in logging._nameToLevel):
-        log_level = logging.DEBUG
+    if isinstance(log_level, str):
+        log_level = logging._nameToLevel.get(log_level.upper(), logging.DEBUG)
+    if production is None:
+        production = LOG_PROFILE == "production"
 
     # NOTE: Original
     intercept_handler = InterceptHandler()
@@ -693,27 +870,41 @@ def global_log_config(log_level: str | int = logging.DEBUG, json: bool = False)
             seen.add(name.split(".")[0])
             logging.getLogger(name).handlers = [intercept_handler]
 
+    if production:
+        handler = {
+            "sink": BatchingSink(stdout, serializer=serialize_record if json else None),
+            # A plain format string: payloads are rendered on one line with the rest of {extra}
+            "format": _message_only if json else NEW_LOGGER_FORMAT,
+            "diagnose": False,
+            "backtrace": False,
+            "catch": True,
+            "filter": filter_out_serialization_errors,
+            "level": log_level,
+        }
+    else:
+        handler = {
+            # sink (file-like object, str, pathlib.Path, callable, coroutine function or logging.Handler) - An object in charge of receiving formatted logging messages and propagating them to an appropriate endpoint.
+            "sink": stdout,
+            # serialize (bool, optional) - Whether the logged message and its records should be first converted to a JSON string before being sent to the sink.
+            "serialize": json,
+            # format (str or callable, optional) - The template used to format logged messages before being sent to the sink. If a callable is passed, it should take a logging.Record as its first argument and return a string.
+            "format": format_record,
+            # diagnose (bool, optional) - Whether the exception trace should display the variables values to eases the debugging. This should be set to False in production to avoid leaking sensitive
+            "diagnose": True,
+            # backtrace (bool, optional) - Whether the exception trace formatted should be extended upward, beyond the catching point, to show the full stacktrace which generated the error.
+            "backtrace": True,
+            # enqueue (bool, optional) - Whether the messages to be logged should first pass through a multiprocessing-safe queue before reaching the sink. This is useful while logging to a file through multiple processes. This also has the advantage of making logging calls non-blocking.
+            "enqueue": True,
+            # catch (bool, optional) - Whether errors occurring while sink handles logs messages should be automatically caught. If True, an exception message is displayed on sys.stderr but the exception is not propagated to the caller, preventing your app to crash.
+            "catch": True,
+            # filter (callable, optional) - A callable that takes a record and returns a boolean. If the callable returns False, the record is filtered out.
+            "filter": filter_out_serialization_errors,
+            # level (int or str, optional) - The minimum severity level from which logged messages should be sent to the sink.
+            "level": log_level,
+        }
+
     logger.configure(
-        handlers=[
-            {
-                # sink (file-like object, str, pathlib.Path, callable, coroutine function or logging.Handler) - An object in charge of receiving formatted logging messages and propagating them to an appropriate endpoint.
-                "sink": stdout,
-                # serialize (bool, optional) - Whether the logged message and its records should be first converted to a JSON string before being sent to the sink.
-                "serialize": False,
-                # format (str or callable, optional) - The template used to format logged messages before being sent to the sink. If a callable is passed, it should take a logging.Record as its first argument and return a string.
-                "format": format_record,
-                # diagnose (bool, optional) - Whether the exception trace should display the variables values to eases the debugging. This should be set to False in production to avoid leaking sensitive
-                "diagnose": True,
-                # backtrace (bool, optional) - Whether the exception trace formatted should be extended upward, beyond the catching point, to show the full stacktrace which generated the error.
-                "backtrace": True,
-                # enqueue (bool, optional) - Whether the messages to be logged should first pass through a multiprocessing-safe queue before reaching the sink. This is useful while logging to a file through multiple processes. This also has the advantage of making logging calls non-blocking.
-                "enqueue": True,
-                # catch (bool, optional) - Whether errors occurring while sink handles logs messages should be automatically caught. If True, an exception message is displayed on sys.stderr but the exception is not propagated to the caller, preventing your app to crash.
-                "catch": True,
-                # filter (callable, optional) - A callable that takes a record and returns a boolean. If the callable returns False, the record is filtered out.
-                "filter": filter_out_serialization_errors,
-            }
-        ],
+        handlers=[handler],
         # extra={"request_id": REQUEST_ID_CONTEXTVAR.get()},
     )
 
@@ -772,6 +963,8 @@ def generate_tree() -> LoggerModel:
     Returns:
         The root logger model of the generated tree.
     """
+    from prompt_library.models.loggers import LoggerModel
+
     rootm = LoggerModel(name="root", level=logging.getLogger().getEffectiveLevel(), children=[])
     nodesm: dict[str, LoggerModel] = {}
     items = sorted(logging.root.manager.loggerDict.items())  # type: ignore
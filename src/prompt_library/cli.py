@@ -7,65 +7,41 @@
 # SOURCE: https://github.com/tiangolo/typer/issues/88#issuecomment-1732469681
 from __future__ import annotations
 
-import asyncio
-import importlib.util
-import inspect
-import json
 import logging
 import os
 import signal
-import subprocess
 import sys
-import tempfile
-import traceback
-import typing
 
-from collections.abc import Awaitable, Iterable, Sequence
 from enum import Enum
-from functools import partial, wraps
-from importlib import import_module, metadata
-from importlib.metadata import version as importlib_metadata_version
 from pathlib import Path
-from re import Pattern
-from typing import Annotated, Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
-from urllib.parse import urlparse
+from typing import Annotated, Optional
 
-import anyio
-import bpdb
+import click
 import rich
 import typer
 
-from langchain.globals import set_debug, set_verbose
-from langchain_chroma import Chroma as ChromaVectorStore
 from loguru import logger
-from rich import print as rich_print
-from rich import print_json
 from rich.console import Console
-from rich.pretty import pprint
-from rich.prompt import Prompt
-from rich.table import Table
-from typer import Typer
+from typer.core import TyperGroup
 
 import prompt_library
 
-from prompt_library.asynctyper import AsyncTyper, AsyncTyperImproved
-from prompt_library.bot_logger import get_logger, global_log_config
-from prompt_library.types import PathLike
+from prompt_library.asynctyper import AsyncTyperImproved
+from prompt_library.subcommand_manifest import SubcommandEntry, discover_subcommands
 
 
+# NOTE: Keep module level imports light, `prompt_library version` pays for every one of them.
+# Heavy dependencies (langchain, chromadb, ...) are imported inside the commands that use them,
+# tests/test_cli_import_time.py guards this.
+
 # # SOURCE: https://python.langchain.com/v0.2/docs/how_to/debugging/
 # if aiosettings.debug_langchain:
+#     from langchain.globals import set_debug, set_verbose
 #     # Setting the global debug flag will cause all LangChain components with callback support (chains, models, agents, tools, retrievers) to print the inputs they receive and outputs they generate. This is the most verbose setting and will fully log raw inputs and outputs.
 #     set_debug(True)
 #     # Setting the verbose flag will print out inputs and outputs in a slightly more readable format and will skip logging certain raw outputs (like the token usage stats for an LLM call) so that you can focus on application logic.
 #     set_verbose(True)
 
-# SOURCE: https://github.com/Delgan/loguru/blob/420704041797daf804b505e5220805528fe26408/docs/resources/recipes.rst#L1083
-global_log_config(
-    log_level=logging.getLevelName("DEBUG"),
-    json=False,
-)
-
 
 class ChromaChoices(str, Enum):
     load = "load"
@@ -73,42 +49,96 @@ class ChromaChoices(str, Enum):
     get_response = "get_response"
 
 
+# Subcommands known to the root command group, by name. Filled from the cached manifest on first use, only
+# the module of the subcommand being invoked is imported.
+_SUBCOMMANDS: Optional[dict[str, SubcommandEntry]] = None
+
+
+def get_subcommands(refresh: bool = False) -> dict[str, SubcommandEntry]:
+    """Return the lazily loaded subcommands, discovering them on first call.
+
+    Args:
+        refresh (bool, optional): Discover the subcommands again, ignoring the cached manifest.
+
+    Returns:
+        dict[str, SubcommandEntry]: Subcommands by name.
+    """
+    global _SUBCOMMANDS
+    if _SUBCOMMANDS is None or refresh:
+        _SUBCOMMANDS = discover_subcommands(refresh=refresh)
+    return _SUBCOMMANDS
+
+
+class LazySubcommandGroup(TyperGroup):
+    """Root command group resolving the subcommands of the manifest on first use.
+
+    The help listing is rendered from the manifest, only the subcommand being invoked is imported.
+    """
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        commands = super().list_commands(ctx)
+        return [*commands, *(name for name in get_subcommands() if name not in commands)]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        command = super().get_command(ctx, cmd_name)
+        entry = get_subcommands().get(cmd_name) if command is None else None
+        if entry is not None:
+            # Stand-in carrying the help of the listing, resolve_command swaps in the real group
+            command = click.Group(cmd_name, help=entry.help)
+        return command
+
+    def resolve_command(
+        self, ctx: click.Context, args: list[str]
+    ) -> tuple[Optional[str], Optional[click.Command], list[str]]:
+        if args and args[0] not in self.commands and args[0] in get_subcommands():
+            self.load_subcommand(get_subcommands()[args[0]])
+        return super().resolve_command(ctx, args)
+
+    def load_subcommand(self, entry: SubcommandEntry) -> click.Command:
+        """Import a subcommand of the manifest and register it on the group."""
+        logger.debug(f"Loading subcommand {entry.name} from {entry.module}")
+        command = typer.main.get_group(entry.load())
+        command.name = entry.name
+        self.add_command(command, entry.name)
+        return command
+
+
 # Load existing subcommands
-def load_commands(directory: str = "subcommands") -> None:
+def load_commands(directory: str = "subcommands", refresh: bool = False) -> None:
     """
     Load subcommands from the specified directory.
 
-    This function loads subcommands from the specified directory and adds them to the main Typer app.
-    It iterates over the files in the directory, imports the modules that end with "_cmd.py", and adds
-    their Typer app to the main app if they have one.
+    This function registers the "*_cmd.py" modules of the specified directory as subcommands of the main
+    Typer app. The modules are not imported here, they are listed from the cached subcommand manifest and
+    imported when their subcommand is invoked.
+
+    The subcommands shipped with prompt_library and entry point plugins are registered without calling
+    this function.
 
     Args:
         directory (str, optional): The directory to load subcommands from. Defaults to "subcommands".
+        refresh (bool, optional): Scan the directory even if the cached manifest is up to date.
 
     Returns:
         None
     """
-    script_dir = Path(__file__).parent
-    subcommands_dir = script_dir / directory
+    subcommands_dir = Path(__file__).parent / directory
 
     logger.debug(f"Loading subcommands from {subcommands_dir}")
 
-    for filename in os.listdir(subcommands_dir):
-        logger.debug(f"Filename: {filename}")
-        if filename.endswith("_cmd.py"):
-            module_name = f"{__name__.split('.')[0]}.{directory}.{filename[:-3]}"
-            logger.debug(f"Loading subcommand: {module_name}")
-            module = import_module(module_name)
-            if hasattr(module, "APP"):
-                logger.debug(f"Adding subcommand: {filename[:-7]}")
-                APP.add_typer(module.APP, name=filename[:-7])
+    subcommands = discover_subcommands(
+        subcommands_dir,
+        package=f"{__name__.split('.')[0]}.{directory.replace(os.sep, '.')}",
+        plugins=False,
+        refresh=refresh,
+    )
+    get_subcommands(refresh=refresh).update(subcommands)
 
 
 # APP = AsyncTyper()
-APP = AsyncTyperImproved()
+APP = AsyncTyperImproved(cls=LazySubcommandGroup)
 console = Console()
 cprint = console.print
-load_commands()
 
 
 def version_callback(version: bool) -> None:
@@ -131,6 +161,8 @@ def version(
 @APP.command()
 def deps() -> None:
     """Deps command"""
+    from importlib.metadata import version as importlib_metadata_version
+
     rich.print(f"prompt_library version: {prompt_library.__version__}")
     rich.print(f"langchain_version: {importlib_metadata_version('langchain')}")
     rich.print(f"langchain_community_version: {importlib_metadata_version('langchain_community')}")
@@ -159,8 +191,14 @@ def show() -> None:
 
 # @pysnooper.snoop(thread_info=True, max_variable_length=None, watch=["APP"], depth=10)
 def main():
+    # SOURCE: https://github.com/Delgan/loguru/blob/420704041797daf804b505e5220805528fe26408/docs/resources/recipes.rst#L1083
+    from prompt_library.bot_logger import global_log_config
+
+    global_log_config(
+        log_level=logging.getLevelName("DEBUG"),
+        json=False,
+    )
     APP()
-    load_commands()
 
 
 # @pysnooper.snoop(thread_info=True, max_variable_length=None, depth=10)
@@ -171,9 +209,11 @@ def entry():
 
 @APP.command()
 def run_load_commands() -> None:
-    """Load subcommands"""
+    """Rebuild the subcommand manifest"""
     typer.echo("Loading subcommands....")
-    load_commands()
+    load_commands(refresh=True)
+    for name, entry in sorted(get_subcommands().items()):
+        typer.echo(f"{name}: {entry.module} ({entry.source})")
 
 
 def handle_sigterm(signo, frame):
@@ -183,9 +223,4 @@ def handle_sigterm(signo, frame):
 signal.signal(signal.SIGTERM, handle_sigterm)
 
 if __name__ == "__main__":
-    # # SOURCE: https://github.com/Delgan/loguru/blob/420704041797daf804b505e5220805528fe26408/docs/resources/recipes.rst#L1083
-    # global_log_config(
-    #     log_level=logging.getLevelName("DEBUG"),
-    #     json=False,
-    # )
-    APP()
+    main()
@@ -4,4 +4,20 @@ from __future__ import annotations
 
 from loguru import logger
 
-from prompt_library.common import chain, prompt_library_module, typings, utils
+from prompt_library.common import (
+    chain,
+    execution_export,
+    execution_log,
+    json_extract,
+    prompt_embeddings,
+    prompt_index,
+    prompt_library_module,
+    prompt_search,
+    prompt_template,
+    prompt_watcher,
+    rankings_store,
+    ratings,
+    response_cache,
+    typings,
+    utils,
+)
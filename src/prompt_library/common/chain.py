@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures
+import contextlib
+import inspect
 import json
-import re
 
-from typing import Any, Callable, Dict, List, Tuple, TypeVar, Union, cast
+from collections.abc import AsyncIterator, Awaitable, Iterable, Iterator, Sequence
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union, cast
 
 from loguru import logger
+from pydantic import BaseModel
 
-from prompt_library.common.typings import FusionChainResult
+from prompt_library.common.json_extract import JSONScanner, extract_json, extract_json_from_scanner
+from prompt_library.common.prompt_template import compile_prompts
+from prompt_library.common.typings import FusionChainModelResult, FusionChainResult
 
 
 # Type variables for better type hints
@@ -69,12 +75,7 @@ class FusionChain:
         # Evaluate the last output of each model
         last_outputs = [outputs[-1] for outputs in all_outputs]
         top_response, performance_scores = evaluator(last_outputs)
-
-        # Validate performance scores
-        if len(performance_scores) != len(models):
-            raise RuntimeError("Evaluator returned incorrect number of scores")
-        if not all(0 <= score <= 1 for score in performance_scores):
-            raise RuntimeError("Performance scores must be between 0 and 1")
+        FusionChain._validate_scores(performance_scores, len(models))
 
         model_names = [get_model_name(model) for model in models]
 
@@ -99,6 +100,7 @@ class FusionChain:
         """Run a competition between models on a list of prompts in parallel.
 
         Similar to run() but utilizes parallel processing for better performance with multiple models.
+        Outputs are kept in the same order as `models`, whichever model finishes first.
 
         Args:
             context: The context dictionary for prompt template variables.
@@ -123,43 +125,449 @@ class FusionChain:
         if num_workers < 1:
             raise ValueError("Number of workers must be at least 1")
 
+        all_outputs: list[list[Any]] = [[] for _ in models]
+        all_context_filled_prompts: list[list[str]] = [[] for _ in models]
+
+        for model_result in FusionChain.run_streaming(
+            context, models, callable, prompts, get_model_name, num_workers=num_workers
+        ):
+            all_outputs[model_result.model_index] = model_result.prompt_responses
+            all_context_filled_prompts[model_result.model_index] = model_result.context_filled_prompts
+
+        # Evaluate the last output of each model
+        last_outputs = [outputs[-1] for outputs in all_outputs]
+        top_response, performance_scores = evaluator(last_outputs)
+        FusionChain._validate_scores(performance_scores, len(models))
+
+        model_names = [get_model_name(model) for model in models]
+
+        return FusionChainResult(
+            top_response=top_response,
+            all_prompt_responses=all_outputs,
+            all_context_filled_prompts=all_context_filled_prompts,
+            performance_scores=performance_scores,
+            llm_model_names=model_names,
+        )
+
+    @staticmethod
+    def run_streaming(
+        context: dict[str, Any],
+        models: list[ModelType],
+        callable: Callable[[ModelType, str], str],
+        prompts: list[str],
+        get_model_name: Callable[[ModelType], str],
+        partial_evaluator: Callable[[list[Any]], tuple[Any, list[float]]] | None = None,
+        num_workers: int = 4,
+    ) -> Iterator[FusionChainModelResult]:
+        """Run the models in parallel and yield each model's chain result as soon as it finishes.
+
+        Results are yielded in completion order; use `model_index` to map a result back to its
+        position in `models`. When a partial evaluator is given it is called after every finished
+        model with the last outputs of all models finished so far (in model order), and its scores
+        are attached to the yielded result, aligned with `models` and None for models still running.
+        Closing the generator early, or a model failing, cancels the chains that have not started yet
+        and waits for the running ones to finish, so no model call outlives the generator.
+
+        Args:
+            context: The context dictionary for prompt template variables.
+            models: List of language models to compete.
+            callable: Function to call for each prompt, taking model and prompt as arguments.
+            prompts: List of prompt templates to process.
+            get_model_name: Function to get the name/identifier of a model.
+            partial_evaluator: Optional function scoring the results finished so far, returning
+                top response and one score per finished model.
+            num_workers: Number of parallel workers to use, defaults to 4.
+
+        Yields:
+            FusionChainModelResult for each model, in the order the models finish.
+
+        Raises:
+            ValueError: If models list is empty, prompts list is empty, or num_workers < 1.
+            RuntimeError: If the partial evaluator returns invalid scores or parallel execution fails.
+        """
+        if not models:
+            raise ValueError("Models list cannot be empty")
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+        if num_workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+
         def process_model(model: ModelType) -> tuple[list[Any], list[str]]:
             return MinimalChainable.run(context, model, callable, prompts)
 
-        all_outputs: list[list[Any]] = []
-        all_context_filled_prompts: list[list[str]] = []
+        last_outputs: dict[int, Any] = {}
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+        try:
+            future_to_index = {executor.submit(process_model, model): i for i, model in enumerate(models)}
+
+            for future in concurrent.futures.as_completed(future_to_index):
+                model_index = future_to_index[future]
+                try:
+                    outputs, context_filled_prompts = future.result()
+                except Exception as e:
+                    raise RuntimeError(f"Parallel execution failed: {e!s}") from e
+
+                yield FusionChain._build_model_result(
+                    model_index,
+                    models,
+                    outputs,
+                    context_filled_prompts,
+                    get_model_name,
+                    partial_evaluator,
+                    last_outputs,
+                )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def run_dag(
+        context: dict[str, Any],
+        models: list[ModelType],
+        callable: Callable[[ModelType, str], str],
+        prompts: list[str],
+        evaluator: Callable[[list[Any]], tuple[Any, list[float]]],
+        get_model_name: Callable[[ModelType], str],
+        num_workers: int = 4,
+    ) -> FusionChainResult:
+        """Run a competition between models, parallelising across both models and prompts.
+
+        Builds a dependency graph from the `{{output[-j]}}` references in the prompts (see
+        MinimalChainable.dependency_graph) and dispatches every (model, prompt) step as soon as
+        the steps it references have finished, sharing one pool of `num_workers` threads.
+        Independent prompts therefore run concurrently instead of one after another; outputs
+        and filled prompts are identical to run(), provided the callable does not rely on
+        being called in prompt order.
+
+        Args:
+            context: The context dictionary for prompt template variables.
+            models: List of language models to compete.
+            callable: Function to call for each prompt, taking model and prompt as arguments.
+            prompts: List of prompt templates to process.
+            evaluator: Function to evaluate model outputs, returning top response and scores.
+            get_model_name: Function to get the name/identifier of a model.
+            num_workers: Number of parallel workers shared by all steps of all models, defaults to 4.
+
+        Returns:
+            FusionChainResult containing top response, all outputs, prompts, scores, and model names.
+
+        Raises:
+            ValueError: If models list is empty, prompts list is empty, or num_workers < 1.
+            RuntimeError: If evaluator returns invalid scores or parallel execution fails.
+        """
+        if not models:
+            raise ValueError("Models list cannot be empty")
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+        if num_workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+
+        templates = compile_prompts(prompts)
+        dependencies = MinimalChainable.dependency_graph(prompts)
+        dependents: list[list[int]] = [[] for _ in prompts]
+        for step, step_dependencies in enumerate(dependencies):
+            for dependency in step_dependencies:
+                dependents[dependency].append(step)
+
+        all_outputs: list[list[Any]] = [[None] * len(prompts) for _ in models]
+        all_context_filled_prompts: list[list[str]] = [[""] * len(prompts) for _ in models]
+        remaining: list[list[int]] = [[len(step_dependencies) for step_dependencies in dependencies] for _ in models]
+
+        def process_step(model_index: int, step: int) -> Any:
+            prompt = templates[step].render(context, all_outputs[model_index][:step])
+            all_context_filled_prompts[model_index][step] = prompt
+            return MinimalChainable._parse_output(callable(models[model_index], prompt))
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
-            future_to_model = {executor.submit(process_model, model): model for model in models}
+            running = {
+                executor.submit(process_step, model_index, step): (model_index, step)
+                for model_index in range(len(models))
+                for step, step_dependencies in enumerate(dependencies)
+                if not step_dependencies
+            }
 
             try:
-                for future in concurrent.futures.as_completed(future_to_model):
-                    outputs, context_filled_prompts = future.result()
-                    all_outputs.append(outputs)
-                    all_context_filled_prompts.append(context_filled_prompts)
+                while running:
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        model_index, step = running.pop(future)
+                        all_outputs[model_index][step] = future.result()
+
+                        for dependent in dependents[step]:
+                            remaining[model_index][dependent] -= 1
+                            if remaining[model_index][dependent] == 0:
+                                running[executor.submit(process_step, model_index, dependent)] = (
+                                    model_index,
+                                    dependent,
+                                )
             except Exception as e:
+                for future in running:
+                    future.cancel()
                 raise RuntimeError(f"Parallel execution failed: {e!s}") from e
 
         # Evaluate the last output of each model
         last_outputs = [outputs[-1] for outputs in all_outputs]
         top_response, performance_scores = evaluator(last_outputs)
+        FusionChain._validate_scores(performance_scores, len(models))
 
-        # Validate performance scores
-        if len(performance_scores) != len(models):
-            raise RuntimeError("Evaluator returned incorrect number of scores")
-        if not all(0 <= score <= 1 for score in performance_scores):
-            raise RuntimeError("Performance scores must be between 0 and 1")
+        return FusionChainResult(
+            top_response=top_response,
+            all_prompt_responses=all_outputs,
+            all_context_filled_prompts=all_context_filled_prompts,
+            performance_scores=performance_scores,
+            llm_model_names=[get_model_name(model) for model in models],
+        )
 
-        model_names = [get_model_name(model) for model in models]
+    @staticmethod
+    async def arun(
+        context: dict[str, Any],
+        models: list[ModelType],
+        callable: Callable[[ModelType, str], Awaitable[str]] | Callable[[ModelType, str], str],
+        prompts: list[str],
+        evaluator: Callable[[list[Any]], tuple[Any, list[float]]],
+        get_model_name: Callable[[ModelType], str],
+        timeout: float | None = None,
+    ) -> FusionChainResult:
+        """Coroutine variant of run(), running the models one after another.
+
+        Args:
+            context: The context dictionary for prompt template variables.
+            models: List of language models to compete.
+            callable: Sync or async function to call for each prompt, taking model and prompt as arguments.
+            prompts: List of prompt templates to process.
+            evaluator: Function to evaluate model outputs, returning top response and scores.
+            get_model_name: Function to get the name/identifier of a model.
+            timeout: Optional timeout in seconds for each model call.
+
+        Returns:
+            FusionChainResult containing top response, all outputs, prompts, scores, and model names.
+
+        Raises:
+            ValueError: If models list is empty or prompts list is empty.
+            RuntimeError: If evaluator returns invalid scores.
+            TimeoutError: If a model call takes longer than `timeout`.
+        """
+        if not models:
+            raise ValueError("Models list cannot be empty")
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+
+        all_outputs: list[list[Any]] = []
+        all_context_filled_prompts: list[list[str]] = []
+
+        for model in models:
+            outputs, context_filled_prompts = await MinimalChainable.arun(
+                context, model, callable, prompts, timeout=timeout
+            )
+            all_outputs.append(outputs)
+            all_context_filled_prompts.append(context_filled_prompts)
+
+        last_outputs = [outputs[-1] for outputs in all_outputs]
+        top_response, performance_scores = evaluator(last_outputs)
+        FusionChain._validate_scores(performance_scores, len(models))
 
         return FusionChainResult(
             top_response=top_response,
             all_prompt_responses=all_outputs,
             all_context_filled_prompts=all_context_filled_prompts,
             performance_scores=performance_scores,
-            llm_model_names=model_names,
+            llm_model_names=[get_model_name(model) for model in models],
         )
 
+    @staticmethod
+    async def arun_parallel(
+        context: dict[str, Any],
+        models: list[ModelType],
+        callable: Callable[[ModelType, str], Awaitable[str]] | Callable[[ModelType, str], str],
+        prompts: list[str],
+        evaluator: Callable[[list[Any]], tuple[Any, list[float]]],
+        get_model_name: Callable[[ModelType], str],
+        max_concurrency: int = 4,
+        timeout: float | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> FusionChainResult:
+        """Coroutine variant of run_parallel(), running every model's chain as a task on one loop.
+
+        Args:
+            context: The context dictionary for prompt template variables.
+            models: List of language models to compete.
+            callable: Sync or async function to call for each prompt, taking model and prompt as arguments.
+            prompts: List of prompt templates to process.
+            evaluator: Function to evaluate model outputs, returning top response and scores.
+            get_model_name: Function to get the name/identifier of a model.
+            max_concurrency: Maximum number of concurrent model calls, defaults to 4.
+                Ignored when `semaphore` is given.
+            timeout: Optional timeout in seconds for each model call.
+            semaphore: Optional semaphore shared with other chains to bound model calls process-wide.
+
+        Returns:
+            FusionChainResult containing top response, all outputs, prompts, scores, and model names.
+
+        Raises:
+            ValueError: If models list is empty, prompts list is empty, or max_concurrency < 1.
+            RuntimeError: If evaluator returns invalid scores or parallel execution fails.
+        """
+        if not models:
+            raise ValueError("Models list cannot be empty")
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+
+        all_outputs: list[list[Any]] = [[] for _ in models]
+        all_context_filled_prompts: list[list[str]] = [[] for _ in models]
+
+        async for model_result in FusionChain.astream(
+            context,
+            models,
+            callable,
+            prompts,
+            get_model_name,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            semaphore=semaphore,
+        ):
+            all_outputs[model_result.model_index] = model_result.prompt_responses
+            all_context_filled_prompts[model_result.model_index] = model_result.context_filled_prompts
+
+        last_outputs = [outputs[-1] for outputs in all_outputs]
+        top_response, performance_scores = evaluator(last_outputs)
+        FusionChain._validate_scores(performance_scores, len(models))
+
+        return FusionChainResult(
+            top_response=top_response,
+            all_prompt_responses=all_outputs,
+            all_context_filled_prompts=all_context_filled_prompts,
+            performance_scores=performance_scores,
+            llm_model_names=[get_model_name(model) for model in models],
+        )
+
+    @staticmethod
+    async def astream(
+        context: dict[str, Any],
+        models: list[ModelType],
+        callable: Callable[[ModelType, str], Awaitable[str]] | Callable[[ModelType, str], str],
+        prompts: list[str],
+        get_model_name: Callable[[ModelType], str],
+        partial_evaluator: Callable[[list[Any]], tuple[Any, list[float]]] | None = None,
+        max_concurrency: int = 4,
+        timeout: float | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> AsyncIterator[FusionChainModelResult]:
+        """Async generator variant of run_streaming().
+
+        Every model's chain runs as a task on the current loop. As soon as one fails, or the
+        consumer stops iterating (e.g. after the first usable answer), the remaining chains
+        are cancelled.
+
+        Args:
+            context: The context dictionary for prompt template variables.
+            models: List of language models to compete.
+            callable: Sync or async function to call for each prompt, taking model and prompt as arguments.
+            prompts: List of prompt templates to process.
+            get_model_name: Function to get the name/identifier of a model.
+            partial_evaluator: Optional function scoring the results finished so far, returning
+                top response and one score per finished model.
+            max_concurrency: Maximum number of concurrent model calls, defaults to 4.
+                Ignored when `semaphore` is given.
+            timeout: Optional timeout in seconds for each model call.
+            semaphore: Optional semaphore shared with other chains to bound model calls process-wide.
+
+        Yields:
+            FusionChainModelResult for each model, in the order the models finish.
+
+        Raises:
+            ValueError: If models list is empty, prompts list is empty, or max_concurrency < 1.
+            RuntimeError: If the partial evaluator returns invalid scores or parallel execution fails.
+        """
+        if not models:
+            raise ValueError("Models list cannot be empty")
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+        if semaphore is None:
+            if max_concurrency < 1:
+                raise ValueError("Max concurrency must be at least 1")
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+        last_outputs: dict[int, Any] = {}
+        task_to_index = {
+            asyncio.create_task(
+                MinimalChainable.arun(context, model, callable, prompts, timeout=timeout, semaphore=semaphore)
+            ): i
+            for i, model in enumerate(models)
+        }
+
+        try:
+            pending = set(task_to_index)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=task_to_index.__getitem__):
+                    model_index = task_to_index[task]
+                    try:
+                        outputs, context_filled_prompts = task.result()
+                    except Exception as e:
+                        raise RuntimeError(f"Parallel execution failed: {e!s}") from e
+
+                    yield FusionChain._build_model_result(
+                        model_index,
+                        models,
+                        outputs,
+                        context_filled_prompts,
+                        get_model_name,
+                        partial_evaluator,
+                        last_outputs,
+                    )
+        finally:
+            unfinished = [task for task in task_to_index if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    @staticmethod
+    def _build_model_result(
+        model_index: int,
+        models: list[ModelType],
+        outputs: list[Any],
+        context_filled_prompts: list[str],
+        get_model_name: Callable[[ModelType], str],
+        partial_evaluator: Callable[[list[Any]], tuple[Any, list[float]]] | None,
+        last_outputs: dict[int, Any],
+    ) -> FusionChainModelResult:
+        """Wrap a finished model's chain and score everything finished so far.
+
+        `last_outputs` accumulates the last output of every finished model across calls.
+        """
+        model_result = FusionChainModelResult(
+            model_index=model_index,
+            llm_model_name=get_model_name(models[model_index]),
+            prompt_responses=outputs,
+            context_filled_prompts=context_filled_prompts,
+        )
+
+        if partial_evaluator is not None:
+            last_outputs[model_index] = outputs[-1]
+            finished = sorted(last_outputs)
+            top_response, scores = partial_evaluator([last_outputs[i] for i in finished])
+            FusionChain._validate_scores(scores, len(finished))
+
+            performance_scores: list[float | None] = [None] * len(models)
+            for i, score in zip(finished, scores, strict=True):
+                performance_scores[i] = score
+            model_result.top_response = top_response
+            model_result.performance_scores = performance_scores
+
+        return model_result
+
+    @staticmethod
+    def _validate_scores(performance_scores: list[float], expected: int) -> None:
+        """Check that an evaluator returned one score in [0, 1] per evaluated output.
+
+        Raises:
+            RuntimeError: If the number of scores or their range is wrong.
+        """
+        if len(performance_scores) != expected:
+            raise RuntimeError("Evaluator returned incorrect number of scores")
+        if not all(0 <= score <= 1 for score in performance_scores):
+            raise RuntimeError("Performance scores must be between 0 and 1")
+
 
 class MinimalChainable:
     """Sequential prompt chaining with context and output back-references.
@@ -174,6 +582,7 @@ class MinimalChainable:
         model: ModelType,
         callable: Callable[[ModelType, str], str],
         prompts: list[str],
+        schemas: Optional[Sequence[Optional[type[BaseModel]]]] = None,
     ) -> tuple[list[Any], list[str]]:
         """Run a sequence of prompts through a model with context and output references.
 
@@ -182,6 +591,8 @@ class MinimalChainable:
             model: The language model to use.
             callable: Function to call for each prompt, taking model and prompt as arguments.
             prompts: List of prompt templates to process.
+            schemas: Optional pydantic model per prompt (None for free-form steps). The output of
+                a step with a schema is its validated JSON document.
 
         Returns:
             Tuple containing:
@@ -189,61 +600,188 @@ class MinimalChainable:
                 - List of context-filled prompts that were sent to the model
 
         Raises:
-            ValueError: If prompts list is empty.
+            ValueError: If prompts list is empty, the number of schemas does not match the number
+                of prompts, or a response does not conform to its schema.
         """
         if not prompts:
             raise ValueError("Prompts list cannot be empty")
+        step_schemas = MinimalChainable._step_schemas(schemas, len(prompts))
 
         output: list[Any] = []
         context_filled_prompts: list[str] = []
 
-        for i, prompt in enumerate(prompts):
-            # Fill context variables
-            for key, value in context.items():
-                if "{{" + key + "}}" in prompt:
-                    prompt = prompt.replace("{{" + key + "}}", str(value))
-
-            # Replace references to previous outputs
-            for j in range(i, 0, -1):
-                previous_output = output[i - j]
-
-                # Handle JSON (dict) output references
-                if isinstance(previous_output, dict):
-                    # Handle full dict reference
-                    if f"{{{{output[-{j}]}}}}" in prompt:
-                        prompt = prompt.replace(f"{{{{output[-{j}]}}}}", json.dumps(previous_output))
-                    # Handle key references
-                    for key, value in previous_output.items():
-                        key_ref = f"{{{{output[-{j}].{key}}}}}"
-                        if key_ref in prompt:
-                            prompt = prompt.replace(key_ref, str(value))
-                else:
-                    # Handle non-dict output reference
-                    if f"{{{{output[-{j}]}}}}" in prompt:
-                        prompt = prompt.replace(f"{{{{output[-{j}]}}}}", str(previous_output))
-
+        for template, schema in zip(compile_prompts(prompts), step_schemas, strict=False):
+            # Fill context variables and references to previous outputs in one pass
+            prompt = template.render(context, output)
             context_filled_prompts.append(prompt)
 
             # Get model response
             result = callable(model, prompt)
+            output.append(MinimalChainable._parse_output(result, schema))
 
-            # Try to parse JSON from response
-            try:
-                # First check for JSON in markdown code blocks
-                json_match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", result)
-                if json_match:
-                    result = json.loads(json_match.group(1))
-                else:
-                    # Try parsing entire result as JSON
-                    result = json.loads(result)
-            except json.JSONDecodeError:
-                # Not JSON, keep as is
-                pass
+        return output, context_filled_prompts
 
-            output.append(result)
+    @staticmethod
+    def run_stream(
+        context: dict[str, Any],
+        model: ModelType,
+        stream_callable: Callable[[ModelType, str], Iterable[str]],
+        prompts: list[str],
+        on_chunk: Callable[[int, str], None] | None = None,
+        schemas: Optional[Sequence[Optional[type[BaseModel]]]] = None,
+    ) -> tuple[list[Any], list[str]]:
+        """Run a sequence of prompts, streaming each response as it is generated.
+
+        Like run(), but `stream_callable` returns an iterable of text chunks (for example
+        llm_module.prompt_stream). Every chunk is passed to `on_chunk` together with the index
+        of the prompt that produced it, so a UI can show partial output; the next prompt is
+        rendered and sent as soon as the previous stream is exhausted.
+
+        Args:
+            context: Dictionary of variables that can be referenced in prompts.
+            model: The language model to use.
+            stream_callable: Function taking model and prompt and returning an iterable of chunks.
+            prompts: List of prompt templates to process.
+            on_chunk: Optional callback receiving the prompt index and each chunk.
+            schemas: Optional pydantic model per prompt, see run().
+
+        Returns:
+            Tuple containing:
+                - List of outputs from each prompt
+                - List of context-filled prompts that were sent to the model
+
+        Raises:
+            ValueError: If prompts list is empty, the number of schemas does not match the number
+                of prompts, or a response does not conform to its schema.
+        """
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+        step_schemas = MinimalChainable._step_schemas(schemas, len(prompts))
+
+        output: list[Any] = []
+        context_filled_prompts: list[str] = []
+
+        for i, (template, schema) in enumerate(zip(compile_prompts(prompts), step_schemas, strict=False)):
+            prompt = template.render(context, output)
+            context_filled_prompts.append(prompt)
+
+            # Code fences are located while the response streams in
+            scanner = JSONScanner()
+            for chunk in stream_callable(model, prompt):
+                scanner.feed(chunk)
+                if on_chunk is not None:
+                    on_chunk(i, chunk)
+            output.append(extract_json_from_scanner(scanner, schema))
+
+        return output, context_filled_prompts
+
+    @staticmethod
+    async def arun(
+        context: dict[str, Any],
+        model: ModelType,
+        callable: Callable[[ModelType, str], Awaitable[str]] | Callable[[ModelType, str], str],
+        prompts: list[str],
+        timeout: float | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> tuple[list[Any], list[str]]:
+        """Coroutine variant of run().
+
+        Async callables are awaited directly on the running loop; synchronous callables are
+        offloaded to a worker thread so they do not block it.
+
+        Args:
+            context: Dictionary of variables that can be referenced in prompts.
+            model: The language model to use.
+            callable: Sync or async function to call for each prompt, taking model and prompt as arguments.
+            prompts: List of prompt templates to process.
+            timeout: Optional timeout in seconds for each model call.
+            semaphore: Optional semaphore bounding concurrent model calls, shareable across chains.
+
+        Returns:
+            Tuple containing:
+                - List of outputs from each prompt
+                - List of context-filled prompts that were sent to the model
+
+        Raises:
+            ValueError: If prompts list is empty.
+            TimeoutError: If a model call takes longer than `timeout`.
+        """
+        if not prompts:
+            raise ValueError("Prompts list cannot be empty")
+
+        output: list[Any] = []
+        context_filled_prompts: list[str] = []
+
+        for template in compile_prompts(prompts):
+            prompt = template.render(context, output)
+            context_filled_prompts.append(prompt)
+
+            result = await MinimalChainable._acall(callable, model, prompt, timeout, semaphore)
+            output.append(MinimalChainable._parse_output(result))
 
         return output, context_filled_prompts
 
+    @staticmethod
+    async def _acall(
+        callable: Callable[[ModelType, str], Awaitable[str]] | Callable[[ModelType, str], str],
+        model: ModelType,
+        prompt: str,
+        timeout: float | None,
+        semaphore: asyncio.Semaphore | None,
+    ) -> str:
+        """Call a sync or async model callable, honouring the timeout and concurrency bound.
+
+        Coroutine functions, including partials of them and objects with an async `__call__`, are awaited
+        on the loop. Anything else runs in a worker thread, and its result is awaited if it is awaitable,
+        e.g. a lambda or wrapper returning a coroutine.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            if semaphore is not None:
+                await stack.enter_async_context(semaphore)
+            async with asyncio.timeout(timeout):
+                if inspect.iscoroutinefunction(callable) or inspect.iscoroutinefunction(type(callable).__call__):
+                    result = callable(model, prompt)
+                else:
+                    result = await asyncio.to_thread(callable, model, prompt)
+                if inspect.isawaitable(result):
+                    result = await result
+                return cast(str, result)
+
+    @staticmethod
+    def dependency_graph(prompts: list[str]) -> list[frozenset[int]]:
+        """Work out which earlier steps each prompt references through `{{output[-j]}}`.
+
+        References that point before the first prompt can never be filled and are ignored.
+
+        Args:
+            prompts: List of prompt templates.
+
+        Returns:
+            For every prompt, the set of indices of the prompts whose outputs it needs.
+        """
+        return [
+            frozenset(step - offset for offset in template.output_offsets if offset <= step)
+            for step, template in enumerate(compile_prompts(prompts))
+        ]
+
+    @staticmethod
+    def _parse_output(result: str, schema: Optional[type[BaseModel]] = None) -> Any:
+        """Parse JSON from a model response, returning the response unchanged if it is not JSON.
+
+        See json_extract.extract_json; with a `schema` the response must hold conforming JSON.
+        """
+        return extract_json(result, schema)
+
+    @staticmethod
+    def _step_schemas(
+        schemas: Optional[Sequence[Optional[type[BaseModel]]]], num_prompts: int
+    ) -> list[Optional[type[BaseModel]]]:
+        if schemas is None:
+            return [None] * num_prompts
+        if len(schemas) != num_prompts:
+            raise ValueError(f"Expected {num_prompts} schemas, got {len(schemas)}")
+        return list(schemas)
+
     @staticmethod
     def to_delim_text_file(name: str, content: list[Union[str, dict, list]]) -> str:
         """Write chain results to a delimited text file.
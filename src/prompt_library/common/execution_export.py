@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, Optional
+
+from loguru import logger
+from pydantic import ValidationError
+
+from prompt_library.common.execution_log import ExecutionLogStore, get_default_execution_log
+from prompt_library.common.typings import ExecutionLogRecord
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+EXPORT_FORMATS = ("parquet", "arrow")
+PARTITION_COLUMNS = ["date", "prompt_template"]
+# Suffix written by record_llm_execution, e.g. "summarize_20241214_093000.json"
+LEGACY_TIMESTAMP_PATTERN = re.compile(r"_(\d{8}_\d{6})\.json$")
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Exporting executions requires pyarrow, install it with `uv add pyarrow`") from e
+    return pyarrow
+
+
+def execution_schema() -> pa.Schema:
+    """Return the Arrow schema of exported executions, one row per model response."""
+    pa = _require_pyarrow()
+    return pa.schema([
+        ("date", pa.string()),
+        ("prompt_template", pa.string()),
+        ("execution_id", pa.string()),
+        ("recorded_at", pa.timestamp("us", tz="UTC")),
+        ("model_id", pa.string()),
+        ("prompt_sha256", pa.string()),
+        ("output_length", pa.int64()),
+        ("latency_seconds", pa.float64()),
+        ("score", pa.float64()),
+        ("error", pa.string()),
+    ])
+
+
+def read_legacy_executions(executions_dir: Optional[str] = None) -> Iterator[ExecutionLogRecord]:
+    """Read the per-run JSON files written by record_llm_execution without a store.
+
+    The recording time is taken from the timestamp in the file name, falling back to the
+    modification time of the file. The execution id is the file name.
+
+    Args:
+        executions_dir: Directory of the JSON files. Defaults to the PROMPT_EXECUTIONS_DIR
+            environment variable.
+
+    Yields:
+        ExecutionLogRecord: One record per readable file, in file name order.
+    """
+    if executions_dir is None:
+        executions_dir = os.getenv("PROMPT_EXECUTIONS_DIR", "./src/prompt_library/data/prompt_executions")
+
+    for path in sorted(glob.glob(os.path.join(executions_dir, "*.json"))):
+        match = LEGACY_TIMESTAMP_PATTERN.search(path)
+        if match:
+            # record_llm_execution names files with the local time
+            recorded_at = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").astimezone(UTC)
+        else:
+            recorded_at = datetime.fromtimestamp(os.path.getmtime(path), UTC)
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            yield ExecutionLogRecord(
+                **data, execution_id=os.path.splitext(os.path.basename(path))[0], recorded_at=recorded_at
+            )
+        except (OSError, json.JSONDecodeError, TypeError, ValidationError) as e:
+            logger.warning(f"Skipping unreadable execution file {path}: {e}")
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def executions_to_table(records: Iterable[ExecutionLogRecord]) -> pa.Table:
+    """Flatten executions into an Arrow table with one row per model response.
+
+    Latency and score are read from the optional `duration_seconds` and `score` keys of each
+    response and are null when a response has none.
+
+    Args:
+        records: The executions to flatten.
+
+    Returns:
+        pa.Table: The rows, following execution_schema().
+    """
+    pa = _require_pyarrow()
+    schema = execution_schema()
+    columns: dict[str, list[Any]] = {name: [] for name in schema.names}
+
+    for record in records:
+        recorded_at = record.recorded_at.astimezone(UTC)
+        prompt_sha256 = hashlib.sha256(record.prompt.encode("utf-8")).hexdigest()
+        for response in record.prompt_responses:
+            output = response.get("output")
+            if output is not None and not isinstance(output, str):
+                output = json.dumps(output)
+            columns["date"].append(recorded_at.date().isoformat())
+            columns["prompt_template"].append(record.prompt_template)
+            columns["execution_id"].append(record.execution_id)
+            columns["recorded_at"].append(recorded_at)
+            columns["model_id"].append(response.get("model_id"))
+            columns["prompt_sha256"].append(prompt_sha256)
+            columns["output_length"].append(len(output) if output is not None else None)
+            columns["latency_seconds"].append(_optional_float(response.get("duration_seconds")))
+            columns["score"].append(_optional_float(response.get("score")))
+            columns["error"].append(response.get("error"))
+
+    return pa.table(columns, schema=schema)
+
+
+def export_executions(
+    output_dir: Optional[str] = None,
+    export_format: str = "parquet",
+    store: Optional[ExecutionLogStore] = None,
+    executions_dir: Optional[str] = None,
+    include_legacy: bool = True,
+) -> int:
+    """Export the execution history into a dataset partitioned by date and prompt template.
+
+    The dataset uses hive-style directories (`date=2024-12-14/prompt_template=summarize/`), so
+    pandas, pyarrow or DuckDB can scan it in bulk and prune partitions by filter. Partitions that
+    are exported again are replaced, the others are kept.
+
+    Args:
+        output_dir: Directory of the dataset. Defaults to the EXECUTION_EXPORT_DIR environment variable.
+        export_format: "parquet" or "arrow" (Arrow IPC files). Defaults to "parquet".
+        store: Execution log to export. Defaults to the store in EXECUTION_LOG_DIR.
+        executions_dir: Directory of the per-run JSON files. Defaults to PROMPT_EXECUTIONS_DIR.
+        include_legacy: Whether the per-run JSON files are exported too. Defaults to True.
+
+    Returns:
+        int: Number of exported rows.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {export_format!r}, expected one of {EXPORT_FORMATS}")
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    if output_dir is None:
+        output_dir = os.getenv("EXECUTION_EXPORT_DIR", "./src/prompt_library/data/execution_export")
+    if store is None:
+        store = get_default_execution_log()
+
+    records: Iterable[ExecutionLogRecord] = store.query()
+    if include_legacy:
+        records = [*read_legacy_executions(executions_dir), *records]
+    table = executions_to_table(records)
+
+    ds.write_dataset(
+        table,
+        output_dir,
+        format="ipc" if export_format == "arrow" else "parquet",
+        partitioning=PARTITION_COLUMNS,
+        partitioning_flavor="hive",
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}." + ("arrow" if export_format == "arrow" else "parquet"),
+    )
+    logger.info(f"Exported {table.num_rows} execution rows to {output_dir}")
+    return table.num_rows
+
+
+def read_executions(
+    export_dir: Optional[str] = None, export_format: str = "parquet", filters: Any = None
+) -> pd.DataFrame:
+    """Load an exported execution dataset into a DataFrame.
+
+    Args:
+        export_dir: Directory of the dataset. Defaults to the EXECUTION_EXPORT_DIR environment variable.
+        export_format: "parquet" or "arrow". Defaults to "parquet".
+        filters: Optional pyarrow.dataset expression, partition filters skip whole directories.
+
+    Returns:
+        pd.DataFrame: One row per model response.
+
+    Example:
+        >>> import pyarrow.dataset as ds
+        >>> df = read_executions(filters=ds.field("prompt_template") == "summarize")
+        >>> df.groupby("model_id")["latency_seconds"].mean()
+    """
+    pa = _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    if export_dir is None:
+        export_dir = os.getenv("EXECUTION_EXPORT_DIR", "./src/prompt_library/data/execution_export")
+    schema = execution_schema()
+    partitioning = ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor="hive")
+    dataset = ds.dataset(export_dir, format="ipc" if export_format == "arrow" else "parquet", partitioning=partitioning)
+    return dataset.to_table(filter=filters).to_pandas()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import os
+import re
+import threading
+import weakref
+
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any, Optional
+
+from loguru import logger
+from pydantic import ValidationError
+
+from prompt_library.common.typings import ExecutionLogRecord
+
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d{8})\.jsonl$")
+LOCK_FILE = ".lock"
+
+# Stores with records that may still be buffered, flushed at interpreter exit. Weak references, so a
+# store that is dropped without being closed can still be garbage collected.
+_open_stores: weakref.WeakSet[ExecutionLogStore] = weakref.WeakSet()
+
+
+def _flush_open_stores() -> None:
+    for store in list(_open_stores):
+        store.flush()
+
+
+atexit.register(_flush_open_stores)
+
+
+def segment_name(sequence: int) -> str:
+    """Return the file name of segment number `sequence`."""
+    return f"segment-{sequence:08d}.jsonl"
+
+
+class ExecutionLogStore:
+    """Append-only store of prompt executions in rotating JSON Lines segments.
+
+    Records are buffered in memory and appended to the newest segment in batches, one `write` per
+    batch. A new segment is started once the newest one reaches `segment_max_bytes`. Writers hold
+    an exclusive `flock` on the store's lock file while appending, so several threads and
+    processes can share a store without interleaving lines. Readers need no lock: a torn trailing
+    line of a segment being written is skipped.
+
+    Args:
+        directory: Directory of the segments. Defaults to the EXECUTION_LOG_DIR environment variable.
+        segment_max_bytes: Size at which a segment is rotated. Defaults to 64 MiB.
+        batch_size: Number of buffered records that triggers a write. Defaults to 100; 1 writes
+            every record immediately.
+        fsync: Whether every batch is fsynced to disk before flush returns. Defaults to False.
+
+    Example:
+        >>> with ExecutionLogStore() as store:
+        ...     store.append(
+        ...         ExecutionLogRecord(prompt="Hi", prompt_responses=[{"model_id": "gpt-4o", "output": "Hello"}])
+        ...     )
+        >>> [record.prompt for record in store.query(model_id="gpt-4o")]
+        ['Hi']
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        batch_size: int = 100,
+        fsync: bool = False,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        if segment_max_bytes < 1:
+            raise ValueError("Segment size must be positive")
+
+        self.directory = directory or os.getenv("EXECUTION_LOG_DIR", "./src/prompt_library/data/execution_log")
+        self.segment_max_bytes = segment_max_bytes
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        _open_stores.add(self)
+
+    def segments(self) -> list[str]:
+        """Return the paths of all segments, oldest first."""
+        names = sorted(name for name in os.listdir(self.directory) if SEGMENT_PATTERN.match(name))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def append(self, record: ExecutionLogRecord) -> str:
+        """Buffer a record, writing the batch once `batch_size` records are pending.
+
+        Returns:
+            str: The execution id of the record.
+        """
+        line = record.model_dump_json() + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._write()
+        return record.execution_id
+
+    def flush(self) -> None:
+        """Write all buffered records."""
+        with self._lock:
+            self._write()
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self) -> None:
+        if not self._buffer:
+            return
+        payload = "".join(self._buffer).encode("utf-8")
+
+        with self._file_lock():
+            # Pick the segment under the lock, another writer may have rotated meanwhile
+            segments = self.segments()
+            if segments:
+                path = segments[-1]
+                size = os.path.getsize(path)
+                if size and size + len(payload) > self.segment_max_bytes:
+                    sequence = int(SEGMENT_PATTERN.match(os.path.basename(path)).group(1)) + 1  # type: ignore[union-attr]
+                    path = os.path.join(self.directory, segment_name(sequence))
+                    logger.debug(f"Rotating execution log to {path}")
+            else:
+                path = os.path.join(self.directory, segment_name(1))
+
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view) :]
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        self._buffer.clear()
+
+    def query(
+        self,
+        prompt_template: Optional[str] = None,
+        model_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[ExecutionLogRecord]:
+        """Iterate over stored executions, oldest first.
+
+        Buffered records are flushed first. Segments last written before `since` are skipped
+        without being read.
+
+        Args:
+            prompt_template: Only executions of this prompt template.
+            model_id: Only executions with a response of this model.
+            since: Only executions recorded at or after this time.
+            until: Only executions recorded before this time.
+            limit: Maximum number of records.
+
+        Yields:
+            ExecutionLogRecord: The matching executions.
+        """
+        self.flush()
+        since_ts = since.timestamp() if since is not None else None
+        until_ts = until.timestamp() if until is not None else None
+        count = 0
+
+        for path in self.segments():
+            if since_ts is not None and os.path.getmtime(path) < since_ts:
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = ExecutionLogRecord.model_validate_json(line)
+                    except ValidationError:
+                        logger.warning(f"Skipping unreadable execution log line in {path}")
+                        continue
+
+                    recorded_ts = record.recorded_at.timestamp()
+                    if since_ts is not None and recorded_ts < since_ts:
+                        continue
+                    if until_ts is not None and recorded_ts >= until_ts:
+                        continue
+                    if prompt_template is not None and record.prompt_template != prompt_template:
+                        continue
+                    if model_id is not None and not any(
+                        response.get("model_id") == model_id for response in record.prompt_responses
+                    ):
+                        continue
+
+                    yield record
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+
+    def close(self) -> None:
+        """Write buffered records and stop flushing at interpreter exit."""
+        self.flush()
+        _open_stores.discard(self)
+
+    def __del__(self) -> None:
+        # A store dropped without close() still writes its buffered records
+        with contextlib.suppress(Exception):
+            self.flush()
+
+    def __enter__(self) -> ExecutionLogStore:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+_default_store: Optional[ExecutionLogStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_execution_log() -> ExecutionLogStore:
+    """Return the process-wide execution log, flushed at interpreter exit."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ExecutionLogStore()
+        return _default_store
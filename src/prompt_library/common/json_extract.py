@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+FENCE = "```"
+# Languages of fenced blocks that may hold JSON; an empty language is an unlabelled fence
+JSON_FENCE_LANGUAGES = frozenset({"", "json", "jsonc", "json5"})
+# First characters of a JSON document worth handing to json.loads
+JSON_START_CHARS = frozenset('{["-0123456789')
+JSON_LITERALS = frozenset({"true", "false", "null"})
+
+
+class JSONScanner:
+    """Incremental scanner collecting JSON code blocks from a model response.
+
+    Text can be fed in arbitrary chunks, e.g. while a response is streamed. Every character is
+    looked at once: complete lines are scanned for code fences, and the contents of fences
+    labelled `json` (or not labelled at all) are collected as candidate JSON documents. Fences
+    in any other language are skipped, so a Python block before the JSON block no longer
+    shadows it.
+
+    Example:
+        >>> scanner = JSONScanner()
+        >>> scanner.feed('Here you go:\\n```json\\n{"key": ')
+        >>> scanner.feed('"value"}\\n```\\n')
+        >>> scanner.close()
+        ['{"key": "value"}']
+    """
+
+    def __init__(self) -> None:
+        self.blocks: list[str] = []
+        self._chunks: list[str] = []
+        # Pieces of the current, not yet terminated line
+        self._pending: list[str] = []
+        self._in_fence = False
+        self._capture = False
+        self._lines: list[str] = []
+
+    @property
+    def text(self) -> str:
+        """The complete text fed so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> None:
+        """Scan the next chunk of the response."""
+        self._chunks.append(chunk)
+        if "\n" not in chunk:
+            # Joining the partial line on every chunk would make a long line quadratic
+            self._pending.append(chunk)
+            return
+        lines = chunk.split("\n")
+        lines[0] = "".join(self._pending) + lines[0]
+        self._pending = [lines.pop()]
+        for line in lines:
+            self._scan_line(line)
+
+    def close(self) -> list[str]:
+        """Scan the trailing partial line and return the collected blocks.
+
+        Returns:
+            list[str]: Contents of the closed JSON fences, in order of appearance.
+        """
+        line = "".join(self._pending)
+        self._pending = []
+        if line:
+            self._scan_line(line)
+        return self.blocks
+
+    def _scan_line(self, line: str) -> None:
+        position = 0
+        while True:
+            fence = line.find(FENCE, position)
+            if self._in_fence:
+                if fence == -1:
+                    if self._capture:
+                        self._lines.append(line[position:])
+                    return
+                if self._capture:
+                    self._lines.append(line[position:fence])
+                    self.blocks.append("\n".join(self._lines).strip())
+                self._in_fence = False
+                self._lines = []
+            elif fence == -1:
+                return
+            else:
+                self._in_fence = True
+                self._capture, fence = self._read_language(line, fence + len(FENCE))
+                position = fence
+                continue
+            position = fence + len(FENCE)
+
+    @staticmethod
+    def _read_language(line: str, position: int) -> tuple[bool, int]:
+        # Returns whether the fence is captured and where its content starts
+        while position < len(line) and line[position] in " \t":
+            position += 1
+        if line[position : position + 1] in JSON_START_CHARS:
+            # ```{"key": "value"}``` without a language
+            return True, position
+        end = position
+        while end < len(line) and not line[end].isspace() and line[end] != "`":
+            end += 1
+        return line[position:end].lower() in JSON_FENCE_LANGUAGES, end
+
+
+def find_json_blocks(text: str) -> list[str]:
+    """Return the contents of every JSON (or unlabelled) code fence in `text`."""
+    scanner = JSONScanner()
+    scanner.feed(text)
+    return scanner.close()
+
+
+def _loads(candidate: str) -> tuple[bool, Any]:
+    try:
+        return True, json.loads(candidate)
+    except json.JSONDecodeError:
+        return False, None
+
+
+def _looks_like_json(text: str) -> bool:
+    return text[:1] in JSON_START_CHARS or text in JSON_LITERALS
+
+
+def extract_json_blocks(text: str) -> list[Any]:
+    """Parse every JSON code block of a response, skipping blocks that are not valid JSON.
+
+    Args:
+        text: The model response.
+
+    Returns:
+        list[Any]: The parsed blocks in order of appearance.
+    """
+    values = []
+    for block in find_json_blocks(text):
+        ok, value = _loads(block)
+        if ok:
+            values.append(value)
+    return values
+
+
+def _select(text: str, blocks: list[str]) -> tuple[bool, Any]:
+    for block in blocks:
+        ok, value = _loads(block)
+        if ok:
+            return True, value
+
+    stripped = text.strip()
+    if not blocks and _looks_like_json(stripped):
+        return _loads(stripped)
+    return False, None
+
+
+def extract_json(text: str, schema: Optional[type[BaseModel]] = None) -> Any:
+    """Extract the JSON document from a model response.
+
+    The first valid JSON code block wins. A response without any code block is parsed as a
+    whole when it looks like JSON. Anything else is returned unchanged.
+
+    Args:
+        text: The model response.
+        schema: Optional pydantic model the JSON document must conform to.
+
+    Returns:
+        The parsed JSON value (validated and dumped through `schema` when given), or `text`.
+
+    Raises:
+        ValueError: If `schema` is given and the response holds no JSON document conforming to it.
+            Pydantic's ValidationError is a ValueError as well.
+
+    Example:
+        >>> extract_json('```python\\nprint(1)\\n```\\n```json\\n{"key": "value"}\\n```')
+        {'key': 'value'}
+        >>> extract_json("not json")
+        'not json'
+    """
+    return _finish(text, find_json_blocks(text), schema)
+
+
+def _finish(text: str, blocks: list[str], schema: Optional[type[BaseModel]]) -> Any:
+    found, value = _select(text, blocks)
+    if schema is None:
+        return value if found else text
+    if not found:
+        raise ValueError(f"No JSON found in response for schema {schema.__name__}")
+    return schema.model_validate(value).model_dump(mode="json")
+
+
+def extract_json_from_scanner(scanner: JSONScanner, schema: Optional[type[BaseModel]] = None) -> Any:
+    """Like extract_json, for a response that was fed to a JSONScanner chunk by chunk."""
+    return _finish(scanner.text, scanner.close(), schema)
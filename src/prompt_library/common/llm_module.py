@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import functools
+import hashlib
 import os
+import time
 
-from typing import Any
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, cast
 
 import llm
 
@@ -10,11 +16,52 @@ from dotenv import load_dotenv
 from loguru import logger
 from mako.template import Template
 
+from prompt_library.common.model_registry import get_default_registry
+from prompt_library.common.response_cache import ResponseCache
+from prompt_library.common.typings import PromptExecutionResult
+
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+TEMPLATE_CACHE_SIZE = 512
+
+
+def _preprocess_template(prompt: str) -> str:
+    # Ensure proper Mako syntax by adding colons
+    return prompt.replace("% if ", "% if ").replace("\n% endif", "\n% endif:")
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text: str) -> Template:
+    """Compile a Mako template, reusing the compiled form for templates seen before.
+
+    When the MAKO_MODULE_DIRECTORY environment variable is set, the template source is stored
+    there under its SHA-256 digest and Mako keeps the generated Python module next to it, so
+    compiled templates also survive restarts.
+
+    Args:
+        text: The Mako template text
+
+    Returns:
+        Template: The compiled template
+    """
+    module_directory = os.getenv("MAKO_MODULE_DIRECTORY")
+    if not module_directory:
+        return Template(text)
+
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    filename = os.path.join(module_directory, "templates", f"{digest}.mako")
+    if not os.path.exists(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_filename, filename)
+    return Template(filename=filename, uri=f"{digest}.mako", module_directory=module_directory)
+
+
 def conditional_render(
     prompt: str, context: dict[str, Any], start_delim: str = "% if", end_delim: str = "% endif"
 ) -> str:
@@ -22,7 +69,7 @@ def conditional_render(
 
     This function takes a template string containing conditional blocks and renders it using
     the provided context variables. The conditional blocks are delimited by customizable
-    start and end markers.
+    start and end markers. Compiled templates are cached, see compile_template.
 
     Args:
         prompt: The template string containing conditional blocks
@@ -39,31 +86,26 @@ def conditional_render(
         >>> conditional_render(template, context)
         'Hello World!'
     """
-    # Ensure proper Mako syntax by adding colons
-    prompt = prompt.replace("% if ", "% if ").replace("\n% endif", "\n% endif:")
-    """Render a template with conditional blocks using Mako templating.
+    template = compile_template(_preprocess_template(prompt))
+    return template.render(**context)
 
-    This function takes a template string containing conditional blocks and renders it using
-    the provided context variables. The conditional blocks are delimited by customizable
-    start and end markers.
+
+def conditional_render_many(prompt: str, contexts: Iterable[dict[str, Any]]) -> list[str]:
+    """Render one conditional template against many contexts, compiling it only once.
 
     Args:
         prompt: The template string containing conditional blocks
-        context: Dictionary mapping variable names to values for template rendering
-        start_delim: Starting delimiter for conditional blocks. Defaults to "% if"
-        end_delim: Ending delimiter for conditional blocks. Defaults to "% endif"
+        contexts: Contexts to render, e.g. the rows of a dataset
 
     Returns:
-        str: The rendered template string with conditionals evaluated
+        list[str]: The rendered templates in the order of `contexts`
 
     Example:
-        >>> template = "% if show_greeting\nHello ${name}!\n% endif"
-        >>> context = {"show_greeting": True, "name": "World"}
-        >>> conditional_render(template, context)
-        'Hello World!'
+        >>> conditional_render_many("Hello ${name}!", [{"name": "A"}, {"name": "B"}])
+        ['Hello A!', 'Hello B!']
     """
-    template = Template(prompt)
-    return template.render(**context)
+    template = compile_template(_preprocess_template(prompt))
+    return [template.render(**context) for context in contexts]
 
 
 def parse_markdown_backticks(markdown_text: str) -> str:
@@ -95,7 +137,7 @@ def parse_markdown_backticks(markdown_text: str) -> str:
     return markdown_text.strip()
 
 
-def prompt(model: llm.Model, prompt_text: str) -> str:
+def prompt(model: llm.Model, prompt_text: str, cache: ResponseCache | None = None) -> str:
     """Send a basic prompt to the model and get its response.
 
     This function sends a prompt to the specified LLM model without streaming
@@ -104,6 +146,10 @@ def prompt(model: llm.Model, prompt_text: str) -> str:
     Args:
         model: The LLM model instance to use for generating the response
         prompt_text: The prompt text to send to the model
+        cache: Optional response cache. When given, a previous response for the same
+            model and prompt is returned without calling the provider. The call uses the
+            provider's default temperature, so a cache created with
+            `cache_nonzero_temperature=False` does not serve it.
 
     Returns:
         str: The model's generated response text
@@ -114,11 +160,19 @@ def prompt(model: llm.Model, prompt_text: str) -> str:
         >>> print(response)
         '4'
     """
-    res = model.prompt(prompt_text, stream=False)
-    return res.text()
+
+    def fetch() -> str:
+        res = model.prompt(prompt_text, stream=False)
+        return res.text()
+
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(model.model_id, prompt_text, None, fetch)
 
 
-def prompt_with_temp(model: llm.Model, prompt_text: str, temperature: float = 0.7) -> str:
+def prompt_with_temp(
+    model: llm.Model, prompt_text: str, temperature: float = 0.7, cache: ResponseCache | None = None
+) -> str:
     """Send a prompt to the model with a specified temperature setting.
 
     This function sends a prompt to the model with temperature control for response
@@ -131,6 +185,8 @@ def prompt_with_temp(model: llm.Model, prompt_text: str, temperature: float = 0.
         temperature: Controls randomness in the response. Higher values (e.g., 1.0)
             make output more random, lower values make it more deterministic.
             Defaults to 0.7. Note: Ignored for O1 and Gemini models.
+        cache: Optional response cache. When given, a previous response for the same
+            model, prompt and temperature is returned without calling the provider.
 
     Returns:
         str: The model's generated response text
@@ -142,13 +198,90 @@ def prompt_with_temp(model: llm.Model, prompt_text: str, temperature: float = 0.
         'Once upon a time...'
     """
     model_id = model.model_id
-    if "o1" in model_id or "gemini" in model_id:
+    fixed_temperature = "o1" in model_id or "gemini" in model_id
+    if fixed_temperature:
         temperature = 1
-        res = model.prompt(prompt_text, stream=False)
+
+    def fetch() -> str:
+        if fixed_temperature:
+            res = model.prompt(prompt_text, stream=False)
+        else:
+            res = model.prompt(prompt_text, stream=False, temperature=temperature)
         return res.text()
 
-    res = model.prompt(prompt_text, stream=False, temperature=temperature)
-    return res.text()
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(model_id, prompt_text, {"temperature": temperature}, fetch)
+
+
+class PromptStream:
+    """Iterator over the text chunks of a streamed model response.
+
+    Records when iteration started and how long the first chunk took to arrive, and keeps
+    the chunks seen so far so the full text is available once the stream is exhausted.
+
+    Args:
+        chunks: Iterable of text chunks, e.g. an `llm.Response` created with `stream=True`
+    """
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks = iter(chunks)
+        self._parts: list[str] = []
+        self.started_at: float | None = None
+        self.time_to_first_token: float | None = None
+        self.done = False
+
+    def __iter__(self) -> PromptStream:
+        return self
+
+    def __next__(self) -> str:
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.done = True
+            raise
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self.started_at
+        self._parts.append(chunk)
+        return chunk
+
+    def text(self) -> str:
+        """Consume the rest of the stream and return the full response text."""
+        for _ in self:
+            pass
+        return "".join(self._parts)
+
+
+def prompt_stream(model: llm.Model, prompt_text: str, temperature: float | None = None) -> PromptStream:
+    """Send a prompt to the model and stream the response as it is generated.
+
+    Temperature handling follows prompt_with_temp: it is fixed for O1 and Gemini models.
+
+    Args:
+        model: The LLM model instance to use for generating the response
+        prompt_text: The prompt text to send to the model
+        temperature: Optional temperature. None uses the model's default.
+
+    Returns:
+        PromptStream: Iterator yielding text chunks, exposing `time_to_first_token` once
+            the first chunk has arrived and `text()` for the full response
+
+    Example:
+        >>> model = build_sonnet_3_5()
+        >>> stream = prompt_stream(model, "Write a haiku")
+        >>> for chunk in stream:
+        ...     print(chunk, end="")
+        >>> stream.time_to_first_token
+        0.42
+    """
+    model_id = model.model_id
+    if temperature is None or "o1" in model_id or "gemini" in model_id:
+        res = model.prompt(prompt_text, stream=True)
+    else:
+        res = model.prompt(prompt_text, stream=True, temperature=temperature)
+    return PromptStream(res)
 
 
 def get_model_name(model: llm.Model) -> str:
@@ -171,6 +304,140 @@ def get_model_name(model: llm.Model) -> str:
     return model.model_id
 
 
+def get_provider_key(model: llm.Model) -> str:
+    """Get the key identifying the provider serving a model.
+
+    Models that need an API key are grouped by the name of that key (e.g. "openai",
+    "claude", "gemini"); local models fall back to the module of their plugin.
+
+    Args:
+        model: The LLM model instance
+
+    Returns:
+        str: The provider key used to group concurrency limits
+    """
+    return getattr(model, "needs_key", None) or type(model).__module__
+
+
+def prompt_many(
+    models: Sequence[llm.Model],
+    prompts: Sequence[str],
+    temperature: float | None = None,
+    max_workers: int = 8,
+    provider_limits: dict[str, int] | None = None,
+    default_provider_limit: int = 4,
+    cache: ResponseCache | None = None,
+    on_result: Callable[[PromptExecutionResult], None] | None = None,
+) -> list[PromptExecutionResult]:
+    """Send every prompt to every model concurrently.
+
+    The cartesian product of prompts and models is fanned out over a thread pool of
+    `max_workers`, with at most `provider_limits[provider]` (or `default_provider_limit`)
+    calls in flight per provider. A failing call does not abort the batch; its error is
+    reported on the corresponding result instead.
+
+    Args:
+        models: The LLM model instances to prompt
+        prompts: The prompt texts to send to every model
+        temperature: Temperature passed to prompt_with_temp. None uses prompt() with the
+            model's default temperature.
+        max_workers: Maximum number of calls in flight overall. Defaults to 8
+        provider_limits: Maximum number of calls in flight per provider key (see get_provider_key)
+        default_provider_limit: Limit for providers missing from `provider_limits`. Defaults to 4
+        cache: Optional response cache shared by all calls
+        on_result: Optional callback invoked with each result as soon as it completes,
+            e.g. to advance a progress bar
+
+    Returns:
+        list[PromptExecutionResult]: One result per (prompt, model) pair, ordered by prompt
+            and then by model regardless of completion order
+
+    Raises:
+        ValueError: If max_workers or a provider limit is less than 1
+
+    Example:
+        >>> results = prompt_many(build_openai_latest_and_fastest(), ["ping", "pong"], temperature=0)
+        >>> [(r.prompt_index, r.model_id) for r in results]
+        [(0, 'gpt-4o'), (0, 'gpt-4o-mini'), (1, 'gpt-4o'), (1, 'gpt-4o-mini')]
+    """
+    if max_workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+    provider_limits = provider_limits or {}
+    if default_provider_limit < 1 or any(limit < 1 for limit in provider_limits.values()):
+        raise ValueError("Provider limits must be at least 1")
+
+    # Pending (prompt_index, model_index) pairs per provider, in result order
+    pending: dict[str, collections.deque[tuple[int, int]]] = {}
+    for prompt_index in range(len(prompts)):
+        for model_index, model in enumerate(models):
+            pending.setdefault(get_provider_key(model), collections.deque()).append((prompt_index, model_index))
+    in_flight = dict.fromkeys(pending, 0)
+
+    def execute(prompt_index: int, model_index: int) -> PromptExecutionResult:
+        model = models[model_index]
+        result = PromptExecutionResult(prompt_index=prompt_index, model_index=model_index, model_id=model.model_id)
+        start = time.perf_counter()
+        try:
+            if temperature is None:
+                result.output = prompt(model, prompts[prompt_index], cache=cache)
+            else:
+                result.output = prompt_with_temp(model, prompts[prompt_index], temperature, cache=cache)
+        except Exception as e:
+            logger.error(f"Prompt {prompt_index} failed on {model.model_id}: {e!s}")
+            result.error = f"{type(e).__name__}: {e!s}"
+        result.duration_seconds = time.perf_counter() - start
+        return result
+
+    results: list[PromptExecutionResult | None] = [None] * (len(prompts) * len(models))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: dict[concurrent.futures.Future[PromptExecutionResult], str] = {}
+
+        def dispatch() -> None:
+            # Only hand calls to the pool when their provider has a free slot, so a throttled
+            # provider never ties up workers that another provider could use
+            for provider, queue in pending.items():
+                limit = provider_limits.get(provider, default_provider_limit)
+                while queue and in_flight[provider] < limit and len(running) < max_workers:
+                    running[executor.submit(execute, *queue.popleft())] = provider
+                    in_flight[provider] += 1
+
+        dispatch()
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                in_flight[running.pop(future)] -= 1
+                result = future.result()
+                results[result.prompt_index * len(models) + result.model_index] = result
+                if on_result is not None:
+                    on_result(result)
+            dispatch()
+
+    return cast(list[PromptExecutionResult], results)
+
+
+def build_stack(name: str) -> list[llm.Model]:
+    """Get a named model stack from the shared model registry.
+
+    Unlike the build_* helpers below, models are constructed once per process and reused,
+    so re-running a notebook cell does not walk every installed `llm` plugin again.
+
+    Args:
+        name: Name of the stack, e.g. "o1_series" or "openai_latest_and_fastest"
+            (see model_registry.DEFAULT_STACKS)
+
+    Returns:
+        list[llm.Model]: The configured models of the stack
+
+    Raises:
+        KeyError: If no stack is registered under `name`
+
+    Example:
+        >>> o1_mini, o1_preview = build_stack("o1_series")
+    """
+    return get_default_registry().get_stack(name)
+
+
 def build_sonnet_3_5() -> llm.Model:
     """Build and configure a Claude 3.5 Sonnet model instance.
 
@@ -250,8 +517,6 @@ def build_big_3_plus_mini_models():
     gpt4_o_mini_model: llm.Model = llm.get_model("gpt-4o-mini")
     gpt4_o_mini_model.key = OPENAI_API_KEY
 
-    chatgpt_4o_latest_model = build_latest_openai()
-
     return (
         sonnet_3_5_model,
         gpt4_o_model,
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from collections.abc import Sequence
+
+import llm
+
+from loguru import logger
+
+from prompt_library.common.typings import ModelSpec
+
+
+ANTHROPIC = "ANTHROPIC_API_KEY"
+OPENAI = "OPENAI_API_KEY"
+GEMINI = "GEMINI_API_KEY"
+
+# Models used by the build_* helpers in llm_module, keyed by the name passed to llm.get_model
+DEFAULT_MODEL_SPECS: dict[str, ModelSpec] = {
+    "claude-3.5-sonnet": ModelSpec(model_id="claude-3.5-sonnet", api_key_env=ANTHROPIC),
+    "4o": ModelSpec(model_id="4o", api_key_env=OPENAI),
+    "gpt-4o": ModelSpec(model_id="gpt-4o", api_key_env=OPENAI),
+    "gpt-4o-mini": ModelSpec(model_id="gpt-4o-mini", api_key_env=OPENAI),
+    "o1-mini": ModelSpec(model_id="o1-mini", api_key_env=OPENAI),
+    "o1-preview": ModelSpec(model_id="o1-preview", api_key_env=OPENAI),
+    "gemini-1.5-pro-latest": ModelSpec(model_id="gemini-1.5-pro-latest", api_key_env=GEMINI),
+    "gemini-1.5-flash-latest": ModelSpec(model_id="gemini-1.5-flash-latest", api_key_env=GEMINI),
+    "gemini-1.5-pro-002": ModelSpec(model_id="gemini-1.5-pro-002", api_key_env=GEMINI),
+    "gemini-1.5-flash-002": ModelSpec(model_id="gemini-1.5-flash-002", api_key_env=GEMINI),
+    "llama3.2": ModelSpec(model_id="llama3.2"),
+    "llama3.2:1b": ModelSpec(model_id="llama3.2:1b"),
+    "phi3.5:latest": ModelSpec(model_id="phi3.5:latest"),
+    "qwen2.5:latest": ModelSpec(model_id="qwen2.5:latest"),
+}
+
+# Named model stacks, mirroring the build_* helpers in llm_module
+DEFAULT_STACKS: dict[str, list[str]] = {
+    "sonnet_3_5": ["claude-3.5-sonnet"],
+    "mini": ["gpt-4o-mini"],
+    "big_3": ["claude-3.5-sonnet", "4o", "gemini-1.5-pro-latest"],
+    "latest_openai": ["gpt-4o"],
+    "big_3_plus_mini": ["claude-3.5-sonnet", "4o", "gemini-1.5-pro-latest", "gpt-4o-mini"],
+    "gemini_duo": ["gemini-1.5-pro-latest", "gemini-1.5-flash-latest"],
+    "ollama": ["llama3.2", "llama3.2:1b"],
+    "ollama_slm": ["llama3.2", "phi3.5:latest", "qwen2.5:latest"],
+    "openai_model_stack": ["gpt-4o-mini", "gpt-4o", "o1-preview", "o1-mini"],
+    "openai_latest_and_fastest": ["gpt-4o", "gpt-4o-mini"],
+    "o1_series": ["o1-mini", "o1-preview"],
+    "small_cheap_and_fast": ["gpt-4o-mini", "gemini-1.5-flash-002"],
+    "gemini_1_2_002": ["gemini-1.5-pro-002", "gemini-1.5-flash-002"],
+}
+
+
+class ModelRegistry:
+    """Lazily constructed, memoized `llm.Model` instances addressed by name.
+
+    `llm.get_model` walks every installed plugin on each call. The registry asks `llm` for its
+    alias table once, builds a model the first time its name is requested, sets its API key from
+    the environment and hands out the same instance afterwards.
+
+    Args:
+        specs: Model specs keyed by name. Defaults to DEFAULT_MODEL_SPECS.
+        stacks: Lists of model names keyed by stack name. Defaults to DEFAULT_STACKS.
+
+    Example:
+        >>> registry = ModelRegistry()
+        >>> o1_mini, o1_preview = registry.get_stack("o1_series")
+        >>> registry.get("o1-mini") is o1_mini
+        True
+    """
+
+    def __init__(
+        self,
+        specs: dict[str, ModelSpec] | None = None,
+        stacks: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.specs = dict(DEFAULT_MODEL_SPECS if specs is None else specs)
+        self.stacks = {name: list(names) for name, names in (DEFAULT_STACKS if stacks is None else stacks).items()}
+        self._aliases: dict[str, llm.Model] | None = None
+        self._models: dict[str, llm.Model] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, spec: ModelSpec) -> None:
+        """Add or replace a model spec, dropping any instance built from the old one."""
+        with self._lock:
+            self.specs[name] = spec
+            self._models.pop(name, None)
+
+    def register_stack(self, name: str, model_names: Sequence[str]) -> None:
+        """Add or replace a named stack of models."""
+        with self._lock:
+            self.stacks[name] = list(model_names)
+
+    def resolve(self, name: str) -> ModelSpec:
+        """Return the spec for a model name; unknown names are passed to `llm` as-is, without a key."""
+        return self.specs.get(name) or ModelSpec(model_id=name)
+
+    def _lookup(self, model_id: str) -> llm.Model:
+        if self._aliases is None:
+            self._aliases = llm.get_model_aliases()
+        model = self._aliases.get(model_id)
+        if model is None:
+            # Let llm raise its usual UnknownModelError
+            return llm.get_model(model_id)
+        return model
+
+    def preload(self) -> None:
+        """Load the alias table of the installed `llm` plugins ahead of the first `get`."""
+        with self._lock:
+            if self._aliases is None:
+                self._aliases = llm.get_model_aliases()
+
+    def get(self, name: str) -> llm.Model:
+        """Return the model registered under `name`, constructing it on first use.
+
+        Raises:
+            llm.UnknownModelError: If no installed plugin provides the model.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                spec = self.resolve(name)
+                logger.debug(f"Constructing model {name} ({spec.model_id})")
+                model = self._lookup(spec.model_id)
+                if spec.api_key_env is not None:
+                    model.key = os.getenv(spec.api_key_env)
+                self._models[name] = model
+            return model
+
+    def get_stack(self, name: str) -> list[llm.Model]:
+        """Return the models of a named stack, in the order they were declared.
+
+        Raises:
+            KeyError: If no stack is registered under `name`.
+        """
+        if name not in self.stacks:
+            raise KeyError(f"Unknown model stack: {name}")
+        return [self.get(model_name) for model_name in self.stacks[name]]
+
+    def clear(self) -> None:
+        """Forget every constructed model and the cached alias table, e.g. after installing a plugin."""
+        with self._lock:
+            self._models.clear()
+            self._aliases = None
+
+
+_default_registry: ModelRegistry | None = None
+_default_registry_lock = threading.Lock()
+
+
+def get_default_registry() -> ModelRegistry:
+    """Return the process-wide registry shared by notebooks and CLI commands."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
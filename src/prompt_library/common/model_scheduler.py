@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import llm
+
+from loguru import logger
+
+from prompt_library.common.llm_module import get_provider_key
+from prompt_library.common.typings import RateLimit, SchedulerStats
+
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server side failures
+TRANSIENT_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+TRANSIENT_ERROR_NAMES = (
+    "RateLimit",
+    "Timeout",
+    "APIConnection",
+    "Overloaded",
+    "ServiceUnavailable",
+    "InternalServer",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in a prompt (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return whether a failed model call is worth retrying.
+
+    Provider SDKs raise different exception types, so this looks for an HTTP status code on the
+    exception (or its response) and falls back to well-known exception names.
+
+    Args:
+        exc: The exception raised by the model call.
+
+    Returns:
+        bool: True for rate limits, timeouts, connection problems and server errors.
+    """
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+
+    status_code = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in TRANSIENT_STATUS_CODES
+
+    return any(name in type(exc).__name__ for name in TRANSIENT_ERROR_NAMES)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`.
+
+    The bucket holds at most one minute worth of tokens. Callers reserve tokens up front and are
+    told how long to wait before their reservation is covered, so concurrent callers queue fairly
+    instead of all retrying at once.
+    """
+
+    def __init__(self, rate_per_minute: float) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("Rate must be positive")
+        self.capacity = rate_per_minute
+        self.rate_per_second = rate_per_minute / 60
+        self._tokens = rate_per_minute
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take `amount` tokens from the bucket.
+
+        Returns:
+            float: Seconds to wait before the reserved tokens are available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+            self._updated_at = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+
+class ModelScheduler:
+    """Shared scheduler throttling and retrying model calls per provider.
+
+    Each provider key (see llm_module.get_provider_key) gets token buckets for requests per
+    minute and tokens per minute from `rate_limits`; providers without a limit are not throttled.
+    Calls failing with a transient error are retried with jittered exponential backoff.
+
+    Args:
+        rate_limits: Rate limits keyed by provider key, e.g. {"openai": RateLimit(requests_per_minute=500)}.
+        max_retries: Maximum number of retries of a transient failure. Defaults to 5.
+        base_delay: Backoff before the first retry in seconds, doubled on every retry. Defaults to 1.
+        max_delay: Upper bound of the backoff in seconds. Defaults to 60.
+        sleep: Function used to wait, replaceable in tests.
+
+    Example:
+        >>> scheduler = ModelScheduler({"openai": RateLimit(requests_per_minute=60)})
+        >>> models = [scheduler.wrap(model) for model in build_openai_model_stack()]
+        >>> FusionChain.run_parallel(context, models, llm_module.prompt, prompts, evaluator, get_model_name)
+    """
+
+    def __init__(
+        self,
+        rate_limits: dict[str, RateLimit] | None = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if max_retries < 0:
+            raise ValueError("Max retries cannot be negative")
+        self.rate_limits = rate_limits or {}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._request_buckets: dict[str, TokenBucket] = {}
+        self._token_buckets: dict[str, TokenBucket] = {}
+        self._stats: dict[str, SchedulerStats] = {}
+
+        for provider, rate_limit in self.rate_limits.items():
+            if rate_limit.requests_per_minute:
+                self._request_buckets[provider] = TokenBucket(rate_limit.requests_per_minute)
+            if rate_limit.tokens_per_minute:
+                self._token_buckets[provider] = TokenBucket(rate_limit.tokens_per_minute)
+
+    def throttle(self, provider: str, estimated_tokens: int = 0) -> float:
+        """Block until the provider's rate limits allow another call and count it.
+
+        Args:
+            provider: The provider key the call is counted against.
+            estimated_tokens: Tokens the call is expected to use, counted against tokens per minute.
+
+        Returns:
+            float: Seconds spent waiting in the queue.
+        """
+        wait = 0.0
+        if provider in self._request_buckets:
+            wait = max(wait, self._request_buckets[provider].reserve(1))
+        if provider in self._token_buckets and estimated_tokens:
+            wait = max(wait, self._token_buckets[provider].reserve(estimated_tokens))
+        if wait > 0:
+            self._sleep(wait)
+        self._record(provider, wait=wait)
+        return wait
+
+    def _record(self, provider: str, wait: float = 0.0, retried: bool = False, failed: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(provider, SchedulerStats())
+            if retried:
+                stats.retries += 1
+            elif failed:
+                stats.failures += 1
+            else:
+                stats.calls += 1
+                stats.total_wait_seconds += wait
+                stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay before retry number `attempt` (starting at 0)."""
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(delay / 2, delay)  # noqa: S311
+
+    def call(self, provider: str, fn: Callable[[], T], estimated_tokens: int = 0) -> T:
+        """Run a model call within the provider's rate limits, retrying transient failures.
+
+        Args:
+            provider: The provider key the call is counted against.
+            fn: Function performing the call.
+            estimated_tokens: Tokens the call is expected to use, counted against tokens per minute.
+
+        Returns:
+            The result of `fn`.
+
+        Raises:
+            Exception: The last error once retries are exhausted, or any non-transient error.
+        """
+        attempt = 0
+        while True:
+            self.throttle(provider, estimated_tokens)
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    self._record(provider, failed=True)
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"Transient error from {provider} ({e!s}), retrying in {delay:.1f}s")
+                self._record(provider, retried=True)
+                self._sleep(delay)
+                attempt += 1
+
+    def stats(self, provider: str | None = None) -> SchedulerStats:
+        """Return call, retry and queue wait metrics for one provider or summed over all of them."""
+        with self._lock:
+            if provider is not None:
+                return self._stats.get(provider, SchedulerStats()).model_copy()
+            total = SchedulerStats()
+            for stats in self._stats.values():
+                total.calls += stats.calls
+                total.retries += stats.retries
+                total.failures += stats.failures
+                total.total_wait_seconds += stats.total_wait_seconds
+                total.max_wait_seconds = max(total.max_wait_seconds, stats.max_wait_seconds)
+            return total
+
+    def wrap(self, model: llm.Model) -> ScheduledModel:
+        """Wrap a model so that every `prompt` call goes through this scheduler."""
+        return ScheduledModel(model, self)
+
+
+class ScheduledModel:
+    """Drop-in stand-in for an `llm.Model` whose prompts are throttled and retried by a scheduler.
+
+    `llm` responses are lazy, so non-streaming prompts are resolved inside the scheduler; the
+    returned response already holds its text. Streaming prompts are throttled but not retried,
+    as chunks may already have been consumed when an error occurs. Every other attribute is
+    delegated to the wrapped model.
+    """
+
+    def __init__(self, model: llm.Model, scheduler: ModelScheduler) -> None:
+        self.model = model
+        self.scheduler = scheduler
+        self.provider = get_provider_key(model)
+
+    def prompt(self, prompt: str, *args: Any, stream: bool = True, **kwargs: Any) -> Any:
+        if stream:
+            self.scheduler.throttle(self.provider, estimate_tokens(prompt))
+            return self.model.prompt(prompt, *args, stream=stream, **kwargs)
+
+        def send() -> Any:
+            response = self.model.prompt(prompt, *args, stream=stream, **kwargs)
+            response.text()
+            return response
+
+        return self.scheduler.call(self.provider, send, estimate_tokens(prompt))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def __repr__(self) -> str:
+        return f"ScheduledModel({self.model!r})"
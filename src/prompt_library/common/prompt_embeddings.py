@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, Optional
+
+from loguru import logger
+
+from prompt_library.common.prompt_index import PromptIndex, load_prompt_index
+from prompt_library.common.typings import SemanticSearchResult
+
+
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_COLLECTION = "prompt_library"
+METADATA_FILE = "metadata.json"
+
+EmbedFunction = Callable[[Sequence[str]], Sequence[Sequence[float]]]
+
+
+def sentence_transformer_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL, batch_size: int = 32) -> EmbedFunction:
+    """Build an embedding function backed by a local sentence-transformers model.
+
+    The model is loaded on the first call, so creating the function is cheap.
+
+    Args:
+        model_name: Name or path of the sentence-transformers model.
+        batch_size: Number of texts encoded per forward pass.
+
+    Returns:
+        A function turning a batch of texts into normalized embeddings.
+    """
+    model: Any = None
+    lock = threading.Lock()
+
+    def embed(texts: Sequence[str]) -> Sequence[Sequence[float]]:
+        nonlocal model
+        with lock:
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+
+                logger.info(f"Loading embedding model {model_name}")
+                model = SentenceTransformer(model_name)
+        return model.encode(list(texts), batch_size=batch_size, normalize_embeddings=True).tolist()
+
+    return embed
+
+
+class SemanticPromptIndex:
+    """Persisted vector index of prompt embeddings for nearest-neighbour retrieval by intent.
+
+    Vectors live in a local Chroma collection and are keyed by the SHA-256 digest of the prompt
+    text, taken from the PromptIndex manifest. A sync therefore only embeds prompts whose content
+    is new; unchanged, renamed or duplicated prompts are never embedded again. Switching to another
+    embedding model resets the collection, as vectors of different models are not comparable.
+
+    Args:
+        persist_directory: Where Chroma stores the collection. Defaults to the PROMPT_VECTOR_DIR
+            environment variable.
+        collection_name: Name of the Chroma collection. Defaults to "prompt_library".
+        model_name: sentence-transformers model used for embeddings. Defaults to all-MiniLM-L6-v2.
+        batch_size: Number of prompts embedded and written per batch. Defaults to 32.
+        embed: Optional embedding function replacing the sentence-transformers model.
+
+    Example:
+        >>> index = load_prompt_index("./src/prompt_library/data/prompt_lib")
+        >>> semantic_index = SemanticPromptIndex()
+        >>> semantic_index.sync(index)
+        >>> [result.path for result in semantic_index.query("write lore for a video game", limit=1)]
+        ['lore-writing/helldivers2/johnhelldiver/prompt.xml']
+    """
+
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        collection_name: str = DEFAULT_COLLECTION,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        batch_size: int = 32,
+        embed: Optional[EmbedFunction] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        self.persist_directory = persist_directory or os.getenv(
+            "PROMPT_VECTOR_DIR", "./src/prompt_library/data/prompt_vectors"
+        )
+        self.collection_name = collection_name
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.embed = embed or sentence_transformer_embedder(model_name, batch_size)
+        self._collection: Optional[Collection] = None
+        self._paths: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def collection(self) -> Collection:
+        """The Chroma collection, opened (and created) on first use."""
+        if self._collection is None:
+            import chromadb
+
+            from chromadb.config import Settings
+
+            client = chromadb.PersistentClient(
+                path=self.persist_directory, settings=Settings(anonymized_telemetry=False)
+            )
+            metadata = {"hnsw:space": "cosine", "embedding_model": self.model_name}
+            collection = client.get_or_create_collection(self.collection_name, metadata=metadata)
+            if (collection.metadata or {}).get("embedding_model") != self.model_name:
+                logger.warning(f"Embedding model changed to {self.model_name}, resetting {self.collection_name}")
+                client.delete_collection(self.collection_name)
+                collection = client.create_collection(self.collection_name, metadata=metadata)
+            self._collection = collection
+        return self._collection
+
+    @staticmethod
+    def _paths_by_digest(index: PromptIndex) -> dict[str, list[str]]:
+        paths: dict[str, list[str]] = {}
+        for relative_path in index:
+            if os.path.basename(relative_path) == METADATA_FILE:
+                continue
+            paths.setdefault(index.entry(relative_path).sha256, []).append(relative_path)
+        return paths
+
+    def sync(self, index: PromptIndex, prune: bool = True) -> int:
+        """Embed every prompt of `index` whose content is not in the collection yet.
+
+        Args:
+            index: The refreshed prompt index.
+            prune: Delete vectors of content no longer present in the index. Defaults to True.
+
+        Returns:
+            int: Number of newly embedded prompts.
+        """
+        with self._lock:
+            paths = self._paths_by_digest(index)
+            stored = set(self.collection.get(include=[])["ids"])
+            missing = [digest for digest in paths if digest not in stored]
+
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start : start + self.batch_size]
+                texts = [index[paths[digest][0]] for digest in batch]
+                self.collection.add(
+                    ids=batch,
+                    embeddings=[list(vector) for vector in self.embed(texts)],
+                    metadatas=[{"path": paths[digest][0]} for digest in batch],
+                )
+                logger.debug(f"Embedded {start + len(batch)}/{len(missing)} prompts")
+
+            stale = [digest for digest in stored if digest not in paths]
+            if prune and stale:
+                self.collection.delete(ids=stale)
+
+            self._paths = paths
+            if missing or (prune and stale):
+                logger.info(f"Semantic index updated: {len(missing)} embedded, {len(stale) if prune else 0} removed")
+            return len(missing)
+
+    def query(self, text: str, limit: int = 5) -> list[SemanticSearchResult]:
+        """Return the prompts closest in meaning to `text`.
+
+        Args:
+            text: What the prompt should do, in natural language.
+            limit: Maximum number of results. Defaults to 5.
+
+        Returns:
+            list[SemanticSearchResult]: Closest prompts first, with their cosine distance. Prompts
+            sharing the same content are all returned, with the same distance.
+        """
+        (embedding,) = self.embed([text])
+        response = self.collection.query(
+            query_embeddings=[list(embedding)], n_results=limit, include=["metadatas", "distances"]
+        )
+
+        results: list[SemanticSearchResult] = []
+        for digest, metadata, distance in zip(
+            response["ids"][0], response["metadatas"][0], response["distances"][0], strict=False
+        ):
+            for path in self._paths.get(digest) or [metadata["path"]]:
+                results.append(SemanticSearchResult(path=path, sha256=digest, distance=distance))
+        return results[:limit]
+
+    def __len__(self) -> int:
+        return self.collection.count()
+
+
+def load_semantic_index(directory: Optional[str] = None, **kwargs: Any) -> tuple[PromptIndex, SemanticPromptIndex]:
+    """Index a prompt directory and embed its new prompts.
+
+    Args:
+        directory: The prompt directory. Defaults to the PROMPT_LIBRARY_DIR environment variable.
+        **kwargs: Options passed to SemanticPromptIndex.
+
+    Returns:
+        Tuple of the refreshed prompt index and its synced semantic index.
+    """
+    if directory is None:
+        directory = os.getenv("PROMPT_LIBRARY_DIR", "./src/prompt_library/data/prompt_lib")
+    index = load_prompt_index(directory)
+    semantic_index = SemanticPromptIndex(**kwargs)
+    semantic_index.sync(index)
+    return index, semantic_index
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+
+from collections.abc import Iterable, Iterator, Mapping
+
+from loguru import logger
+
+from prompt_library.common.typings import PromptFileEntry, PromptIndexChanges
+
+
+MANIFEST_VERSION = 1
+
+
+def default_manifest_path(directory: str) -> str:
+    """Return where the manifest of a prompt directory is stored.
+
+    Manifests live in the PROMPT_INDEX_DIR directory, outside the indexed directory, under a name
+    derived from the directory's absolute path.
+
+    Args:
+        directory: The indexed prompt directory.
+
+    Returns:
+        str: Path of the manifest file.
+    """
+    index_dir = os.getenv("PROMPT_INDEX_DIR", "./src/prompt_library/data/prompt_index")
+    digest = hashlib.sha256(os.path.abspath(directory).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(index_dir, f"{os.path.basename(os.path.normpath(directory))}_{digest}.json")
+
+
+class PromptIndex(Mapping[str, str]):
+    """Read-only mapping of relative file paths to contents, backed by an on-disk manifest.
+
+    The manifest records the size, modification time and SHA-256 digest of every file. A refresh
+    only stats the directory tree; files are read again only when their size or modification time
+    changed, and they only count as modified when their digest changed too. File bodies are read
+    lazily on first access and kept in memory.
+
+    Args:
+        directory: The prompt directory to index.
+        manifest_path: Where to store the manifest. Defaults to default_manifest_path(directory).
+
+    Example:
+        >>> index = PromptIndex("./src/prompt_library/data/prompt_lib")
+        >>> changes = index.refresh()
+        >>> list(index)[:1]
+        ['summarize.xml']
+    """
+
+    def __init__(self, directory: str, manifest_path: str | None = None) -> None:
+        self.directory = directory
+        self.manifest_path = manifest_path or default_manifest_path(directory)
+        self._entries: dict[str, PromptFileEntry] = {}
+        self._bodies: dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION:
+                logger.info(f"Ignoring outdated prompt index manifest: {self.manifest_path}")
+                return
+            self._entries = {path: PromptFileEntry(**entry) for path, entry in manifest["files"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to load prompt index manifest {self.manifest_path}: {e!s}")
+            self._entries = {}
+
+    def _save_manifest(self) -> None:
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "directory": os.path.abspath(self.directory),
+            "files": {path: entry.model_dump() for path, entry in self._entries.items()},
+        }
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _scan(self, prefix: str = "") -> dict[str, os.stat_result]:
+        found: dict[str, os.stat_result] = {}
+        pending = [(prefix, os.path.join(self.directory, prefix) if prefix else self.directory)]
+        while pending:
+            prefix, current_dir = pending.pop()
+            try:
+                with os.scandir(current_dir) as items:
+                    for item in items:
+                        relative_path = os.path.join(prefix, item.name) if prefix else item.name
+                        if item.is_file():
+                            found[relative_path] = item.stat()
+                        elif item.is_dir():
+                            pending.append((relative_path, item.path))
+            except OSError as e:
+                logger.error(f"Failed to read directory {current_dir}: {e!s}")
+        return found
+
+    def _read(self, relative_path: str) -> str:
+        file_path = os.path.join(self.directory, relative_path)
+        logger.debug(f"Reading file: {file_path}")
+        with open(file_path, encoding="utf-8") as f:
+            return f.read()
+
+    def _remove(self, relative_path: str, changes: PromptIndexChanges) -> None:
+        del self._entries[relative_path]
+        self._bodies.pop(relative_path, None)
+        changes.removed.append(relative_path)
+
+    def _update_file(self, relative_path: str, stat: os.stat_result, changes: PromptIndexChanges) -> bool:
+        # Returns whether the manifest entry changed
+        entry = self._entries.get(relative_path)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return False
+
+        try:
+            body = self._read(relative_path)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Failed to read file {os.path.join(self.directory, relative_path)}: {e!s}")
+            if entry is not None:
+                self._remove(relative_path, changes)
+            return False
+
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        self._entries[relative_path] = PromptFileEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=digest)
+        self._bodies[relative_path] = body
+        if entry is None:
+            changes.added.append(relative_path)
+        elif entry.sha256 != digest:
+            changes.modified.append(relative_path)
+        return True
+
+    def _sync(self, found: dict[str, os.stat_result], known: list[str], changes: PromptIndexChanges) -> bool:
+        for relative_path in known:
+            if relative_path not in found and relative_path in self._entries:
+                self._remove(relative_path, changes)
+
+        dirty = False
+        for relative_path, stat in found.items():
+            dirty = self._update_file(relative_path, stat, changes) or dirty
+        return dirty
+
+    def _finish(self, changes: PromptIndexChanges, dirty: bool) -> PromptIndexChanges:
+        if dirty or changes.has_changes:
+            self._save_manifest()
+        logger.debug(
+            f"Indexed {len(self._entries)} files in {self.directory} "
+            f"({len(changes.added)} added, {len(changes.modified)} modified, {len(changes.removed)} removed)"
+        )
+        return changes
+
+    def refresh(self) -> PromptIndexChanges:
+        """Bring the index up to date with the directory, re-reading changed files only.
+
+        Returns:
+            PromptIndexChanges: Relative paths added, modified and removed since the last refresh
+            (or since the manifest was written, for the first refresh of a new process).
+        """
+        with self._lock:
+            if not os.path.exists(self.directory):
+                logger.warning(f"Directory does not exist: {self.directory}")
+                os.makedirs(self.directory, exist_ok=True)
+
+            changes = PromptIndexChanges()
+            dirty = self._sync(self._scan(), list(self._entries), changes)
+            return self._finish(changes, dirty)
+
+    def update(self, relative_paths: Iterable[str]) -> PromptIndexChanges:
+        """Re-check individual paths without rescanning the whole directory.
+
+        Used to apply file system events: a path may name a file or a directory, and may no
+        longer exist, in which case everything indexed at or below it is removed.
+
+        Args:
+            relative_paths: Paths relative to the indexed directory.
+
+        Returns:
+            PromptIndexChanges: Relative paths added, modified and removed.
+        """
+        with self._lock:
+            changes = PromptIndexChanges()
+            dirty = False
+            for relative_path in dict.fromkeys(os.path.normpath(path) for path in relative_paths):
+                if relative_path in (os.curdir, ""):
+                    found = self._scan()
+                    known = list(self._entries)
+                    dirty = self._sync(found, known, changes) or dirty
+                    continue
+
+                file_path = os.path.join(self.directory, relative_path)
+                if os.path.isdir(file_path):
+                    found = self._scan(relative_path)
+                elif os.path.isfile(file_path):
+                    found = {relative_path: os.stat(file_path)}
+                else:
+                    found = {}
+
+                if relative_path in found:
+                    known = [relative_path]
+                else:
+                    dir_prefix = relative_path + os.sep
+                    known = [path for path in self._entries if path == relative_path or path.startswith(dir_prefix)]
+                dirty = self._sync(found, known, changes) or dirty
+            return self._finish(changes, dirty)
+
+    def entry(self, relative_path: str) -> PromptFileEntry:
+        """Return the manifest entry (size, modification time and digest) of a file."""
+        return self._entries[relative_path]
+
+    def __getitem__(self, relative_path: str) -> str:
+        body = self._bodies.get(relative_path)
+        if body is not None:
+            return body
+        with self._lock:
+            if relative_path not in self._entries:
+                raise KeyError(relative_path)
+            body = self._bodies.get(relative_path)
+            if body is None:
+                body = self._bodies[relative_path] = self._read(relative_path)
+            return body
+
+    def __contains__(self, relative_path: object) -> bool:
+        return relative_path in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"PromptIndex({self.directory!r}, files={len(self._entries)})"
+
+
+_indexes: dict[str, PromptIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def load_prompt_index(directory: str) -> PromptIndex:
+    """Return the up to date index of a prompt directory, reusing it within the process.
+
+    Args:
+        directory: The prompt directory to index.
+
+    Returns:
+        PromptIndex: The refreshed index.
+    """
+    key = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = PromptIndex(directory)
+    index.refresh()
+    logger.info(f"Indexed {len(index)} files from {directory}")
+    return index
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import os
+import tempfile
 
 from datetime import datetime
 from pathlib import Path
@@ -10,7 +11,10 @@ from typing import List
 from dotenv import load_dotenv
 from loguru import logger
 
-from prompt_library.common.typings import ModelRanking, MultiLLMPromptExecution
+from prompt_library.common.execution_log import ExecutionLogStore
+from prompt_library.common.prompt_index import PromptIndex, load_prompt_index
+from prompt_library.common.prompt_watcher import watch_prompt_index
+from prompt_library.common.typings import ExecutionLogRecord, ModelRanking, MultiLLMPromptExecution
 
 
 load_dotenv()
@@ -41,7 +45,8 @@ def pull_in_dir_recursively(directory: str) -> dict[str, str]:
     def recursive_read(current_dir: str, prefix: str = "") -> None:
         try:
             items = os.listdir(current_dir)
-            logger.info(f"Reading {len(items)} items in {current_dir}")
+            # Lazy arguments: hot path, only formatted when DEBUG is enabled
+            logger.debug("Reading {} items in {}", len(items), current_dir)
 
             for item in items:
                 item_path = os.path.join(current_dir, item)
@@ -53,7 +58,7 @@ def pull_in_dir_recursively(directory: str) -> dict[str, str]:
 
                     try:
                         with open(item_path, encoding="utf-8") as f:
-                            logger.info(f"Reading file: {item_path}")
+                            logger.debug("Reading file: {}", item_path)
                             result[relative_path] = f.read()
                     except Exception as e:
                         logger.error(f"Failed to read file {item_path}: {e!s}")
@@ -103,17 +108,69 @@ def pull_in_testable_prompts() -> dict[str, str]:
     return pull_in_dir_recursively(testable_prompts_dir)
 
 
-def record_llm_execution(prompt: str, list_model_execution_dict: list[dict], prompt_template: str | None = None) -> str:
+def _index_dir(directory: str, watch: bool) -> PromptIndex:
+    index = load_prompt_index(directory)
+    if watch:
+        watch_prompt_index(index)
+    return index
+
+
+def index_prompt_library(watch: bool = False) -> PromptIndex:
+    """Index the prompt library directory, reading file contents lazily.
+
+    Unlike pull_in_prompt_library, only files that changed since the last load are read up front;
+    see prompt_index.PromptIndex.
+
+    Args:
+        watch: Keep the index current while files are edited, see prompt_watcher.PromptWatcher.
+
+    Returns:
+        A read-only mapping of relative file paths to their contents.
+    """
+    prompt_library_dir = os.getenv("PROMPT_LIBRARY_DIR", "./src/prompt_library/data/prompt_lib")
+    return _index_dir(prompt_library_dir, watch)
+
+
+def index_testable_prompts(watch: bool = False) -> PromptIndex:
+    """Index the testable prompts directory, reading file contents lazily.
+
+    Args:
+        watch: Keep the index current while files are edited, see prompt_watcher.PromptWatcher.
+
+    Returns:
+        A read-only mapping of relative file paths to their contents.
+    """
+    testable_prompts_dir = os.getenv("TESTABLE_PROMPTS_DIR", "./src/prompt_library/data/testable_prompts")
+    return _index_dir(testable_prompts_dir, watch)
+
+
+def record_llm_execution(
+    prompt: str,
+    list_model_execution_dict: list[dict],
+    prompt_template: str | None = None,
+    store: ExecutionLogStore | None = None,
+) -> str:
     """Record the execution results of multiple LLM models for a given prompt.
 
     Args:
         prompt: The prompt text that was executed.
         list_model_execution_dict: List of execution results from different models.
         prompt_template: Optional template name used for the prompt.
+        store: Optional append-only execution log. Without one, every execution is written to its
+            own JSON file in PROMPT_EXECUTIONS_DIR.
 
     Returns:
-        The filepath where the execution record was saved.
+        The filepath where the execution record was saved, or the execution id when a store is used.
     """
+    if store is not None:
+        return store.append(
+            ExecutionLogRecord(
+                prompt=prompt,
+                prompt_template=prompt_template,
+                prompt_responses=list_model_execution_dict,
+            )
+        )
+
     execution_dir = os.getenv("PROMPT_EXECUTIONS_DIR", "./src/prompt_library/data/prompt_executions")
     os.makedirs(execution_dir, exist_ok=True)
 
@@ -160,6 +217,10 @@ def get_rankings() -> list[ModelRanking]:
 def save_rankings(rankings: list[ModelRanking]) -> None:
     """Save model rankings to the configured rankings file.
 
+    The file is written to a temporary file next to it and renamed over it, so readers never see
+    a partially written file. Concurrent sessions should vote through RankingsStore instead, which
+    does not lose updates.
+
     Args:
         rankings: List of ModelRanking objects to save.
     """
@@ -168,8 +229,15 @@ def save_rankings(rankings: list[ModelRanking]) -> None:
     )
     os.makedirs(os.path.dirname(rankings_file), exist_ok=True)
     rankings_dict = [ranking.model_dump() for ranking in rankings]
-    with open(rankings_file, "w", encoding="utf-8") as f:
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=os.path.dirname(rankings_file), suffix=".tmp", delete=False
+    ) as f:
         json.dump(rankings_dict, f, indent=2)
+    try:
+        os.replace(f.name, rankings_file)
+    except OSError:
+        os.unlink(f.name)
+        raise
 
 
 def reset_rankings(model_ids: list[str]) -> list[ModelRanking]:
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+
+from typing import Any, Optional
+
+from loguru import logger
+
+from prompt_library.common.prompt_index import PromptIndex, default_manifest_path, load_prompt_index
+from prompt_library.common.typings import PromptSearchResult
+
+
+METADATA_FILE = "metadata.json"
+SCHEMA_VERSION = 1
+# bm25 column weights: path, name, tags, description, body
+COLUMN_WEIGHTS = (2.0, 5.0, 5.0, 3.0, 1.0)
+
+
+def default_search_db_path(directory: str) -> str:
+    """Return where the search index of a prompt directory is stored, next to its manifest."""
+    return os.path.splitext(default_manifest_path(directory))[0] + ".sqlite3"
+
+
+def parse_metadata(text: str) -> dict[str, Any]:
+    """Pull the searchable fields out of a metadata.json document.
+
+    Args:
+        text: Contents of a metadata.json file.
+
+    Returns:
+        dict: `name`, `tags` (a list) and `description`; missing fields are None or empty.
+    """
+    try:
+        metadata = json.loads(text)
+    except json.JSONDecodeError:
+        return {"name": None, "tags": [], "description": None}
+    if not isinstance(metadata, dict):
+        return {"name": None, "tags": [], "description": None}
+
+    tags = metadata.get("tags", metadata.get("keywords", []))
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    elif not isinstance(tags, list):
+        tags = []
+    return {
+        "name": metadata.get("promptName") or metadata.get("name") or metadata.get("title"),
+        "tags": [str(tag) for tag in tags],
+        "description": metadata.get("description") or metadata.get("summary"),
+    }
+
+
+def to_match_query(query: str) -> str:
+    """Quote every term of a free-text query, so FTS5 operators in user input are searched for literally.
+
+    The last term matches as a prefix, which makes search-as-you-type work.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class PromptSearchIndex:
+    """SQLite FTS5 index over prompt bodies and their metadata.json names, tags and descriptions.
+
+    Each file is stored with a fingerprint of its own digest and the digest of the metadata.json
+    in its directory, both taken from the PromptIndex manifest. `sync` compares fingerprints and
+    only re-reads and re-indexes files whose fingerprint changed. metadata.json files are not
+    indexed on their own; their fields are added to every prompt in the same directory.
+
+    Args:
+        path: Path of the database file. Defaults to default_search_db_path(directory).
+        directory: The prompt directory, used for the default path.
+
+    Example:
+        >>> index = load_prompt_index("./src/prompt_library/data/prompt_lib")
+        >>> search_index = PromptSearchIndex(directory=index.directory)
+        >>> search_index.sync(index)
+        >>> [result.path for result in search_index.search("helldivers backstory")]
+        ['lore-writing/helldivers2/johnhelldiver/prompt.xml']
+    """
+
+    def __init__(self, path: str | None = None, directory: str | None = None) -> None:
+        if path is None:
+            if directory is None:
+                raise ValueError("Either path or directory is required")
+            path = default_search_db_path(directory)
+        self.path = path
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS files")
+            self._connection.execute("DROP TABLE IF EXISTS prompts_fts")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, fts_rowid INTEGER)"
+        )
+        self._connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5("
+            "path, name, tags, description, body, tokenize='porter unicode61')"
+        )
+        self._connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @staticmethod
+    def _fingerprints(index: PromptIndex) -> dict[str, str]:
+        fingerprints: dict[str, str] = {}
+        for relative_path in index:
+            if os.path.basename(relative_path) == METADATA_FILE:
+                continue
+            metadata_path = os.path.join(os.path.dirname(relative_path), METADATA_FILE)
+            metadata_digest = index.entry(metadata_path).sha256 if metadata_path in index else ""
+            fingerprints[relative_path] = f"{index.entry(relative_path).sha256}:{metadata_digest}"
+        return fingerprints
+
+    def sync(self, index: PromptIndex) -> int:
+        """Bring the search index up to date with a prompt index.
+
+        Args:
+            index: The refreshed prompt index.
+
+        Returns:
+            int: Number of files added, updated or removed.
+        """
+        fingerprints = self._fingerprints(index)
+        with self._lock:
+            stored = dict(self._connection.execute("SELECT path, fingerprint FROM files").fetchall())
+            changed = [path for path, fingerprint in fingerprints.items() if stored.get(path) != fingerprint]
+            removed = [path for path in stored if path not in fingerprints]
+            if not changed and not removed:
+                return 0
+
+            metadata_cache: dict[str, dict[str, Any]] = {}
+            self._connection.execute("BEGIN")
+            try:
+                for relative_path in removed:
+                    self._delete(relative_path)
+                for relative_path in changed:
+                    self._delete(relative_path)
+                    try:
+                        body = index[relative_path]
+                    except (OSError, UnicodeDecodeError, KeyError) as e:
+                        logger.error(f"Failed to index {relative_path}: {e!s}")
+                        continue
+                    metadata = self._metadata(index, os.path.dirname(relative_path), metadata_cache)
+                    cursor = self._connection.execute(
+                        "INSERT INTO prompts_fts (path, name, tags, description, body) VALUES (?, ?, ?, ?, ?)",
+                        (relative_path, metadata["name"], ", ".join(metadata["tags"]), metadata["description"], body),
+                    )
+                    self._connection.execute(
+                        "INSERT INTO files (path, fingerprint, fts_rowid) VALUES (?, ?, ?)",
+                        (relative_path, fingerprints[relative_path], cursor.lastrowid),
+                    )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        logger.debug(f"Search index updated: {len(changed)} indexed, {len(removed)} removed")
+        return len(changed) + len(removed)
+
+    @staticmethod
+    def _metadata(index: PromptIndex, directory: str, cache: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        if directory not in cache:
+            metadata_path = os.path.join(directory, METADATA_FILE)
+            if metadata_path in index:
+                cache[directory] = parse_metadata(index[metadata_path])
+            else:
+                cache[directory] = {"name": None, "tags": [], "description": None}
+        return cache[directory]
+
+    def _delete(self, relative_path: str) -> None:
+        row = self._connection.execute("SELECT fts_rowid FROM files WHERE path = ?", (relative_path,)).fetchone()
+        if row is None:
+            return
+        self._connection.execute("DELETE FROM prompts_fts WHERE rowid = ?", row)
+        self._connection.execute("DELETE FROM files WHERE path = ?", (relative_path,))
+
+    def rebuild(self, index: PromptIndex) -> int:
+        """Drop everything and index all files of `index` again.
+
+        Returns:
+            int: Number of indexed files.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM files")
+            self._connection.execute("DELETE FROM prompts_fts")
+        return self.sync(index)
+
+    def search(self, query: str, limit: int = 10, raw: bool = False) -> list[PromptSearchResult]:
+        """Search the index, best matches first.
+
+        Args:
+            query: Free-text query; every term must match. With `raw`, an FTS5 query expression.
+            limit: Maximum number of results. Defaults to 10.
+            raw: Pass the query to FTS5 unchanged, e.g. to use OR, NEAR or column filters.
+
+        Returns:
+            list[PromptSearchResult]: Matching prompts with their bm25 score (lower is better) and
+            a snippet of the matching text.
+        """
+        match = query if raw else to_match_query(query)
+        if not match:
+            return []
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT path, bm25(prompts_fts, {weights}) AS score, "
+                "snippet(prompts_fts, -1, '[', ']', '...', 12), name, tags, description "
+                "FROM prompts_fts WHERE prompts_fts MATCH ? ORDER BY score LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [
+            PromptSearchResult(
+                path=path,
+                score=score,
+                snippet=snippet,
+                name=name,
+                tags=tags.split(", ") if tags else [],
+                description=description,
+            )
+            for path, score, snippet, name, tags, description in rows
+        ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM files").fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+_search_indexes: dict[str, PromptSearchIndex] = {}
+_search_indexes_lock = threading.Lock()
+
+
+def load_search_index(directory: Optional[str] = None) -> tuple[PromptIndex, PromptSearchIndex]:
+    """Return the prompt index and synced search index of a directory, reusing them within the process.
+
+    Args:
+        directory: The prompt directory. Defaults to the PROMPT_LIBRARY_DIR environment variable.
+
+    Returns:
+        Tuple of the refreshed prompt index and its search index.
+    """
+    if directory is None:
+        directory = os.getenv("PROMPT_LIBRARY_DIR", "./src/prompt_library/data/prompt_lib")
+    index = load_prompt_index(directory)
+    key = os.path.abspath(directory)
+    with _search_indexes_lock:
+        search_index = _search_indexes.get(key)
+        if search_index is None:
+            search_index = _search_indexes[key] = PromptSearchIndex(directory=directory)
+    search_index.sync(index)
+    return index, search_index
+
+
+def search_prompt_library(query: str, limit: int = 10, directory: Optional[str] = None) -> list[PromptSearchResult]:
+    """Search the prompt library for prompts matching a free-text query.
+
+    Args:
+        query: Free-text query; every term must match and the last one may be a prefix.
+        limit: Maximum number of results. Defaults to 10.
+        directory: The prompt directory. Defaults to the PROMPT_LIBRARY_DIR environment variable.
+
+    Returns:
+        list[PromptSearchResult]: Matching prompts, best matches first.
+
+    Example:
+        >>> [result.path for result in search_prompt_library("helldivers")]
+        ['lore-writing/helldivers2/johnhelldiver/prompt.xml']
+    """
+    _, search_index = load_search_index(directory)
+    return search_index.search(query, limit=limit)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import functools
+import json
+import re
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional, Union
+
+
+# A slot is anything wrapped in double curly braces, e.g. {{name}} or {{output[-1].key}}
+SLOT_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+OUTPUT_REF_PATTERN = re.compile(r"output\[-([1-9][0-9]*)\](?:\.(.+))?", re.DOTALL)
+
+COMPILED_PROMPT_CACHE_SIZE = 1024
+
+
+class ContextSlot:
+    """A `{{var}}` reference to a key of the chain context."""
+
+    __slots__ = ("name", "raw")
+
+    def __init__(self, name: str, raw: str) -> None:
+        self.name = name
+        self.raw = raw
+
+
+class OutputSlot:
+    """A `{{output[-j]}}` or `{{output[-j].key}}` reference to a previous chain output."""
+
+    __slots__ = ("key", "offset", "raw")
+
+    def __init__(self, offset: int, key: Optional[str], raw: str) -> None:
+        self.offset = offset
+        self.key = key
+        self.raw = raw
+
+
+Segment = Union[str, ContextSlot, OutputSlot]
+
+
+class CompiledPrompt:
+    """A prompt template parsed once into literal segments and typed slots.
+
+    Rendering walks the segments in a single linear pass, so the cost no longer grows with the
+    number of context keys or previous outputs. Substituted values are never re-scanned for slots.
+    Slots that cannot be resolved (unknown context keys, out of range output references, or key
+    references into non-dict outputs) are left in the prompt untouched.
+    """
+
+    __slots__ = ("output_offsets", "segments", "source")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.segments: tuple[Segment, ...] = tuple(self._parse(source))
+        self.output_offsets: frozenset[int] = frozenset(
+            segment.offset for segment in self.segments if isinstance(segment, OutputSlot)
+        )
+
+    @staticmethod
+    def _parse(source: str) -> list[Segment]:
+        segments: list[Segment] = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            if match.start() > position:
+                segments.append(source[position : match.start()])
+
+            raw = match.group(0)
+            inner = match.group(1)
+            output_match = OUTPUT_REF_PATTERN.fullmatch(inner)
+            if output_match:
+                segments.append(OutputSlot(int(output_match.group(1)), output_match.group(2), raw))
+            else:
+                segments.append(ContextSlot(inner, raw))
+            position = match.end()
+
+        if position < len(source):
+            segments.append(source[position:])
+        return segments
+
+    def render(self, context: Mapping[str, Any], outputs: Sequence[Any] = ()) -> str:
+        """Fill the template from the context and previous outputs.
+
+        Args:
+            context: Dictionary of variables that can be referenced as `{{var}}`.
+            outputs: Outputs of the previous steps, oldest first. `{{output[-1]}}` is the last item.
+
+        Returns:
+            str: The context-filled prompt.
+        """
+        num_outputs = len(outputs)
+        parts: list[str] = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            elif isinstance(segment, ContextSlot):
+                if segment.name in context:
+                    parts.append(str(context[segment.name]))
+                else:
+                    parts.append(segment.raw)
+            elif segment.offset > num_outputs:
+                parts.append(segment.raw)
+            else:
+                previous_output = outputs[num_outputs - segment.offset]
+                if segment.key is None:
+                    if isinstance(previous_output, dict):
+                        parts.append(json.dumps(previous_output))
+                    else:
+                        parts.append(str(previous_output))
+                elif isinstance(previous_output, dict) and segment.key in previous_output:
+                    parts.append(str(previous_output[segment.key]))
+                else:
+                    parts.append(segment.raw)
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"CompiledPrompt({self.source!r})"
+
+
+@functools.lru_cache(maxsize=COMPILED_PROMPT_CACHE_SIZE)
+def compile_prompt(prompt: str) -> CompiledPrompt:
+    """Parse a prompt template, reusing the compiled form for prompts seen before.
+
+    Args:
+        prompt: The prompt template text.
+
+    Returns:
+        CompiledPrompt: The compiled template.
+    """
+    return CompiledPrompt(prompt)
+
+
+def compile_prompts(prompts: Sequence[str]) -> list[CompiledPrompt]:
+    """Compile every prompt of a chain.
+
+    Args:
+        prompts: List of prompt templates.
+
+    Returns:
+        List of compiled templates in the same order.
+    """
+    return [compile_prompt(prompt) for prompt in prompts]
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from collections.abc import Callable
+from typing import Any, Optional
+
+from loguru import logger
+
+from prompt_library.common.prompt_index import PromptIndex
+from prompt_library.common.typings import PromptIndexChanges
+
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+Subscriber = Callable[[PromptIndexChanges], None]
+
+
+class Inotify:
+    """Minimal recursive inotify wrapper built on ctypes (Linux only).
+
+    Every directory below the root gets its own watch; directories created or moved in later are
+    watched as soon as their event is read.
+
+    Raises:
+        OSError: If inotify is not available.
+    """
+
+    def __init__(self, root: str) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.root = root
+        self._paths: dict[int, str] = {}
+        self.add_tree("")
+
+    def add_tree(self, relative_dir: str) -> None:
+        """Watch a directory (relative to the root) and everything below it."""
+        for current_dir, dirnames, _ in os.walk(os.path.join(self.root, relative_dir)):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(current_dir), WATCH_MASK)
+            if wd < 0:
+                logger.warning(f"Failed to watch {current_dir}: {os.strerror(ctypes.get_errno())}")
+                dirnames.clear()
+                continue
+            self._paths[wd] = os.path.relpath(current_dir, self.root)
+
+    def read(self, timeout: float) -> Optional[set[str]]:
+        """Wait up to `timeout` seconds for events.
+
+        Returns:
+            The relative paths touched by the events, or None when the kernel queue overflowed
+            and the whole tree must be rescanned.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        paths: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            relative_path = os.path.normpath(os.path.join(directory, name))
+            paths.add(relative_path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_tree(relative_path)
+        return paths
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PromptWatcher:
+    """Keep a PromptIndex current while its directory is edited, and notify subscribers.
+
+    On Linux the watcher uses inotify and applies each burst of events with PromptIndex.update,
+    so only the touched paths are re-checked. Elsewhere, or when inotify is unavailable, it falls
+    back to polling PromptIndex.refresh, which only stats the tree. Subscribers are called from
+    the watcher thread with the changes of every update that changed something.
+
+    Args:
+        index: The index to keep current.
+        poll_interval: Seconds between refreshes of the polling backend. Defaults to 1.
+        debounce: Seconds to wait for more events before applying a burst. Defaults to 0.1.
+        use_inotify: Whether to try inotify before falling back to polling. Defaults to True.
+
+    Example:
+        >>> index = load_prompt_index("./src/prompt_library/data/prompt_lib")
+        >>> with PromptWatcher(index) as watcher:
+        ...     watcher.subscribe(lambda changes: print(changes.modified))
+    """
+
+    def __init__(
+        self,
+        index: PromptIndex,
+        poll_interval: float = 1.0,
+        debounce: float = 0.1,
+        use_inotify: bool = True,
+    ) -> None:
+        self.index = index
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend: Optional[str] = None
+        self._subscribers: list[Subscriber] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Call `callback` with every non-empty set of changes.
+
+        Returns:
+            A function removing the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _publish(self, changes: PromptIndexChanges) -> None:
+        if not changes.has_changes:
+            return
+        logger.info(
+            f"Prompt library changed: {len(changes.added)} added, "
+            f"{len(changes.modified)} modified, {len(changes.removed)} removed"
+        )
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(changes)
+            except Exception as e:
+                logger.error(f"Prompt watcher subscriber failed: {e!s}")
+
+    def start(self) -> PromptWatcher:
+        """Start watching in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self.index.refresh()
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = Inotify(self.index.directory)
+            except (OSError, AttributeError) as e:
+                logger.info(f"inotify unavailable ({e!s}), polling {self.index.directory}")
+
+        self.backend = "inotify" if inotify is not None else "polling"
+        self._stop.clear()
+        target = self._run_inotify if inotify is not None else self._run_polling
+        self._thread = threading.Thread(target=target, args=(inotify,), name="prompt-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop watching and wait for the watcher thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run_polling(self, _: Any) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._publish(self.index.refresh())
+            except Exception as e:
+                logger.error(f"Failed to refresh {self.index.directory}: {e!s}")
+
+    def _run_inotify(self, inotify: Inotify) -> None:
+        try:
+            while not self._stop.is_set():
+                paths = inotify.read(timeout=0.5)
+                if paths is not None and not paths:
+                    continue
+
+                # Collect the rest of the burst, e.g. editors writing a temp file and renaming it
+                deadline = time.monotonic() + self.debounce
+                while paths is not None and (remaining := deadline - time.monotonic()) > 0:
+                    more = inotify.read(timeout=remaining)
+                    paths = None if more is None else paths | more
+
+                try:
+                    if paths is None:
+                        logger.warning(f"inotify queue overflowed, rescanning {self.index.directory}")
+                        self._publish(self.index.refresh())
+                    else:
+                        self._publish(self.index.update(paths))
+                except Exception as e:
+                    logger.error(f"Failed to update {self.index.directory}: {e!s}")
+        finally:
+            inotify.close()
+
+    def __enter__(self) -> PromptWatcher:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+_watchers: dict[int, PromptWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def watch_prompt_index(index: PromptIndex, **kwargs: Any) -> PromptWatcher:
+    """Start (at most) one watcher per index, e.g. from a notebook cell that may re-run.
+
+    Args:
+        index: The index to keep current.
+        **kwargs: Options passed to PromptWatcher.
+
+    Returns:
+        PromptWatcher: The running watcher of the index.
+    """
+    with _watchers_lock:
+        watcher = _watchers.get(id(index))
+        if watcher is None or watcher.index is not index:
+            watcher = _watchers[id(index)] = PromptWatcher(index, **kwargs)
+        return watcher.start()
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from typing import Optional
+
+from loguru import logger
+
+from prompt_library.common.typings import ModelRanking, RankingVote
+
+
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT_MS = 10_000
+
+
+def new_ballot_id(run_id: Optional[str] = None) -> str:
+    """Return a fresh ballot id, optionally tied to the run being voted on.
+
+    Every submission needs its own ballot: recording a ballot id again is a no-op, so reusing the
+    execution id of a run would drop a second vote on the same run.
+
+    Args:
+        run_id: Identifier of the ranked run, e.g. its execution id, kept as a prefix for tracing.
+
+    Returns:
+        str: `<run_id>:<random hex>`, or just the random hex without a run id.
+    """
+    ballot_id = uuid.uuid4().hex
+    return f"{run_id}:{ballot_id}" if run_id else ballot_id
+
+
+class RankingsStore:
+    """Model rankings derived from an append-only vote log in SQLite.
+
+    Every vote is a row of the `votes` table and is never updated or deleted. The current score of
+    each model is kept in the `scores` table, which is updated in the same transaction as the vote,
+    so recording a vote costs one insert and one upsert per model regardless of the history size.
+    Writes take SQLite's write lock up front (`BEGIN IMMEDIATE`) and the database runs in WAL mode,
+    so several ranker sessions, also in separate processes, can vote concurrently without losing
+    votes while readers are never blocked.
+
+    A reset records a watermark instead of deleting votes: scores count the votes after the latest
+    reset, and the full history stays queryable through `votes`.
+
+    Args:
+        path: Path of the database file. Defaults to the LANGUAGE_MODEL_RANKINGS_DB environment variable.
+
+    Example:
+        >>> store = RankingsStore()
+        >>> store.reset(["gpt-4o", "o1-mini"])
+        >>> store.record_vote(["gpt-4o"])
+        >>> [(ranking.llm_model_id, ranking.score) for ranking in store.rankings()]
+        [('gpt-4o', 1), ('o1-mini', 0)]
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.getenv(
+            "LANGUAGE_MODEL_RANKINGS_DB", "./src/prompt_library/data/language_model_rankings/rankings.sqlite3"
+        )
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT_MS / 1000
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS votes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, ballot_id TEXT NOT NULL, model_id TEXT NOT NULL, "
+                "delta INTEGER NOT NULL, voted_at REAL NOT NULL, UNIQUE (ballot_id, model_id))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS resets ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, last_vote_id INTEGER NOT NULL, "
+                "model_ids TEXT NOT NULL, reset_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores (model_id TEXT PRIMARY KEY, score INTEGER NOT NULL)"
+            )
+            self._connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def _add_votes(self, ballot_id: str, deltas: dict[str, int]) -> None:
+        voted_at = time.time()
+        for model_id, delta in deltas.items():
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO votes (ballot_id, model_id, delta, voted_at) VALUES (?, ?, ?, ?)",
+                (ballot_id, model_id, delta, voted_at),
+            )
+            # A ballot counts once per model, submitting it again is a no-op
+            if cursor.rowcount:
+                self._connection.execute(
+                    "INSERT INTO scores (model_id, score) VALUES (?, ?) "
+                    "ON CONFLICT (model_id) DO UPDATE SET score = score + excluded.score",
+                    (model_id, delta),
+                )
+
+    def _rankings(self) -> list[ModelRanking]:
+        rows = self._connection.execute("SELECT model_id, score FROM scores ORDER BY rowid").fetchall()
+        return [ModelRanking(llm_model_id=model_id, score=score) for model_id, score in rows]
+
+    def record_vote(
+        self, model_ids: Iterable[str], ballot_id: Optional[str] = None, shown: Optional[Iterable[str]] = None
+    ) -> list[ModelRanking]:
+        """Add one point to each model of a ballot.
+
+        Models without a score yet are added, so no vote is dropped.
+
+        Args:
+            model_ids: The models voted for.
+            ballot_id: Identifier of the ballot, see new_ballot_id. Votes of a ballot that was already
+                recorded are ignored, so a retried submission counts once. Defaults to a new random id.
+            shown: All models shown on the ballot. The ones not voted for are logged with a delta
+                of zero, so ratings can tell a loss from a model that was not shown.
+
+        Returns:
+            list[ModelRanking]: The rankings after the vote.
+        """
+        ballot_id = ballot_id or new_ballot_id()
+        deltas = dict.fromkeys(shown or (), 0)
+        deltas.update(dict.fromkeys(model_ids, 1))
+        with self._transaction():
+            self._add_votes(ballot_id, deltas)
+            return self._rankings()
+
+    def rankings(self) -> list[ModelRanking]:
+        """Return the score of every model since the latest reset, in the order they were added."""
+        with self._lock:
+            return self._rankings()
+
+    def _reset(self, model_ids: list[str]) -> None:
+        (last_vote_id,) = self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM votes").fetchone()
+        self._connection.execute(
+            "INSERT INTO resets (last_vote_id, model_ids, reset_at) VALUES (?, ?, ?)",
+            (last_vote_id, json.dumps(model_ids), time.time()),
+        )
+        self._connection.execute("DELETE FROM scores")
+        self._connection.executemany(
+            "INSERT INTO scores (model_id, score) VALUES (?, 0)", [(model_id,) for model_id in model_ids]
+        )
+
+    def _is_empty(self) -> bool:
+        (empty,) = self._connection.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM votes) AND NOT EXISTS (SELECT 1 FROM resets)"
+        ).fetchone()
+        return bool(empty)
+
+    def reset(self, model_ids: Iterable[str]) -> list[ModelRanking]:
+        """Start a new ranking round with the given models at zero, keeping the vote history.
+
+        Args:
+            model_ids: The models of the new round.
+
+        Returns:
+            list[ModelRanking]: The new rankings.
+        """
+        with self._transaction():
+            self._reset(list(dict.fromkeys(model_ids)))
+            return self._rankings()
+
+    def import_rankings(
+        self, rankings: Iterable[ModelRanking], ballot_id: Optional[str] = None, if_empty: bool = False
+    ) -> list[ModelRanking]:
+        """Start a new round seeded with existing scores, e.g. from a rankings.json file.
+
+        The scores are recorded as a single ballot, so they remain part of the vote history.
+
+        Args:
+            rankings: The scores to import.
+            ballot_id: Identifier of the import ballot. Defaults to a new random id.
+            if_empty: Only import into a store without any round or vote, checked in the same
+                transaction so concurrent importers import once. Defaults to False.
+
+        Returns:
+            list[ModelRanking]: The rankings after the import.
+        """
+        rankings = list(rankings)
+        with self._transaction():
+            if not if_empty or self._is_empty():
+                self._reset(list(dict.fromkeys(ranking.llm_model_id for ranking in rankings)))
+                self._add_votes(
+                    ballot_id or f"import-{uuid.uuid4().hex}",
+                    {ranking.llm_model_id: ranking.score for ranking in rankings if ranking.score},
+                )
+            return self._rankings()
+
+    def rebuild(self) -> list[ModelRanking]:
+        """Recompute the scores from the vote log, after the latest reset.
+
+        Returns:
+            list[ModelRanking]: The recomputed rankings.
+        """
+        with self._transaction():
+            row = self._connection.execute(
+                "SELECT last_vote_id, model_ids FROM resets ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            last_vote_id, model_ids = (row[0], json.loads(row[1])) if row else (0, [])
+            scores = dict.fromkeys(model_ids, 0)
+            for model_id, total in self._connection.execute(
+                "SELECT model_id, SUM(delta) FROM votes WHERE id > ? GROUP BY model_id ORDER BY MIN(id)",
+                (last_vote_id,),
+            ):
+                scores[model_id] = scores.get(model_id, 0) + total
+
+            self._connection.execute("DELETE FROM scores")
+            self._connection.executemany("INSERT INTO scores (model_id, score) VALUES (?, ?)", scores.items())
+            return self._rankings()
+
+    def votes(self, model_id: Optional[str] = None, since: Optional[datetime] = None) -> list[RankingVote]:
+        """Return the vote history across all rounds, oldest first.
+
+        Args:
+            model_id: Only votes for this model.
+            since: Only votes cast at or after this time.
+
+        Returns:
+            list[RankingVote]: The votes.
+        """
+        query = "SELECT ballot_id, model_id, delta, voted_at FROM votes WHERE 1 = 1"
+        params: list[object] = []
+        if model_id is not None:
+            query += " AND model_id = ?"
+            params.append(model_id)
+        if since is not None:
+            query += " AND voted_at >= ?"
+            params.append(since.timestamp())
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY id", params).fetchall()
+        return [
+            RankingVote(
+                ballot_id=ballot_id, model_id=model_id, delta=delta, voted_at=datetime.fromtimestamp(voted_at, UTC)
+            )
+            for ballot_id, model_id, delta, voted_at in rows
+        ]
+
+    def is_empty(self) -> bool:
+        """Whether no round was ever started and no vote recorded."""
+        with self._lock:
+            return self._is_empty()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+_default_store: Optional[RankingsStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_rankings_store() -> RankingsStore:
+    """Return the process-wide rankings store.
+
+    When the store is created empty, the scores of the LANGUAGE_MODEL_RANKINGS_FILE JSON file are
+    imported, so existing rankings carry over.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            store = RankingsStore()
+            rankings_file = os.getenv(
+                "LANGUAGE_MODEL_RANKINGS_FILE", "./src/prompt_library/data/language_model_rankings/rankings.json"
+            )
+            if store.is_empty() and os.path.exists(rankings_file):
+                with open(rankings_file, encoding="utf-8") as f:
+                    rankings = [ModelRanking(**ranking) for ranking in json.load(f)]
+                store.import_rankings(rankings, ballot_id=f"import-{os.path.basename(rankings_file)}", if_empty=True)
+                logger.info(f"Imported rankings from {rankings_file}")
+            _default_store = store
+        return _default_store
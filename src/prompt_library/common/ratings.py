@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import math
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from prompt_library.common.typings import ModelRating, RankingVote
+
+
+DEFAULT_RATING = 1000.0
+ELO_SCALE = 400.0
+# Two-sided 95% quantile of the standard normal distribution
+Z_95 = 1.959963984540054
+# Largest change of a log-strength per Newton step
+MAX_NEWTON_STEP = 2.0
+
+
+def ballot_comparisons(winners: Iterable[str], shown: Iterable[str]) -> list[tuple[str, str]]:
+    """Expand a top-k ballot into pairwise comparisons.
+
+    Every selected model beats every model that was shown but not selected. A ballot where all or
+    none of the shown models were selected carries no preference and yields no comparison.
+
+    Args:
+        winners: The selected models.
+        shown: All models shown on the ballot, selected ones included.
+
+    Returns:
+        list[tuple[str, str]]: (winner, loser) pairs.
+    """
+    winners = list(dict.fromkeys(winners))
+    selected = set(winners)
+    losers = [model_id for model_id in dict.fromkeys(shown) if model_id not in selected]
+    return [(winner, loser) for winner in winners for loser in losers]
+
+
+def ballots_from_votes(votes: Iterable[RankingVote]) -> list[tuple[list[str], list[str]]]:
+    """Group a vote log into ballots.
+
+    Models voted for have a positive delta; models shown without being selected are recorded with
+    a delta of zero.
+
+    Args:
+        votes: Votes as returned by RankingsStore.votes, in any order.
+
+    Returns:
+        list[tuple[list[str], list[str]]]: (winners, shown) per ballot, in order of first vote.
+    """
+    ballots: dict[str, tuple[list[str], list[str]]] = {}
+    for vote in votes:
+        winners, shown = ballots.setdefault(vote.ballot_id, ([], []))
+        shown.append(vote.model_id)
+        if vote.delta > 0:
+            winners.append(vote.model_id)
+    return list(ballots.values())
+
+
+class _PairwiseModel(ABC):
+    """Model ids mapped to dense indexes, with per-model win and comparison counts."""
+
+    def __init__(self, model_ids: Iterable[str] = ()) -> None:
+        self.model_ids: list[str] = []
+        self._index: dict[str, int] = {}
+        self.wins = np.zeros(0, dtype=np.int64)
+        self.comparisons = np.zeros(0, dtype=np.int64)
+        for model_id in model_ids:
+            self._model_index(model_id)
+
+    def _grow(self, size: int) -> None:
+        self.wins = np.pad(self.wins, (0, size - len(self.wins)))
+        self.comparisons = np.pad(self.comparisons, (0, size - len(self.comparisons)))
+
+    def _model_index(self, model_id: str) -> int:
+        index = self._index.get(model_id)
+        if index is None:
+            index = self._index[model_id] = len(self.model_ids)
+            self.model_ids.append(model_id)
+            if index >= len(self.wins):
+                # Grow geometrically so adding models one by one stays amortized O(1)
+                self._grow(max(2 * len(self.wins), 8))
+        return index
+
+    def _indexes(self, model_ids: Sequence[str]) -> np.ndarray:
+        return np.fromiter(
+            (self._model_index(model_id) for model_id in model_ids), dtype=np.int64, count=len(model_ids)
+        )
+
+    def add(self, winner: str, loser: str) -> None:
+        """Record that `winner` was preferred over `loser`."""
+        self.add_many([winner], [loser])
+
+    @abstractmethod
+    def add_many(self, winners: Sequence[str], losers: Sequence[str]) -> None:
+        """Record many pairwise outcomes at once.
+
+        Args:
+            winners: The preferred model of each comparison.
+            losers: The other model of each comparison.
+        """
+
+    def add_ballot(self, winners: Iterable[str], shown: Iterable[str]) -> None:
+        """Record a top-k ballot, see ballot_comparisons."""
+        pairs = ballot_comparisons(winners, shown)
+        if pairs:
+            self.add_many([winner for winner, _ in pairs], [loser for _, loser in pairs])
+
+    def add_votes(self, votes: Iterable[RankingVote]) -> None:
+        """Record every ballot of a vote log."""
+        winners: list[str] = []
+        losers: list[str] = []
+        for ballot_winners, shown in ballots_from_votes(votes):
+            for winner, loser in ballot_comparisons(ballot_winners, shown):
+                winners.append(winner)
+                losers.append(loser)
+        if winners:
+            self.add_many(winners, losers)
+
+
+class EloModel(_PairwiseModel):
+    """Online Elo ratings, updated in O(1) per comparison.
+
+    Elo depends on the order of the votes and gives no uncertainty, prefer BradleyTerryModel for
+    reports; Elo is useful as a cheap live leaderboard.
+
+    Args:
+        model_ids: Models to start with, more are added as they appear in votes.
+        k: Maximum rating change per comparison. Defaults to 32.
+        initial: Rating of a new model. Defaults to 1000.
+    """
+
+    def __init__(self, model_ids: Iterable[str] = (), k: float = 32.0, initial: float = DEFAULT_RATING) -> None:
+        self.k = k
+        self.initial = initial
+        self.ratings = np.zeros(0)
+        super().__init__(model_ids)
+
+    def _grow(self, size: int) -> None:
+        super()._grow(size)
+        self.ratings = np.pad(self.ratings, (0, size - len(self.ratings)), constant_values=self.initial)
+
+    def add_many(self, winners: Sequence[str], losers: Sequence[str]) -> None:
+        """Apply comparisons in order, each against the ratings left by the previous one."""
+        winner_indexes = self._indexes(winners).tolist()
+        loser_indexes = self._indexes(losers).tolist()
+        ratings = self.ratings
+        for winner, loser in zip(winner_indexes, loser_indexes, strict=True):
+            delta = self.k / (1.0 + 10.0 ** ((ratings[winner] - ratings[loser]) / ELO_SCALE))
+            ratings[winner] += delta
+            ratings[loser] -= delta
+            self.wins[winner] += 1
+            self.comparisons[winner] += 1
+            self.comparisons[loser] += 1
+
+    def fit(self) -> list[ModelRating]:
+        """Return the current ratings, best first, without confidence intervals."""
+        results = [
+            ModelRating(
+                model_id=model_id,
+                rating=float(self.ratings[index]),
+                wins=int(self.wins[index]),
+                comparisons=int(self.comparisons[index]),
+            )
+            for index, model_id in enumerate(self.model_ids)
+        ]
+        return sorted(results, key=lambda result: result.rating, reverse=True)
+
+
+class BradleyTerryModel(_PairwiseModel):
+    """Bradley–Terry ratings fitted by maximum likelihood, with 95% confidence intervals.
+
+    Outcomes are aggregated into a win matrix, so adding a vote is O(1) and a fit costs
+    O(iterations × models³) however many votes were recorded. Fits use Newton's method on the
+    log-strengths and start from the previous solution, so refitting after a few new votes
+    converges in a couple of steps. The Hessian of the final step gives the confidence intervals.
+
+    Every model plays `prior` virtual wins and losses against a fixed average opponent. This keeps
+    models that never won or never lost at finite ratings and pins down the scale. Ratings are
+    reported on the Elo scale, centered on 1000: a 400 point gap means 10:1 odds.
+
+    Args:
+        model_ids: Models to start with, more are added as they appear in votes.
+        prior: Number of virtual wins and losses per model. Defaults to 1.
+
+    Example:
+        >>> model = BradleyTerryModel()
+        >>> model.add_votes(get_rankings_store().votes())
+        >>> [(rating.model_id, round(rating.rating)) for rating in model.fit()]
+        [('gpt-4o', 1084), ('o1-mini', 916)]
+    """
+
+    def __init__(self, model_ids: Iterable[str] = (), prior: float = 1.0) -> None:
+        if prior <= 0:
+            raise ValueError("Prior must be positive")
+        self.prior = prior
+        self.win_matrix = np.zeros((0, 0), dtype=np.int64)
+        self._log_strengths = np.zeros(0)
+        super().__init__(model_ids)
+
+    def _grow(self, size: int) -> None:
+        super()._grow(size)
+        grown = np.zeros((size, size), dtype=np.int64)
+        grown[: len(self.win_matrix), : len(self.win_matrix)] = self.win_matrix
+        self.win_matrix = grown
+        self._log_strengths = np.pad(self._log_strengths, (0, size - len(self._log_strengths)))
+
+    def add_many(self, winners: Sequence[str], losers: Sequence[str]) -> None:
+        """Aggregate comparisons into the win matrix, vectorized."""
+        winner_indexes = self._indexes(winners)
+        loser_indexes = self._indexes(losers)
+        np.add.at(self.win_matrix, (winner_indexes, loser_indexes), 1)
+        np.add.at(self.wins, winner_indexes, 1)
+        np.add.at(self.comparisons, winner_indexes, 1)
+        np.add.at(self.comparisons, loser_indexes, 1)
+
+    def _information(self, log_strengths: np.ndarray, games: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the expected wins and the Fisher information of the log-strengths."""
+        win_probability = 1.0 / (1.0 + np.exp(log_strengths[None, :] - log_strengths[:, None]))
+        virtual_probability = 1.0 / (1.0 + np.exp(-log_strengths))
+        expected_wins = (games * win_probability).sum(axis=1) + 2 * self.prior * virtual_probability
+        information = -games * win_probability * win_probability.T
+        np.fill_diagonal(
+            information,
+            -information.sum(axis=1) + 2 * self.prior * virtual_probability * (1.0 - virtual_probability),
+        )
+        return expected_wins, information
+
+    def fit(self, max_iterations: int = 100, tolerance: float = 1e-10) -> list[ModelRating]:
+        """Fit the ratings to all recorded comparisons.
+
+        Args:
+            max_iterations: Maximum number of Newton steps. Defaults to 100.
+            tolerance: Largest change of a log-strength at which the fit has converged.
+
+        Returns:
+            list[ModelRating]: Ratings with their 95% confidence interval, best first.
+        """
+        size = len(self.model_ids)
+        if not size:
+            return []
+        win_matrix = self.win_matrix[:size, :size].astype(float)
+        games = win_matrix + win_matrix.T
+        wins = win_matrix.sum(axis=1) + self.prior
+        log_strengths = self._log_strengths[:size].copy()
+
+        for _ in range(max_iterations):
+            expected_wins, information = self._information(log_strengths, games)
+            step = np.linalg.solve(information, wins - expected_wins)
+            # The log-likelihood is concave, damping large steps keeps the first iterations stable
+            largest = np.max(np.abs(step))
+            if largest > MAX_NEWTON_STEP:
+                step *= MAX_NEWTON_STEP / largest
+            log_strengths += step
+            if largest < tolerance:
+                break
+        self._log_strengths[:size] = log_strengths
+
+        _, information = self._information(log_strengths, games)
+        covariance = np.linalg.inv(information)
+        # Ratings are centered on their mean, propagate the centering to the covariance
+        centering = np.eye(size) - 1.0 / size
+        standard_errors = np.sqrt(np.clip(np.diag(centering @ covariance @ centering), 0.0, None))
+
+        points = ELO_SCALE / math.log(10)
+        ratings = DEFAULT_RATING + points * (log_strengths - log_strengths.mean())
+        margins = Z_95 * points * standard_errors
+        results = [
+            ModelRating(
+                model_id=model_id,
+                rating=float(ratings[index]),
+                lower=float(ratings[index] - margins[index]),
+                upper=float(ratings[index] + margins[index]),
+                wins=int(self.wins[index]),
+                comparisons=int(self.comparisons[index]),
+            )
+            for index, model_id in enumerate(self.model_ids)
+        ]
+        return sorted(results, key=lambda result: result.rating, reverse=True)
+
+
+def fit_ratings(votes: Iterable[RankingVote], method: str = "bradley_terry", **kwargs: float) -> list[ModelRating]:
+    """Fit model ratings to a vote log.
+
+    Args:
+        votes: Votes as returned by RankingsStore.votes.
+        method: "bradley_terry" or "elo". Defaults to "bradley_terry".
+        **kwargs: Options of the rating model, e.g. `prior` or `k`.
+
+    Returns:
+        list[ModelRating]: Ratings, best first.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    models = {"bradley_terry": BradleyTerryModel, "elo": EloModel}
+    if method not in models:
+        raise ValueError(f"Unknown rating method {method!r}, expected one of {', '.join(models)}")
+    model = models[method](**kwargs)
+    model.add_votes(votes)
+    return model.fit()
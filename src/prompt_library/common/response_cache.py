@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any, Optional
+
+from loguru import logger
+
+
+def normalize_options(options: dict[str, Any] | None) -> dict[str, Any]:
+    """Normalize prompt options so equivalent calls produce the same cache key.
+
+    Options set to None are dropped and numbers are compared as floats, so that
+    `temperature=1` and `temperature=1.0` hit the same entry.
+
+    Args:
+        options: The options passed to the model, e.g. {"temperature": 0.5}.
+
+    Returns:
+        A new dictionary of normalized options.
+    """
+    normalized: dict[str, Any] = {}
+    for key, value in (options or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        normalized[key] = value
+    return normalized
+
+
+def make_cache_key(model_id: str, prompt_text: str, options: dict[str, Any] | None = None) -> str:
+    """Build a content-addressed key for a model response.
+
+    Args:
+        model_id: The identifier of the model answering the prompt.
+        prompt_text: The prompt text sent to the model.
+        options: The options passed to the model.
+
+    Returns:
+        str: Hex SHA-256 digest of the model id, normalized options and prompt text.
+    """
+    payload = json.dumps(
+        {"model_id": model_id, "options": normalize_options(options), "prompt": prompt_text},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Base class for model response caches.
+
+    Subclasses implement the storage (`get`, `set`, `clear`); the lookup policy lives here
+    so every backend treats temperatures the same way.
+
+    Args:
+        cache_nonzero_temperature: Whether responses sampled with a temperature above zero are
+            cached. Turn this off when repeated calls are expected to produce fresh samples; calls
+            that do not set a temperature then bypass the cache too, as most providers sample by default.
+    """
+
+    def __init__(self, cache_nonzero_temperature: bool = True) -> None:
+        self.cache_nonzero_temperature = cache_nonzero_temperature
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the response stored under a key, or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, response: str) -> None:
+        """Store a response under a key."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every cached response."""
+
+    def should_cache(self, options: dict[str, Any] | None = None) -> bool:
+        """Return whether a call made with these options may be served from the cache.
+
+        With `cache_nonzero_temperature` off only calls pinned to temperature zero are cached, a
+        missing temperature means the provider default, which is usually above zero.
+        """
+        if self.cache_nonzero_temperature:
+            return True
+        return normalize_options(options).get("temperature") == 0.0
+
+    def get_or_fetch(
+        self, model_id: str, prompt_text: str, options: dict[str, Any] | None, fetch: Callable[[], str]
+    ) -> str:
+        """Return the cached response for a call, calling `fetch` and storing its result on a miss.
+
+        Args:
+            model_id: The identifier of the model answering the prompt.
+            prompt_text: The prompt text sent to the model.
+            options: The options passed to the model.
+            fetch: Function performing the actual model call.
+
+        Returns:
+            str: The cached or freshly fetched response text.
+        """
+        if not self.should_cache(options):
+            return fetch()
+
+        key = make_cache_key(model_id, prompt_text, options)
+        cached = self.get(key)
+        if cached is not None:
+            logger.debug(f"Response cache hit for {model_id}")
+            return cached
+
+        response = fetch()
+        self.set(key, response)
+        return response
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Response cache stored in a single SQLite database file.
+
+    Entries older than `ttl` seconds are treated as missing, and once the cache holds more than
+    `max_entries` responses the least recently used ones are evicted. The database runs in WAL
+    mode so several notebooks or processes can share it.
+
+    Args:
+        path: Path of the database file. Defaults to the RESPONSE_CACHE_FILE environment variable.
+        ttl: Optional time to live of an entry in seconds. None keeps entries until evicted.
+        max_entries: Optional maximum number of cached responses. None disables eviction.
+        cache_nonzero_temperature: Whether responses sampled with a temperature above zero are cached.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float | None = None,
+        max_entries: int | None = 10_000,
+        cache_nonzero_temperature: bool = True,
+    ) -> None:
+        super().__init__(cache_nonzero_temperature=cache_nonzero_temperature)
+        if path is None:
+            path = os.getenv("RESPONSE_CACHE_FILE", "./src/prompt_library/data/response_cache/responses.sqlite3")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("Max entries must be at least 1")
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self.ttl is not None and created_at + self.ttl < now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            if self.max_entries is not None:
+                (count,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+                if count > self.max_entries:
+                    self._connection.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
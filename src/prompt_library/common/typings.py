@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import uuid
+
+from datetime import UTC, datetime
 from typing import Any, Dict, List, Optional, Union
 
 from loguru import logger
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class FusionChainResult(BaseModel):
@@ -14,12 +17,104 @@ class FusionChainResult(BaseModel):
     llm_model_names: list[str]
 
 
+class FusionChainModelResult(BaseModel):
+    model_index: int
+    llm_model_name: str
+    prompt_responses: list[Any]
+    context_filled_prompts: list[str]
+    top_response: Optional[Union[str, dict[str, Any]]] = None
+    performance_scores: Optional[list[Optional[float]]] = None
+
+
 class MultiLLMPromptExecution(BaseModel):
     prompt_responses: list[dict[str, Any]]
     prompt: str
     prompt_template: Optional[str] = None
 
 
+class ExecutionLogRecord(MultiLLMPromptExecution):
+    execution_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    recorded_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class PromptExecutionResult(BaseModel):
+    prompt_index: int
+    model_index: int
+    model_id: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+
+
+class ModelSpec(BaseModel):
+    model_id: str
+    api_key_env: Optional[str] = None
+
+
+class RateLimit(BaseModel):
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class SchedulerStats(BaseModel):
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.calls if self.calls else 0.0
+
+
+class PromptFileEntry(BaseModel):
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+class PromptIndexChanges(BaseModel):
+    added: list[str] = []
+    modified: list[str] = []
+    removed: list[str] = []
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+class PromptSearchResult(BaseModel):
+    path: str
+    score: float
+    snippet: str
+    name: Optional[str] = None
+    tags: list[str] = []
+    description: Optional[str] = None
+
+
+class SemanticSearchResult(BaseModel):
+    path: str
+    sha256: str
+    distance: float
+
+
 class ModelRanking(BaseModel):
     llm_model_id: str
     score: int
+
+
+class RankingVote(BaseModel):
+    ballot_id: str
+    model_id: str
+    delta: int
+    voted_at: datetime
+
+
+class ModelRating(BaseModel):
+    model_id: str
+    rating: float
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+    wins: int = 0
+    comparisons: int = 0
@@ -0,0 +1,470 @@
+"""prompt_library.daemon"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import select
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import traceback
+
+from typing import Any, Optional
+
+import click
+import typer
+
+from loguru import logger
+
+from prompt_library.daemon_client import DAEMON_SOCKET, DAEMON_START_TIMEOUT, connect, recv_frame, request, send_frame
+
+
+DAEMON_LOG_FILE = os.getenv(
+    "PROMPT_LIBRARY_DAEMON_LOG",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "prompt_library", "daemon.log"),
+)
+
+# Seconds between two checks whether the client of the running command is still connected
+HANGUP_POLL_INTERVAL = 0.2
+
+
+def _hung_up(sock: socket.socket) -> bool:
+    """Return whether the client closed its end of the connection, without consuming its input."""
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream forwarding every write to the client as a frame."""
+
+    def __init__(self, sock: socket.socket, name: str) -> None:
+        self._sock = sock
+        self._name = name
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str | bytes) -> int:
+        if isinstance(text, (bytes, bytearray)):
+            # click.echo writes bytes to streams without a binary buffer
+            text = text.decode("utf-8", errors="replace")
+        if text:
+            send_frame(self._sock, {self._name: text})
+        return len(text)
+
+
+class _RemoteStdin(io.TextIOBase):
+    """Text stream reading the stdin of the client on demand."""
+
+    def __init__(self, sock: socket.socket, stream: Any) -> None:
+        self._sock = sock
+        self._stream = stream
+        self._buffer = ""
+        self._eof = False
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def readable(self) -> bool:
+        return True
+
+    def _fetch(self, what: str) -> str:
+        if self._eof:
+            return ""
+        send_frame(self._sock, {"read": what})
+        message = recv_frame(self._stream)
+        data = message.get("stdin", "") if message else ""
+        if not data or what == "all":
+            self._eof = True
+        return data
+
+    def read(self, size: Optional[int] = -1) -> str:
+        if size is None or size < 0:
+            data, self._buffer = self._buffer + self._fetch("all"), ""
+            return data
+        while len(self._buffer) < size and not self._eof:
+            self._buffer += self._fetch("line")
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        if "\n" not in self._buffer:
+            self._buffer += self._fetch("line")
+        end = self._buffer.find("\n") + 1 or len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return data
+
+
+class _HangupWatcher(threading.Thread):
+    """Interrupt the running command once its client hangs up, e.g. because the client was interrupted.
+
+    The command is interrupted with SIGINT, which also breaks blocking calls such as a pending model
+    request. Signals are only delivered to the main thread, so when the daemon serves from another thread
+    the watcher is not started and the command notices the hangup when it next writes output.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        super().__init__(name="prompt_library-daemon-hangup", daemon=True)
+        self._sock = sock
+        self._done = threading.Event()
+        # Written to when the command finishes, so the watcher stops without waiting out its poll interval
+        self._wakeup, self._wakeup_writer = socket.socketpair()
+        self._armed = False
+        self._previous_handler: Any = None
+        self.hung_up = False
+
+    def run(self) -> None:
+        while not self._done.is_set():
+            readable, _, _ = select.select([self._sock, self._wakeup], [], [], HANGUP_POLL_INTERVAL)
+            if self._wakeup in readable or not readable:
+                continue
+            if _hung_up(self._sock):
+                self.hung_up = True
+                if self._armed:
+                    signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)  # type: ignore[arg-type]
+                return
+            # Input the command has not read yet, look again later
+            self._done.wait(HANGUP_POLL_INTERVAL)
+
+    def _interrupt(self, signum: int, frame: Any) -> None:
+        if self.hung_up:
+            if self._armed:
+                raise KeyboardInterrupt
+            # Delivered after the command finished, nothing left to interrupt
+            return
+        if callable(self._previous_handler):
+            self._previous_handler(signum, frame)
+
+    def __enter__(self) -> _HangupWatcher:
+        if threading.current_thread() is threading.main_thread():
+            self._previous_handler = signal.signal(signal.SIGINT, self._interrupt)
+            self._armed = True
+            self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        try:
+            if not self._armed:
+                return
+            self._armed = False
+            self._done.set()
+            self._wakeup_writer.send(b"\0")
+            self.join()
+            signal.signal(signal.SIGINT, self._previous_handler)
+        finally:
+            self._wakeup.close()
+            self._wakeup_writer.close()
+
+
+class _DaemonRequestHandler(socketserver.BaseRequestHandler):
+    server: DaemonServer
+
+    def handle(self) -> None:
+        with self.request.makefile("rb") as stream:
+            message = recv_frame(stream)
+            if message is None:
+                return
+            if "control" in message:
+                send_frame(self.request, self.server.control(message["control"]))
+                return
+            argv = message.get("argv", [])
+            # The client may have stopped waiting, see DAEMON_START_TIMEOUT, and run the command itself: only
+            # run it once the client confirms, which it does not after timing out
+            self.request.settimeout(DAEMON_START_TIMEOUT)
+            try:
+                send_frame(self.request, {"accepted": True})
+                confirmation = recv_frame(stream)
+            except OSError:
+                confirmation = None
+            if confirmation is None or not confirmation.get("run"):
+                logger.debug(f"Client left before {argv} started")
+                return
+            self.request.settimeout(None)
+
+            watcher = _HangupWatcher(self.request)
+            try:
+                with watcher:
+                    exit_code = self.server.run_command(
+                        argv,
+                        message.get("cwd"),
+                        stdin=_RemoteStdin(self.request, stream),
+                        stdout=_FrameWriter(self.request, "stdout"),
+                        stderr=_FrameWriter(self.request, "stderr"),
+                    )
+            except KeyboardInterrupt:
+                if not watcher.hung_up:
+                    raise
+                logger.info(f"Interrupted {argv}, the client hung up")
+                return
+            with contextlib.suppress(OSError):
+                send_frame(self.request, {"exit": exit_code})
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Long-lived process running CLI commands sent by prompt_library.daemon_client.
+
+    The interpreter, imported subcommands and the caches warmed by `warm` are shared by every command, so
+    a forwarded command skips the startup cost of the CLI. Commands run one at a time: they share the
+    process-wide stdin, stdout, stderr and working directory, which are swapped for those of the client.
+
+    Only the user running the daemon may connect: the socket is created with mode 0600 and, where the
+    platform reports it, the uid of the peer is checked.
+
+    Commands run with the environment of the daemon, not the one of the client; restart the daemon after
+    changing environment variables or upgrading prompt_library.
+
+    Args:
+        socket_path: Path of the Unix socket. Defaults to DAEMON_SOCKET.
+        command: Click command to run. Defaults to the prompt_library CLI.
+        bind_and_activate: Listen on the socket right away. Pass False to `warm` first and call
+            `server_bind` and `server_activate` afterwards, so clients never wait on a daemon that is
+            still warming up. Defaults to True.
+
+    Raises:
+        RuntimeError: If another daemon is listening on the socket.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        command: Optional[click.Command] = None,
+        bind_and_activate: bool = True,
+    ) -> None:
+        self.socket_path = socket_path or DAEMON_SOCKET
+        if command is None:
+            from prompt_library.cli import APP
+
+            command = typer.main.get_command(APP)
+        self.command = command
+        self.started_at = time.time()
+        self.requests = 0
+        self.stopping = False
+
+        self._check_not_running()
+        super().__init__(self.socket_path, _DaemonRequestHandler, bind_and_activate=bind_and_activate)
+
+    def _check_not_running(self) -> None:
+        existing = connect(self.socket_path, timeout=1.0)
+        if existing is not None:
+            existing.close()
+            raise RuntimeError(f"A prompt_library daemon is already listening on {self.socket_path}")
+
+    def server_bind(self) -> None:
+        # Checked again, another daemon may have started while this one was warming up
+        self._check_not_running()
+        with contextlib.suppress(FileNotFoundError):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or ".", mode=0o700, exist_ok=True)
+
+        previous_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(previous_umask)
+
+    def verify_request(self, request: socket.socket, client_address: Any) -> bool:
+        if not hasattr(socket, "SO_PEERCRED"):
+            return True
+        credentials = struct.Struct("3i")
+        _, uid, _ = credentials.unpack(request.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size))
+        if uid != os.getuid():
+            logger.warning(f"Rejected connection from uid {uid}")
+            return False
+        return True
+
+    def warm(self) -> None:
+        """Import every subcommand and load the shared prompt index, search index and model aliases.
+
+        Failures are logged and skipped, the command that needs the resource will report them. The
+        response cache is not warmed: no CLI command reads it, callers such as the ranker notebook
+        create their own SQLiteResponseCache.
+        """
+        from prompt_library.cli import get_subcommands
+
+        tasks = []
+        if hasattr(self.command, "load_subcommand"):
+            tasks += [
+                (f"subcommand {entry.name}", lambda entry=entry: self.command.load_subcommand(entry))
+                for entry in get_subcommands().values()
+            ]
+        tasks += [("prompt search index", _warm_search_index), ("model registry", _warm_model_registry)]
+        for name, task in tasks:
+            start = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                logger.warning(f"Could not warm {name}: {e}")
+            else:
+                logger.debug(f"Warmed {name} in {time.perf_counter() - start:.3f}s")
+
+    def control(self, action: str) -> dict[str, Any]:
+        """Answer a control message.
+
+        Args:
+            action: "ping" for the daemon status, "stop" to shut it down after replying.
+
+        Returns:
+            dict[str, Any]: The reply.
+        """
+        if action == "stop":
+            self.stopping = True
+        elif action != "ping":
+            return {"error": f"Unknown control action: {action}"}
+        import prompt_library
+
+        return {
+            "pid": os.getpid(),
+            "version": prompt_library.__version__,
+            "started_at": self.started_at,
+            "requests": self.requests,
+            "stopping": self.stopping,
+        }
+
+    def run_command(
+        self,
+        argv: list[str],
+        cwd: Optional[str],
+        stdin: io.TextIOBase,
+        stdout: io.TextIOBase,
+        stderr: io.TextIOBase,
+    ) -> int:
+        """Run a CLI command with the streams and working directory of a client.
+
+        Args:
+            argv: Command line arguments, without the program name.
+            cwd: Working directory of the client.
+            stdin: Input of the command.
+            stdout: Output of the command.
+            stderr: Error output of the command.
+
+        Returns:
+            int: Exit code of the command.
+        """
+        self.requests += 1
+        start = time.perf_counter()
+        previous_cwd = os.getcwd()
+        previous_stdin = sys.stdin
+        exit_code: Any = 0
+        try:
+            sys.stdin = stdin
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                if cwd:
+                    os.chdir(cwd)
+                try:
+                    self.command.main(args=argv, prog_name="prompt_library", standalone_mode=True)
+                except SystemExit as e:
+                    exit_code = e.code
+                except Exception:
+                    traceback.print_exc()
+                    exit_code = 1
+                if isinstance(exit_code, str):
+                    print(exit_code, file=sys.stderr)
+                    exit_code = 1
+        except OSError as e:
+            # The client went away, e.g. it was interrupted
+            logger.debug(f"Lost client during {argv}: {e}")
+            exit_code = 1
+        finally:
+            sys.stdin = previous_stdin
+            os.chdir(previous_cwd)
+        logger.debug(f"Ran {argv} in {time.perf_counter() - start:.3f}s, exit code {exit_code}")
+        return exit_code or 0
+
+    def serve(self) -> None:
+        """Handle requests until a stop control message arrives, then remove the socket."""
+        logger.info(f"prompt_library daemon {os.getpid()} listening on {self.socket_path}")
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+            logger.info("prompt_library daemon stopped")
+
+
+def _warm_search_index() -> None:
+    from prompt_library.common.prompt_search import load_search_index
+
+    load_search_index()
+
+
+def _warm_model_registry() -> None:
+    from prompt_library.common.model_registry import get_default_registry
+
+    get_default_registry().preload()
+
+
+def serve(socket_path: Optional[str] = None, warm: bool = True) -> None:
+    """Run a daemon in this process until it is stopped.
+
+    Args:
+        socket_path: Path of the Unix socket. Defaults to DAEMON_SOCKET.
+        warm: Load the subcommands and shared caches before accepting commands. Defaults to True.
+    """
+    server = DaemonServer(socket_path, bind_and_activate=False)
+    try:
+        if warm:
+            server.warm()
+        # Only listen once warm, until then clients find no daemon and run commands themselves
+        server.server_bind()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    server.serve()
+
+
+def start(socket_path: Optional[str] = None, timeout: float = 60.0) -> int:
+    """Start a daemon in the background and wait until it answers a ping, i.e. is warm and serving.
+
+    Args:
+        socket_path: Path of the Unix socket. Defaults to DAEMON_SOCKET.
+        timeout: Seconds to wait for the daemon. Defaults to 60.
+
+    Returns:
+        int: Process id of the daemon.
+
+    Raises:
+        RuntimeError: If the daemon exits or does not answer within the timeout.
+    """
+    import subprocess
+
+    socket_path = socket_path or DAEMON_SOCKET
+    os.makedirs(os.path.dirname(DAEMON_LOG_FILE) or ".", exist_ok=True)
+    with open(DAEMON_LOG_FILE, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "prompt_library.cli", "daemon", "serve", "--socket", socket_path],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # A bare connect is not enough: a ping is only answered once the daemon serves requests
+        if request({"control": "ping"}, socket_path) is not None:
+            return process.pid
+        if process.poll() is not None:
+            raise RuntimeError(f"The daemon exited with code {process.returncode}, see {DAEMON_LOG_FILE}")
+        time.sleep(0.05)
+    raise RuntimeError(f"The daemon did not start within {timeout}s, see {DAEMON_LOG_FILE}")
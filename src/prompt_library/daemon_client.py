@@ -0,0 +1,204 @@
+"""prompt_library.daemon_client"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import sys
+
+from typing import IO, Any, BinaryIO, Optional
+
+
+# NOTE: This module is the `prompt_library` console script. It must only import the standard library so a
+# command forwarded to a running daemon (see prompt_library.daemon) starts in a few milliseconds.
+
+DAEMON_SOCKET = os.getenv(
+    "PROMPT_LIBRARY_DAEMON_SOCKET",
+    os.path.join(
+        os.getenv("XDG_RUNTIME_DIR")
+        or os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "prompt_library"),
+        "prompt_library.sock",
+    ),
+)
+
+# Seconds to wait for the daemon to connect and start a command before running it in the calling process,
+# e.g. while the daemon is busy with a long command of another client
+DAEMON_START_TIMEOUT = float(os.getenv("PROMPT_LIBRARY_DAEMON_START_TIMEOUT", "2.0"))
+
+# Commands that always run in the calling process, forwarding them would manage the daemon from inside itself
+LOCAL_COMMANDS = frozenset({"daemon"})
+
+_HEADER = struct.Struct("!I")
+
+
+def send_frame(sock: socket.socket, message: dict[str, Any]) -> None:
+    """Send a length-prefixed JSON message.
+
+    Args:
+        sock: Connected Unix socket.
+        message: JSON serializable message.
+    """
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def recv_frame(stream: BinaryIO) -> Optional[dict[str, Any]]:
+    """Read a length-prefixed JSON message.
+
+    Args:
+        stream: Binary file object of the socket, see socket.makefile.
+
+    Returns:
+        Optional[dict[str, Any]]: The message, or None if the peer closed the connection.
+    """
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    (length,) = _HEADER.unpack(header)
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return json.loads(body)
+
+
+def connect(socket_path: Optional[str] = None, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """Connect to a running daemon.
+
+    Args:
+        socket_path: Path of the daemon socket. Defaults to DAEMON_SOCKET.
+        timeout: Connection timeout in seconds. Defaults to blocking.
+
+    Returns:
+        Optional[socket.socket]: The connected socket, or None if no daemon is listening.
+    """
+    socket_path = socket_path or DAEMON_SOCKET
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def request(message: dict[str, Any], socket_path: Optional[str] = None) -> Optional[dict[str, Any]]:
+    """Send a control message, e.g. {"control": "ping"}, and return the reply.
+
+    Args:
+        message: The control message.
+        socket_path: Path of the daemon socket. Defaults to DAEMON_SOCKET.
+
+    Returns:
+        Optional[dict[str, Any]]: The reply, or None if no daemon is listening.
+    """
+    sock = connect(socket_path, timeout=5.0)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rb") as stream:
+        send_frame(sock, message)
+        return recv_frame(stream)
+
+
+def run_in_daemon(
+    argv: list[str],
+    socket_path: Optional[str] = None,
+    stdin: Optional[IO[str]] = None,
+    stdout: Optional[IO[str]] = None,
+    stderr: Optional[IO[str]] = None,
+    start_timeout: Optional[float] = None,
+) -> Optional[int]:
+    """Run a CLI command in the daemon, streaming its output.
+
+    The daemon reads stdin on demand: it asks for a line or the rest of the input when the command reads
+    it, so commands that never read stdin do not wait for it to be closed. If the client goes away, e.g.
+    it is interrupted, the daemon interrupts the command.
+
+    Args:
+        argv: Command line arguments, without the program name.
+        socket_path: Path of the daemon socket. Defaults to DAEMON_SOCKET.
+        stdin: Input of the command. Defaults to sys.stdin.
+        stdout: Output of the command. Defaults to sys.stdout.
+        stderr: Error output of the command. Defaults to sys.stderr.
+        start_timeout: Seconds to wait for the daemon to accept the connection and start the command.
+            Defaults to DAEMON_START_TIMEOUT.
+
+    Returns:
+        Optional[int]: Exit code of the command, or None if no daemon accepted the command in time and
+        it should run in the calling process.
+    """
+    start_timeout = DAEMON_START_TIMEOUT if start_timeout is None else start_timeout
+    sock = connect(socket_path, timeout=start_timeout)
+    if sock is None:
+        return None
+    stdin = stdin or sys.stdin
+    outputs = {"stdout": stdout or sys.stdout, "stderr": stderr or sys.stderr}
+
+    with sock, sock.makefile("rb") as stream:
+        # Handshake: the daemon accepts the command, and only runs it once the client confirms. A client
+        # that timed out never confirms, so a command never runs both here and in the daemon.
+        sock.settimeout(start_timeout)
+        try:
+            send_frame(sock, {"argv": argv, "cwd": os.getcwd()})
+            accepted = recv_frame(stream)
+            if accepted is None or "accepted" not in accepted:
+                return None
+            send_frame(sock, {"run": True})
+        except OSError:
+            # Hung or busy daemon, closing the connection without confirming tells it not to run the command
+            return None
+        sock.settimeout(None)
+
+        while True:
+            message = recv_frame(stream)
+            if message is None:
+                outputs["stderr"].write("prompt_library: the daemon closed the connection\n")
+                return 1
+            if "exit" in message:
+                return message["exit"]
+            if "read" in message:
+                data = stdin.readline() if message["read"] == "line" else stdin.read()
+                send_frame(sock, {"stdin": data})
+                continue
+            for name, output in outputs.items():
+                if name in message:
+                    output.write(message[name])
+                    output.flush()
+
+
+def use_daemon(argv: list[str]) -> bool:
+    """Return whether a command should be forwarded to the daemon.
+
+    Args:
+        argv: Command line arguments, without the program name.
+
+    Returns:
+        bool: False for LOCAL_COMMANDS, when PROMPT_LIBRARY_NO_DAEMON is set or no daemon socket exists.
+    """
+    if os.getenv("PROMPT_LIBRARY_NO_DAEMON"):
+        return False
+    if argv and argv[0] in LOCAL_COMMANDS:
+        return False
+    return os.path.exists(DAEMON_SOCKET)
+
+
+def main() -> None:
+    """Entry point of the `prompt_library` script: use the daemon if one is running, else run the CLI here."""
+    argv = sys.argv[1:]
+    if use_daemon(argv):
+        exit_code = run_in_daemon(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from prompt_library.cli import main as cli_main
+
+    cli_main()
+
+
+if __name__ == "__main__":
+    main()
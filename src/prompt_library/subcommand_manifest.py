@@ -0,0 +1,262 @@
+"""prompt_library.subcommand_manifest"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import sys
+import tempfile
+
+from dataclasses import asdict, dataclass
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from loguru import logger
+
+import prompt_library
+
+
+if TYPE_CHECKING:
+    import typer
+
+
+# NOTE: Imported on every CLI startup, keep it free of heavy dependencies (see tests/test_cli_import_time.py).
+
+# Third party packages register subcommands under this entry point group, e.g. in their pyproject.toml:
+#   [project.entry-points."prompt_library.subcommands"]
+#   my_plugin = "my_package.cli:APP"
+ENTRY_POINT_GROUP = "prompt_library.subcommands"
+
+SUBCOMMAND_MANIFEST_FILE = os.getenv(
+    "PROMPT_LIBRARY_SUBCOMMAND_MANIFEST",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "prompt_library", "subcommands.json"),
+)
+
+# Bump when the layout of the cached manifest changes
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SubcommandEntry:
+    """A subcommand that can be resolved without importing it.
+
+    Attributes:
+        name: Name of the subcommand on the command line.
+        module: Module defining the subcommand.
+        attribute: Name of the Typer app in the module. Defaults to "APP".
+        help: Short help shown in the command listing.
+        source: "builtin" for subcommands shipped with prompt_library, otherwise the plugin distribution.
+    """
+
+    name: str
+    module: str
+    attribute: str = "APP"
+    help: str = ""
+    source: str = "builtin"
+
+    def load(self) -> typer.Typer:
+        """Import the module of the subcommand and return its Typer app."""
+        return getattr(import_module(self.module), self.attribute)
+
+
+def _help_text(path: Path) -> str:
+    """Read the help of a subcommand module without importing it.
+
+    Uses the `help` argument of the `APP = ...(help=...)` assignment if it is a literal, otherwise the
+    first line of the module docstring.
+
+    Args:
+        path: Path of the subcommand module.
+
+    Returns:
+        str: The help text, empty if none is found.
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(isinstance(target, ast.Name) and target.id == "APP" for target in node.targets)
+            and isinstance(node.value, ast.Call)
+        ):
+            for keyword in node.value.keywords:
+                if keyword.arg == "help" and isinstance(keyword.value, ast.Constant):
+                    return str(keyword.value.value)
+    docstring = ast.get_docstring(tree)
+    return docstring.strip().splitlines()[0] if docstring else ""
+
+
+def scan_subcommands(directory: Path, package: str) -> list[SubcommandEntry]:
+    """Find the `*_cmd.py` modules of a directory.
+
+    Args:
+        directory: Directory containing the subcommand modules.
+        package: Package the directory is imported as.
+
+    Returns:
+        list[SubcommandEntry]: One entry per module, sorted by name.
+    """
+    return [
+        SubcommandEntry(name=path.name[: -len("_cmd.py")], module=f"{package}.{path.stem}", help=_help_text(path))
+        for path in sorted(directory.glob("*_cmd.py"))
+    ]
+
+
+def scan_plugins() -> list[SubcommandEntry]:
+    """Find the subcommands registered by installed distributions under ENTRY_POINT_GROUP.
+
+    Returns:
+        list[SubcommandEntry]: One entry per entry point, the help is the summary of its distribution.
+    """
+    from importlib.metadata import entry_points
+
+    entries = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        distribution = entry_point.dist
+        entries.append(
+            SubcommandEntry(
+                name=entry_point.name,
+                module=entry_point.module,
+                attribute=entry_point.attr or "APP",
+                help=(distribution.metadata["Summary"] or "") if distribution else "",
+                source=distribution.name if distribution else "unknown",
+            )
+        )
+    return entries
+
+
+def _mtime_ns(path: str | Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _subcommands_fingerprint(directory: Path) -> list[Any]:
+    # Adding, removing or renaming a module updates the mtime of the directory, editing one in place only
+    # updates the mtime of the module; both come out of a single scandir
+    try:
+        with os.scandir(directory) as entries:
+            modules = [entry.stat().st_mtime_ns for entry in entries if entry.name.endswith("_cmd.py")]
+    except OSError:
+        return [None, None]
+    return [_mtime_ns(directory), max(modules, default=None)]
+
+
+def _plugins_fingerprint() -> list[Any]:
+    # Installing or removing a distribution adds or removes its metadata directory, which updates the
+    # mtime of the sys.path entry it lives in
+    return [[entry, _mtime_ns(entry)] for entry in sys.path if entry]
+
+
+def _read_manifest(manifest_file: str) -> dict[str, Any]:
+    try:
+        with open(manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def _write_manifest(manifest_file: str, manifest: dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(manifest_file) or ".", exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=os.path.dirname(manifest_file) or ".", suffix=".tmp", delete=False
+        ) as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f.name, manifest_file)
+    except OSError as e:
+        # The manifest is only a cache, a read-only home directory must not break the CLI
+        logger.debug(f"Could not write subcommand manifest {manifest_file}: {e}")
+
+
+def _cached(
+    section: str,
+    fingerprint: Any,
+    scan: Callable[[], list[SubcommandEntry]],
+    manifest_file: str,
+    refresh: bool,
+) -> list[SubcommandEntry]:
+    """Return the entries of a manifest section, scanning again if its fingerprint changed.
+
+    Args:
+        section: Name of the section in the manifest.
+        fingerprint: JSON serializable value that changes whenever the scan result may change.
+        scan: Function producing the entries.
+        manifest_file: Path of the manifest.
+        refresh: Scan even if the cached section is up to date.
+
+    Returns:
+        list[SubcommandEntry]: The entries of the section.
+    """
+    manifest = _read_manifest(manifest_file)
+    sections = manifest.setdefault("sections", {})
+    fingerprint = [prompt_library.__version__, fingerprint]
+    cached = sections.get(section)
+    if not refresh and cached and cached.get("fingerprint") == fingerprint:
+        try:
+            return [SubcommandEntry(**entry) for entry in cached["subcommands"]]
+        except (KeyError, TypeError):
+            logger.debug(f"Ignoring malformed subcommand manifest section {section}")
+
+    logger.debug(f"Scanning subcommands: {section}")
+    entries = scan()
+    # Another process may have updated other sections meanwhile, merge into the latest manifest
+    manifest = _read_manifest(manifest_file) or {"version": MANIFEST_VERSION, "sections": {}}
+    manifest.setdefault("sections", {})[section] = {
+        "fingerprint": fingerprint,
+        "subcommands": [asdict(entry) for entry in entries],
+    }
+    manifest["version"] = MANIFEST_VERSION
+    _write_manifest(manifest_file, manifest)
+    return entries
+
+
+def discover_subcommands(
+    directory: str | Path | None = None,
+    package: str | None = None,
+    plugins: bool = True,
+    manifest_file: str | None = None,
+    refresh: bool = False,
+) -> dict[str, SubcommandEntry]:
+    """Discover subcommands without importing them.
+
+    Subcommand modules are scanned once and cached in a manifest keyed on the mtimes of their directory
+    and of the newest module, entry point plugins are cached until a distribution is installed or removed. A cache hit costs a
+    few `stat` calls and reading one small JSON file, however many subcommands there are.
+
+    Args:
+        directory: Directory of the `*_cmd.py` modules. Defaults to the prompt_library subcommands.
+        package: Package the directory is imported as. Defaults to "prompt_library.subcommands".
+        plugins: Include the subcommands registered under ENTRY_POINT_GROUP. Defaults to True.
+        manifest_file: Path of the cached manifest. Defaults to SUBCOMMAND_MANIFEST_FILE.
+        refresh: Ignore the cached manifest and scan again. Defaults to False.
+
+    Returns:
+        dict[str, SubcommandEntry]: Subcommands by name. Plugins cannot shadow builtin subcommands.
+    """
+    directory = Path(directory) if directory else Path(__file__).parent / "subcommands"
+    package = package or "prompt_library.subcommands"
+    manifest_file = manifest_file or SUBCOMMAND_MANIFEST_FILE
+
+    subcommands = {
+        entry.name: entry
+        for entry in _cached(
+            f"{package}:{directory.resolve()}",
+            _subcommands_fingerprint(directory),
+            lambda: scan_subcommands(directory, package),
+            manifest_file,
+            refresh,
+        )
+    }
+    if plugins:
+        for entry in _cached(ENTRY_POINT_GROUP, _plugins_fingerprint(), scan_plugins, manifest_file, refresh):
+            if entry.name in subcommands:
+                logger.warning(f"Ignoring subcommand {entry.name} from {entry.source}, the name is already taken")
+                continue
+            subcommands[entry.name] = entry
+    return subcommands
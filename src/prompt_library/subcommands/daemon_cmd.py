@@ -0,0 +1,75 @@
+"""Keep a warm prompt_library process for fast repeated commands"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Annotated, Optional
+
+import typer
+
+from prompt_library.asynctyper import AsyncTyperImproved
+from prompt_library.daemon import DAEMON_LOG_FILE, serve, start
+from prompt_library.daemon_client import DAEMON_SOCKET, request
+
+
+APP = AsyncTyperImproved(help="Keep a warm prompt_library process for fast repeated commands")
+
+SocketOption = Annotated[
+    Optional[str], typer.Option("--socket", "-s", help="Unix socket path, defaults to PROMPT_LIBRARY_DAEMON_SOCKET")
+]
+
+
+@APP.command("serve")
+def cli_daemon_serve(
+    socket_path: SocketOption = None,
+    warm: Annotated[bool, typer.Option("--warm/--no-warm", help="Load subcommands and caches up front")] = True,
+) -> None:
+    """Run the daemon in the foreground."""
+    try:
+        serve(socket_path, warm=warm)
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from e
+
+
+@APP.command("start")
+def cli_daemon_start(socket_path: SocketOption = None) -> None:
+    """Start the daemon in the background; later commands are forwarded to it."""
+    status = request({"control": "ping"}, socket_path)
+    if status is not None:
+        typer.echo(f"Daemon already running, pid {status['pid']}")
+        return
+    try:
+        pid = start(socket_path)
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1) from e
+    typer.echo(f"Daemon started, pid {pid}, logging to {DAEMON_LOG_FILE}")
+
+
+@APP.command("stop")
+def cli_daemon_stop(socket_path: SocketOption = None) -> None:
+    """Stop the daemon."""
+    status = request({"control": "stop"}, socket_path)
+    if status is None:
+        typer.echo("No daemon running")
+        raise typer.Exit(1)
+    typer.echo(f"Daemon {status['pid']} stopped")
+
+
+@APP.command("status")
+def cli_daemon_status(socket_path: SocketOption = None) -> None:
+    """Show whether the daemon is running."""
+    status = request({"control": "ping"}, socket_path)
+    if status is None:
+        typer.echo(f"No daemon listening on {socket_path or DAEMON_SOCKET}")
+        raise typer.Exit(1)
+    started_at = datetime.fromtimestamp(status["started_at"]).isoformat(timespec="seconds")
+    typer.echo(
+        f"Daemon {status['pid']} (prompt_library {status['version']}) running since {started_at}, "
+        f"{status['requests']} commands served"
+    )
+
+
+if __name__ == "__main__":
+    APP()
@@ -0,0 +1,44 @@
+"""Export the prompt execution history"""
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+import typer
+
+from prompt_library.asynctyper import AsyncTyperImproved
+from prompt_library.common.execution_export import EXPORT_FORMATS, export_executions
+from prompt_library.common.execution_log import ExecutionLogStore
+
+
+APP = AsyncTyperImproved(help="Export the prompt execution history")
+
+
+@APP.command("export")
+def cli_executions_export(
+    output: Annotated[
+        Optional[str], typer.Option("--output", "-o", help="Dataset directory, defaults to EXECUTION_EXPORT_DIR")
+    ] = None,
+    export_format: Annotated[str, typer.Option("--format", "-f", help="parquet or arrow")] = "parquet",
+    log_dir: Annotated[
+        Optional[str], typer.Option("--log-dir", help="Execution log directory, defaults to EXECUTION_LOG_DIR")
+    ] = None,
+    executions_dir: Annotated[
+        Optional[str],
+        typer.Option("--executions-dir", help="Per-run JSON directory, defaults to PROMPT_EXECUTIONS_DIR"),
+    ] = None,
+    legacy: Annotated[bool, typer.Option("--legacy/--no-legacy", help="Include the per-run JSON files")] = True,
+) -> None:
+    """Write the execution history as a dataset partitioned by date and prompt template."""
+    if export_format not in EXPORT_FORMATS:
+        raise typer.BadParameter(f"Expected one of {', '.join(EXPORT_FORMATS)}", param_hint="--format")
+
+    with ExecutionLogStore(log_dir) as store:
+        rows = export_executions(
+            output, export_format, store=store, executions_dir=executions_dir, include_legacy=legacy
+        )
+    typer.echo(f"Exported {rows} rows")
+
+
+if __name__ == "__main__":
+    APP()
@@ -0,0 +1,55 @@
+"""Search the prompt library"""
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+import typer
+
+from rich.console import Console
+from rich.table import Table
+
+from prompt_library.asynctyper import AsyncTyperImproved
+from prompt_library.common.prompt_search import load_search_index
+
+
+APP = AsyncTyperImproved(help="Search the prompt library")
+console = Console()
+
+
+@APP.command("query")
+def cli_search_query(
+    query: Annotated[str, typer.Argument(help="Words to search for; the last one may be a prefix")],
+    limit: Annotated[int, typer.Option("--limit", "-n", help="Maximum number of results")] = 10,
+    directory: Annotated[
+        Optional[str], typer.Option("--directory", "-d", help="Prompt directory, defaults to PROMPT_LIBRARY_DIR")
+    ] = None,
+    raw: Annotated[bool, typer.Option("--raw", help="Pass the query to SQLite FTS5 unchanged")] = False,
+) -> None:
+    """Search prompt bodies and metadata.json names, tags and descriptions."""
+    _, search_index = load_search_index(directory)
+    results = search_index.search(query, limit=limit, raw=raw)
+    if not results:
+        typer.echo("No matching prompts")
+        return
+
+    table = Table("Path", "Name", "Tags", "Match")
+    for result in results:
+        table.add_row(result.path, result.name or "", ", ".join(result.tags), result.snippet)
+    console.print(table)
+
+
+@APP.command("rebuild")
+def cli_search_rebuild(
+    directory: Annotated[
+        Optional[str], typer.Option("--directory", "-d", help="Prompt directory, defaults to PROMPT_LIBRARY_DIR")
+    ] = None,
+) -> None:
+    """Rebuild the search index from scratch."""
+    index, search_index = load_search_index(directory)
+    count = search_index.rebuild(index)
+    typer.echo(f"Indexed {count} prompts from {index.directory}")
+
+
+if __name__ == "__main__":
+    APP()
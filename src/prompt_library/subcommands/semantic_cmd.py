@@ -0,0 +1,57 @@
+"""Find prompts by meaning with local embeddings"""
+
+from __future__ import annotations
+
+from typing import Annotated, Optional
+
+import typer
+
+from rich.console import Console
+from rich.table import Table
+
+from prompt_library.asynctyper import AsyncTyperImproved
+from prompt_library.common.prompt_embeddings import DEFAULT_EMBEDDING_MODEL, load_semantic_index
+
+
+APP = AsyncTyperImproved(help="Find prompts by meaning with local embeddings")
+console = Console()
+
+DirectoryOption = Annotated[
+    Optional[str], typer.Option("--directory", "-d", help="Prompt directory, defaults to PROMPT_LIBRARY_DIR")
+]
+ModelOption = Annotated[str, typer.Option("--model", "-m", help="sentence-transformers model")]
+
+
+@APP.command("index")
+def cli_semantic_index(
+    directory: DirectoryOption = None,
+    model: ModelOption = DEFAULT_EMBEDDING_MODEL,
+    batch_size: Annotated[int, typer.Option("--batch-size", help="Prompts embedded per batch")] = 32,
+) -> None:
+    """Embed every prompt whose content is not in the vector index yet."""
+    index, semantic_index = load_semantic_index(directory, model_name=model, batch_size=batch_size)
+    typer.echo(f"Indexed {len(semantic_index)} distinct prompts from {index.directory}")
+
+
+@APP.command("query")
+def cli_semantic_query(
+    query: Annotated[str, typer.Argument(help="What the prompt should do, in natural language")],
+    limit: Annotated[int, typer.Option("--limit", "-n", help="Maximum number of results")] = 5,
+    directory: DirectoryOption = None,
+    model: ModelOption = DEFAULT_EMBEDDING_MODEL,
+) -> None:
+    """Show the prompts closest in meaning to the query."""
+    _, semantic_index = load_semantic_index(directory, model_name=model)
+    results = semantic_index.query(query, limit=limit)
+    if not results:
+        typer.echo("No prompts indexed")
+        return
+
+    table = Table("Path", "Distance")
+    for result in results:
+        table.add_row(result.path, f"{result.distance:.3f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    APP()
@@ -41,6 +41,8 @@ from vcr import filters
 
 import pytest
 
+from prompt_library import subcommand_manifest
+
 
 if TYPE_CHECKING:
     from _pytest.config import Config as PytestConfig
@@ -54,6 +56,27 @@ if TYPE_CHECKING:
 
 INDEX_NAME = "goobaiunittest"
 
+
+@pytest.fixture(autouse=True, scope="session")
+def subcommand_manifest_file(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """Keep the subcommand manifest written by the tests out of the user's cache directory.
+
+    The environment variable is set as well, so CLI subprocesses started by the tests use it too.
+
+    Args:
+        tmp_path_factory: Pytest fixture creating session temporary directories.
+
+    Yields:
+        str: Path of the manifest used by the tests.
+    """
+    path = str(tmp_path_factory.mktemp("subcommand_manifest") / "subcommands.json")
+    patcher = MonkeyPatch()
+    patcher.setenv("PROMPT_LIBRARY_SUBCOMMAND_MANIFEST", path)
+    patcher.setattr(subcommand_manifest, "SUBCOMMAND_MANIFEST_FILE", path)
+    yield path
+    patcher.undo()
+
+
 T = TypeVar("T")
 
 YieldFixture = Generator[T, None, None]
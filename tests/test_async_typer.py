@@ -3,15 +3,18 @@
 from __future__ import annotations
 
 import asyncio
+import threading
+import time
 
 from collections.abc import AsyncGenerator, Generator
 from typing import TYPE_CHECKING, Any
 
 from typer import Typer
+from typer.testing import CliRunner
 
 import pytest
 
-from prompt_library.asynctyper import AsyncTyper, AsyncTyperImproved
+from prompt_library.asynctyper import AsyncTyper, AsyncTyperImproved, CommandRunner
 
 
 if TYPE_CHECKING:
@@ -91,7 +94,7 @@ async def test_maybe_run_async_with_async_function(async_typer: AsyncTyperImprov
         return "async"
 
     decorated = async_typer.maybe_run_async(lambda x: x, async_func)
-    result = await decorated()
+    result = decorated()
     assert result == "async"
 
 
@@ -124,7 +127,7 @@ async def test_callback_with_async_function(async_typer: AsyncTyperImproved) ->
     async def async_callback() -> str:
         return "async callback"
 
-    result = await async_callback()
+    result = async_callback()
     assert result == "async callback"
 
 
@@ -157,7 +160,7 @@ async def test_command_with_async_function(async_typer: AsyncTyperImproved) -> N
     async def async_command() -> str:
         return "async command"
 
-    result = await async_command()
+    result = async_command()
     assert result == "async command"
 
 
@@ -213,7 +216,7 @@ async def test_async_command_execution(async_typer: AsyncTyperImproved) -> None:
         await asyncio.sleep(0.1)  # Reduced sleep time for faster tests
         return "async result"
 
-    result = await async_command()
+    result = async_command()
     assert result == "async result"
 
 
@@ -231,5 +234,198 @@ async def test_async_callback_execution(async_typer: AsyncTyperImproved) -> None
         await asyncio.sleep(0.1)  # Reduced sleep time for faster tests
         return "async callback result"
 
-    result = await async_callback()
+    result = async_callback()
     assert result == "async callback result"
+
+
+@pytest.fixture
+def command_runner() -> Generator[CommandRunner, None, None]:
+    """Fixture that provides a CommandRunner closed after the test.
+
+    Yields:
+        CommandRunner: A runner with the lag monitor reporting stalls over 50ms.
+    """
+    runner = CommandRunner(slow_callback_duration=0.05)
+    yield runner
+    runner.close()
+
+
+async def current_loop() -> tuple[asyncio.AbstractEventLoop, threading.Thread]:
+    """Return the loop and thread a coroutine runs on."""
+    return asyncio.get_running_loop(), threading.current_thread()
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_reuses_loop(command_runner: CommandRunner) -> None:
+    """Test that consecutive commands run on the same loop in the calling thread.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+    first_loop, first_thread = command_runner.run(current_loop())
+    second_loop, second_thread = command_runner.run(current_loop())
+
+    assert first_loop is second_loop
+    assert first_thread is second_thread is threading.current_thread()
+    assert command_runner.stats.commands == 2
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_loop_implementation() -> None:
+    """Test that uvloop is used when installed and enabled, and never in debug mode."""
+    uvloop = pytest.importorskip("uvloop")
+    for use_uvloop, debug, expected in [(True, False, True), (False, False, False), (True, True, False)]:
+        runner = CommandRunner(use_uvloop=use_uvloop, debug=debug)
+        loop, _ = runner.run(current_loop())
+        assert isinstance(loop, uvloop.Loop) is expected
+        assert loop.get_debug() is debug
+        runner.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.asynciotyper
+async def test_command_runner_inside_running_loop(command_runner: CommandRunner) -> None:
+    """Test that commands run from a running loop return their result from a reused background loop.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+    first_loop, first_thread = command_runner.run(current_loop())
+    second_loop, _ = command_runner.run(current_loop())
+
+    assert first_loop is second_loop is not asyncio.get_running_loop()
+    assert first_thread is not threading.current_thread()
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_rejects_blocking_on_its_own_loop(command_runner: CommandRunner) -> None:
+    """Test that blocking on a command from the background loop raises instead of deadlocking.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+
+    async def outer() -> Any:
+        return command_runner.run(current_loop())
+
+    async def notebook_cell() -> Any:
+        return command_runner.run(outer())
+
+    with pytest.raises(RuntimeError, match="await it instead"):
+        asyncio.run(notebook_cell())
+
+
+def run_with_timeout(target: Any, timeout: float = 5.0) -> list[Any]:
+    """Call a function in a daemon thread so a deadlock fails the test instead of hanging it.
+
+    Args:
+        target: Function to call.
+        timeout: Seconds to wait for it.
+
+    Returns:
+        list[Any]: The result of the function, as a one element list.
+    """
+    results: list[Any] = []
+    thread = threading.Thread(target=lambda: results.append(target()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "the command runner deadlocked"
+    return results
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_nested_run(command_runner: CommandRunner) -> None:
+    """Test that a command blocking on another command from the runner's loop gets the background loop.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+
+    async def outer() -> Any:
+        return asyncio.get_running_loop(), command_runner.run(current_loop())
+
+    [(outer_loop, (inner_loop, inner_thread))] = run_with_timeout(lambda: command_runner.run(outer()))
+
+    assert inner_loop is not outer_loop
+    assert inner_thread.name == "prompt_library-command-loop"
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_concurrent_threads(command_runner: CommandRunner) -> None:
+    """Test that a command started while another thread uses the runner does not wait for it.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+    release = threading.Event()
+
+    async def long_command() -> None:
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+
+    first = threading.Thread(target=command_runner.run, args=(long_command(),))
+    first.start()
+    time.sleep(0.1)
+    try:
+        [(_, second_thread)] = run_with_timeout(lambda: command_runner.run(current_loop()))
+    finally:
+        release.set()
+        first.join(timeout=5)
+
+    assert second_thread.name == "prompt_library-command-loop"
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_propagates_exceptions(command_runner: CommandRunner) -> None:
+    """Test that exceptions of a command reach the caller and the loop stays usable.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+
+    async def fail() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        command_runner.run(fail())
+    assert command_runner.run(current_loop())[1] is threading.current_thread()
+
+
+@pytest.mark.asynciotyper
+def test_command_runner_reports_blocked_loop(command_runner: CommandRunner) -> None:
+    """Test that blocking calls inside a command are counted as stalls.
+
+    Args:
+        command_runner: Fixture providing a CommandRunner.
+    """
+
+    async def blocking() -> None:
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+
+    command_runner.run(blocking())
+
+    assert command_runner.stats.stalls >= 1
+    assert command_runner.stats.max_lag >= 0.1
+
+
+@pytest.mark.asynciotyper
+def test_async_commands_share_loop_through_cli() -> None:
+    """Test that async commands invoked through the CLI reuse one event loop."""
+    app = AsyncTyperImproved()
+    loops: list[asyncio.AbstractEventLoop] = []
+
+    @app.command()
+    async def first() -> None:
+        loops.append(asyncio.get_running_loop())
+
+    @app.command()
+    async def second() -> None:
+        loops.append(asyncio.get_running_loop())
+
+    runner = CliRunner()
+    assert runner.invoke(app, ["first"]).exit_code == 0
+    assert runner.invoke(app, ["second"]).exit_code == 0
+    assert len(loops) == 2
+    assert loops[0] is loops[1]
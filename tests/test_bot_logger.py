@@ -0,0 +1,148 @@
+"""Test the logging configuration of prompt_library."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import sys
+import threading
+
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+import pytest
+
+from prompt_library import bot_logger
+from prompt_library.bot_logger import BatchingSink, _message_only, global_log_config, serialize_record
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+class BlockingStream(io.StringIO):
+    """A stream whose writes wait until it is released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.released = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.released.wait(timeout=5)
+        return super().write(text)
+
+
+@pytest.fixture
+def restore_logging() -> Iterator[None]:
+    """Restore the loguru handlers and standard logging configuration changed by global_log_config."""
+    handlers = {name: logging.getLogger(name).handlers[:] for name in logging.root.manager.loggerDict}
+    root_level = logging.root.level
+    yield
+    logger.remove()
+    logger.add(sys.stderr)
+    for name, previous in handlers.items():
+        logging.getLogger(name).handlers = previous
+    logging.root.setLevel(root_level)
+
+
+def test_batching_sink_writes_in_order() -> None:
+    """Test that messages are written in order and counted."""
+    stream = io.StringIO()
+    sink = BatchingSink(stream)
+    handler_id = logger.add(sink, format="{message}")
+
+    for i in range(100):
+        logger.info("message {}", i)
+    sink.drain()
+
+    assert stream.getvalue().splitlines() == [f"message {i}" for i in range(100)]
+    assert sink.stats() == {"written": 100, "dropped": 0, "queued": 0}
+    logger.remove(handler_id)
+
+
+def test_batching_sink_drops_on_overflow() -> None:
+    """Test that a full queue drops messages instead of blocking, and reports them on stop."""
+    stream = BlockingStream()
+    sink = BatchingSink(stream, max_queue_size=5)
+    handler_id = logger.add(sink, format="{message}")
+
+    for i in range(50):
+        logger.info("message {}", i)
+
+    assert sink.dropped >= 50 - 5 - 1
+    stream.released.set()
+    logger.remove(handler_id)
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == sink.written + 1
+    assert lines[-1] == f"prompt_library: dropped {sink.dropped} log messages, the log queue was full"
+
+
+def test_serialize_record() -> None:
+    """Test JSON serialization of records with non-JSON extras and exceptions."""
+    stream = io.StringIO()
+    sink = BatchingSink(stream, serializer=serialize_record)
+    handler_id = logger.add(sink, format=_message_only)
+
+    logger.bind(payload={"path": Path("a.txt"), "when": datetime(2024, 1, 2, tzinfo=UTC), "big": 2**70}).info("hi")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    logger.remove(handler_id)
+
+    info, error = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert info["message"] == "hi"
+    assert info["level"] == "INFO"
+    assert info["function"] == "test_serialize_record"
+    assert info["extra"]["payload"] == {"path": "a.txt", "when": "2024-01-02T00:00:00+00:00", "big": 2**70}
+    assert "exception" not in info
+    assert error["exception"].startswith("Traceback")
+    assert "ValueError: boom" in error["exception"]
+
+
+def test_global_log_config_production_json(restore_logging: None, monkeypatch: MonkeyPatch) -> None:
+    """Test the production profile: level gating, batched JSON lines and no payload pretty-printing.
+
+    Args:
+        restore_logging: Fixture restoring the logging configuration.
+        monkeypatch: Pytest fixture for patching.
+    """
+    stream = io.StringIO()
+    monkeypatch.setattr(bot_logger, "stdout", stream)
+
+    global_log_config(log_level="INFO", json=True, production=True)
+    logger.debug("hidden {}", "debug")
+    logger.bind(payload=[1, 2]).info("shown")
+    logger.remove()
+
+    (line,) = stream.getvalue().splitlines()
+    record = json.loads(line)
+    assert (record["message"], record["extra"]["payload"]) == ("shown", [1, 2])
+
+
+def test_global_log_config_production_text(restore_logging: None, monkeypatch: MonkeyPatch) -> None:
+    """Test the production text format renders payloads on one line.
+
+    Args:
+        restore_logging: Fixture restoring the logging configuration.
+        monkeypatch: Pytest fixture for patching.
+    """
+    monkeypatch.setenv("LOG_PROFILE", "production")
+    monkeypatch.setattr(bot_logger, "LOG_PROFILE", "production")
+    stream = io.StringIO()
+    monkeypatch.setattr(bot_logger, "stdout", stream)
+
+    global_log_config(log_level=logging.INFO)
+    logger.bind(payload={"users": ["Nick", "Alex"]}).warning("users payload")
+    logger.remove()
+
+    (line,) = stream.getvalue().splitlines()
+    assert "users payload" in line
+    assert "'users': ['Nick', 'Alex']" in line
+    assert "<level>" not in line
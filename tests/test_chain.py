@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import os
+import threading
+import time
 
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Tuple, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple, cast
+
+from pydantic import BaseModel
 
 import pytest
 
@@ -383,6 +389,27 @@ def test_minimal_chainable_markdown_json_handling(markdown_json: str, expected:
     assert outputs[0] == expected
 
 
+def test_minimal_chainable_schemas() -> None:
+    """Test validating step outputs against per-step schemas."""
+
+    class Answer(BaseModel):
+        answer: str
+
+    model = MockModel("test", ["free text", '```python\nx = 1\n```\n```json\n{"answer": "yes"}\n```'])
+    outputs, _ = MinimalChainable.run(
+        context={},
+        model=model,
+        callable=mock_callable,
+        prompts=["first", "second"],
+        schemas=[None, Answer],
+    )
+
+    assert outputs == ["free text", {"answer": "yes"}]
+
+    with pytest.raises(ValueError, match="Expected 2 schemas"):
+        MinimalChainable.run(context={}, model=model, callable=mock_callable, prompts=["a", "b"], schemas=[Answer])
+
+
 def test_fusion_chain_parallel_worker_count(
     mock_models: list[MockModel],
     sample_context: dict[str, Any],
@@ -410,3 +437,458 @@ def test_fusion_chain_parallel_worker_count(
         assert isinstance(result, FusionChainResult)
         assert len(result.all_prompt_responses) == len(mock_models)
         assert len(result.performance_scores) == len(mock_models)
+
+
+def test_fusion_chain_run_parallel_preserves_model_order(sample_context: dict[str, Any]) -> None:
+    """Test that run_parallel keeps outputs aligned with the model order.
+
+    Args:
+        sample_context: Sample context dictionary.
+    """
+    models = [MockModel("slow", ["slow response"]), MockModel("fast", ["fast response"])]
+
+    def delayed_callable(model: MockModel, prompt: str) -> str:
+        if model.name == "slow":
+            time.sleep(0.2)
+        return model.get_response(prompt)
+
+    result = FusionChain.run_parallel(
+        context=sample_context,
+        models=models,
+        callable=delayed_callable,
+        prompts=["{{name}}"],
+        evaluator=mock_evaluator,
+        get_model_name=mock_get_model_name,
+        num_workers=2,
+    )
+
+    assert result.llm_model_names == ["slow", "fast"]
+    assert result.all_prompt_responses == [["slow response"], ["fast response"]]
+
+
+def test_fusion_chain_run_streaming(sample_context: dict[str, Any]) -> None:
+    """Test that run_streaming yields results as models finish with partial scores.
+
+    Args:
+        sample_context: Sample context dictionary.
+    """
+    models = [MockModel("slow", ["slow response"]), MockModel("fast", ["fast response"])]
+    evaluated: list[list[str]] = []
+
+    def delayed_callable(model: MockModel, prompt: str) -> str:
+        if model.name == "slow":
+            time.sleep(0.2)
+        return model.get_response(prompt)
+
+    def partial_evaluator(outputs: list[str]) -> tuple[str, list[float]]:
+        evaluated.append(list(outputs))
+        return outputs[-1], [1.0] * len(outputs)
+
+    results = list(
+        FusionChain.run_streaming(
+            context=sample_context,
+            models=models,
+            callable=delayed_callable,
+            prompts=["{{name}}"],
+            get_model_name=mock_get_model_name,
+            partial_evaluator=partial_evaluator,
+            num_workers=2,
+        )
+    )
+
+    assert [r.llm_model_name for r in results] == ["fast", "slow"]
+    assert [r.model_index for r in results] == [1, 0]
+    assert results[0].performance_scores == [None, 1.0]
+    assert results[1].performance_scores == [1.0, 1.0]
+    assert evaluated == [["fast response"], ["slow response", "fast response"]]
+
+
+def test_fusion_chain_run_streaming_without_evaluator(
+    mock_models: list[MockModel],
+    sample_context: dict[str, Any],
+    sample_prompts: list[str],
+) -> None:
+    """Test run_streaming without a partial evaluator.
+
+    Args:
+        mock_models: List of mock models.
+        sample_context: Sample context dictionary.
+        sample_prompts: List of sample prompts.
+    """
+    results = list(
+        FusionChain.run_streaming(
+            context=sample_context,
+            models=mock_models,
+            callable=mock_callable,
+            prompts=sample_prompts,
+            get_model_name=mock_get_model_name,
+        )
+    )
+
+    assert sorted(r.model_index for r in results) == [0, 1, 2]
+    assert all(r.performance_scores is None for r in results)
+    assert all(len(r.prompt_responses) == len(sample_prompts) for r in results)
+
+
+def test_fusion_chain_run_streaming_waits_for_running_models_on_failure(sample_context: dict[str, Any]) -> None:
+    """Test that a failing model does not leave the calls of the other models running.
+
+    Args:
+        sample_context: Sample context dictionary.
+    """
+    models = [MockModel("failing", ["unused"]), MockModel("slow", ["slow response"])]
+    finished: list[str] = []
+    slow_started = threading.Event()
+
+    def callable(model: MockModel, prompt: str) -> str:
+        if model.name == "failing":
+            slow_started.wait(timeout=5)
+            raise ValueError("Test error")
+        slow_started.set()
+        time.sleep(0.2)
+        finished.append(model.name)
+        return model.get_response(prompt)
+
+    with pytest.raises(RuntimeError, match="Test error"):
+        list(
+            FusionChain.run_streaming(
+                context=sample_context,
+                models=models,
+                callable=callable,
+                prompts=["{{name}}"],
+                get_model_name=mock_get_model_name,
+                num_workers=2,
+            )
+        )
+
+    # The call still running when the error surfaced was waited for, not abandoned
+    assert finished == ["slow"]
+
+
+async def async_mock_callable(model: MockModel, prompt: str) -> str:
+    """Async mock callable for testing.
+
+    Args:
+        model: Mock model instance.
+        prompt: Input prompt.
+
+    Returns:
+        str: Model's response.
+    """
+    await asyncio.sleep(0)
+    return model.get_response(prompt)
+
+
+@pytest.mark.asyncio
+async def test_minimal_chainable_arun(
+    mock_models: list[MockModel],
+    sample_context: dict[str, Any],
+    sample_prompts: list[str],
+) -> None:
+    """Test MinimalChainable.arun with an async callable.
+
+    Args:
+        mock_models: List of mock models.
+        sample_context: Sample context dictionary.
+        sample_prompts: List of sample prompts.
+    """
+    outputs, filled_prompts = await MinimalChainable.arun(
+        context=sample_context,
+        model=mock_models[0],
+        callable=async_mock_callable,
+        prompts=sample_prompts,
+    )
+
+    assert outputs == ["response1", "response2", "response1"]
+    assert filled_prompts[0] == "First prompt with test"
+    assert filled_prompts[1] == "Second prompt with response1"
+
+
+@pytest.mark.asyncio
+async def test_minimal_chainable_arun_sync_callable(
+    mock_models: list[MockModel],
+    sample_context: dict[str, Any],
+    sample_prompts: list[str],
+) -> None:
+    """Test MinimalChainable.arun with a synchronous callable.
+
+    Args:
+        mock_models: List of mock models.
+        sample_context: Sample context dictionary.
+        sample_prompts: List of sample prompts.
+    """
+    outputs, _ = await MinimalChainable.arun(
+        context=sample_context,
+        model=mock_models[0],
+        callable=mock_callable,
+        prompts=sample_prompts,
+    )
+
+    assert outputs == ["response1", "response2", "response1"]
+
+
+class AsyncCallableModel:
+    """Callable object with an async __call__, like a bound client."""
+
+    async def __call__(self, model: MockModel, prompt: str) -> str:
+        await asyncio.sleep(0)
+        return model.get_response(prompt)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "callable",
+    [
+        AsyncCallableModel(),
+        functools.partial(async_mock_callable),
+        functools.partial(AsyncCallableModel()),
+        lambda model, prompt: async_mock_callable(model, prompt),
+    ],
+    ids=["async-callable-object", "partial", "partial-of-callable-object", "lambda-returning-coroutine"],
+)
+async def test_minimal_chainable_arun_awaitable_callables(
+    callable: Callable[[MockModel, str], Any],
+    mock_models: list[MockModel],
+    sample_context: dict[str, Any],
+    sample_prompts: list[str],
+) -> None:
+    """Test that arun awaits callables that are not plain coroutine functions.
+
+    Args:
+        callable: Callable returning an awaitable.
+        mock_models: List of mock models.
+        sample_context: Sample context dictionary.
+        sample_prompts: List of sample prompts.
+    """
+    outputs, _ = await MinimalChainable.arun(
+        context=sample_context,
+        model=mock_models[0],
+        callable=callable,
+        prompts=sample_prompts,
+    )
+
+    assert outputs == ["response1", "response2", "response1"]
+
+
+@pytest.mark.asyncio
+async def test_minimal_chainable_arun_timeout(mock_models: list[MockModel]) -> None:
+    """Test that a model call exceeding the timeout raises TimeoutError.
+
+    Args:
+        mock_models: List of mock models.
+    """
+
+    async def slow_callable(model: MockModel, prompt: str) -> str:
+        await asyncio.sleep(1)
+        return "too late"
+
+    with pytest.raises(TimeoutError):
+        await MinimalChainable.arun({}, mock_models[0], slow_callable, ["prompt"], timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_fusion_chain_arun(
+    mock_models: list[MockModel],
+    sample_context: dict[str, Any],
+    sample_prompts: list[str],
+) -> None:
+    """Test FusionChain.arun.
+
+    Args:
+        mock_models: List of mock models.
+        sample_context: Sample context dictionary.
+        sample_prompts: List of sample prompts.
+    """
+    result = await FusionChain.arun(
+        context=sample_context,
+        models=mock_models,
+        callable=async_mock_callable,
+        prompts=sample_prompts,
+        evaluator=mock_evaluator,
+        get_model_name=mock_get_model_name,
+    )
+
+    assert isinstance(result, FusionChainResult)
+    assert result.llm_model_names == ["model1", "model2", "model3"]
+    assert len(result.performance_scores) == len(mock_models)
+
+
+@pytest.mark.asyncio
+async def test_fusion_chain_arun_parallel_bounded(sample_context: dict[str, Any]) -> None:
+    """Test that arun_parallel keeps model order and honours max_concurrency.
+
+    Args:
+        sample_context: Sample context dictionary.
+    """
+    models = [MockModel(f"model{i}", [f"response{i}"]) for i in range(5)]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def counting_callable(model: MockModel, prompt: str) -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01 * (5 - int(model.name[-1])))
+        in_flight -= 1
+        return model.get_response(prompt)
+
+    result = await FusionChain.arun_parallel(
+        context=sample_context,
+        models=models,
+        callable=counting_callable,
+        prompts=["{{name}}"],
+        evaluator=mock_evaluator,
+        get_model_name=mock_get_model_name,
+        max_concurrency=2,
+    )
+
+    assert max_in_flight == 2
+    assert result.all_prompt_responses == [[f"response{i}"] for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_fusion_chain_arun_parallel_cancels_on_failure(mock_models: list[MockModel]) -> None:
+    """Test that a failing model cancels the other chains.
+
+    Args:
+        mock_models: List of mock models.
+    """
+    cancelled: list[str] = []
+
+    async def failing_callable(model: MockModel, prompt: str) -> str:
+        if model.name == "model1":
+            raise ValueError("Test error")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(model.name)
+            raise
+        return "never"
+
+    with pytest.raises(RuntimeError, match="Parallel execution failed"):
+        await FusionChain.arun_parallel(
+            context={},
+            models=mock_models,
+            callable=failing_callable,
+            prompts=["prompt"],
+            evaluator=mock_evaluator,
+            get_model_name=mock_get_model_name,
+        )
+
+    assert sorted(cancelled) == ["model2", "model3"]
+
+
+@pytest.mark.asyncio
+async def test_fusion_chain_astream_cancels_losers(mock_models: list[MockModel]) -> None:
+    """Test that stopping iteration after the first result cancels the slower chains.
+
+    Args:
+        mock_models: List of mock models.
+    """
+    cancelled: list[str] = []
+
+    async def racing_callable(model: MockModel, prompt: str) -> str:
+        try:
+            await asyncio.sleep(0 if model.name == "model2" else 10)
+        except asyncio.CancelledError:
+            cancelled.append(model.name)
+            raise
+        return model.get_response(prompt)
+
+    stream = FusionChain.astream({}, mock_models, racing_callable, ["prompt"], mock_get_model_name)
+    async for model_result in stream:
+        winner = model_result
+        break
+    await stream.aclose()
+
+    assert winner.llm_model_name == "model2"
+    assert sorted(cancelled) == ["model1", "model3"]
+
+
+def test_minimal_chainable_dependency_graph() -> None:
+    """Test building the step dependency graph from output references."""
+    prompts = [
+        "Analyse {{topic}}",
+        "Critique {{topic}} ignoring {{output[-5]}}",
+        "Summarise {{output[-1]}}",
+        "Merge {{output[-3]}} and {{output[-1].key}}",
+    ]
+
+    assert MinimalChainable.dependency_graph(prompts) == [
+        frozenset(),
+        frozenset(),
+        frozenset({1}),
+        frozenset({0, 2}),
+    ]
+
+
+def test_fusion_chain_run_dag(mock_models: list[MockModel]) -> None:
+    """Test that run_dag matches run and runs independent steps concurrently.
+
+    Args:
+        mock_models: List of mock models.
+    """
+    prompts = [
+        "First analysis of {{topic}}",
+        "Second analysis of {{topic}}",
+        "Third analysis of {{topic}}",
+        "Merge {{output[-3]}} | {{output[-2]}} | {{output[-1]}}",
+    ]
+    calls: list[str] = []
+
+    def echo_callable(model: MockModel, prompt: str) -> str:
+        calls.append(prompt)
+        time.sleep(0.05)
+        return f"{model.name}: {prompt}"
+
+    sequential = FusionChain.run(
+        {"topic": "x"}, mock_models, echo_callable, prompts, mock_evaluator, mock_get_model_name
+    )
+
+    start = time.perf_counter()
+    result = FusionChain.run_dag(
+        {"topic": "x"}, mock_models, echo_callable, prompts, mock_evaluator, mock_get_model_name, num_workers=9
+    )
+    elapsed = time.perf_counter() - start
+
+    assert result.all_prompt_responses == sequential.all_prompt_responses
+    assert result.all_context_filled_prompts == sequential.all_context_filled_prompts
+    assert result.llm_model_names == ["model1", "model2", "model3"]
+    # Two levels of 0.05s steps instead of four
+    assert elapsed < 0.18
+
+
+def test_fusion_chain_run_dag_error_handling(mock_models: list[MockModel], sample_prompts: list[str]) -> None:
+    """Test that a failing step aborts run_dag.
+
+    Args:
+        mock_models: List of mock models.
+        sample_prompts: List of sample prompts.
+    """
+
+    def failing_callable(model: MockModel, prompt: str) -> str:
+        raise ValueError("Test error")
+
+    with pytest.raises(RuntimeError, match="Parallel execution failed"):
+        FusionChain.run_dag({}, mock_models, failing_callable, sample_prompts, mock_evaluator, mock_get_model_name)
+
+
+def test_minimal_chainable_run_stream() -> None:
+    """Test streaming a chain with chunk callbacks."""
+    responses = iter([["{", '"key": ', '"value"}'], ["done"]])
+    chunks: list[tuple[int, str]] = []
+
+    def stream_callable(model: MockModel, prompt: str) -> list[str]:
+        return next(responses)
+
+    outputs, filled_prompts = MinimalChainable.run_stream(
+        context={},
+        model=MockModel("test", []),
+        stream_callable=stream_callable,
+        prompts=["First prompt", "Use {{output[-1].key}}"],
+        on_chunk=lambda i, chunk: chunks.append((i, chunk)),
+    )
+
+    assert outputs == [{"key": "value"}, "done"]
+    assert filled_prompts == ["First prompt", "Use value"]
+    assert chunks == [(0, "{"), (0, '"key": '), (0, '"value"}'), (1, "done")]
@@ -0,0 +1,115 @@
+"""Guard the startup cost of the prompt_library CLI."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from prompt_library.cli import APP, get_subcommands
+
+
+runner = CliRunner()
+
+# Import overhead allowed on top of the CLI framework (typer and loguru), in microseconds
+IMPORT_BUDGET_US = 100_000
+
+HEAVY_PACKAGES = {
+    "anyio",
+    "asyncer",
+    "bpdb",
+    "bpython",
+    "chromadb",
+    "langchain",
+    "langchain_chroma",
+    "langchain_core",
+    "llm",
+    "numpy",
+    "pandas",
+    "pyarrow",
+    "pysnooper",
+    "sentence_transformers",
+    "tqdm",
+    "vcr",
+}
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Import modules in a fresh interpreter and collect their self import times.
+
+    Args:
+        statement: The import statement to run.
+
+    Returns:
+        dict[str, int]: Self import time of every imported module, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_cli_import_skips_heavy_dependencies() -> None:
+    """Test that importing the CLI does not import heavy dependencies."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import json, sys, prompt_library.cli; print(json.dumps(sorted(sys.modules)))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = {name.split(".")[0] for name in json.loads(result.stdout)}
+
+    assert not loaded & HEAVY_PACKAGES
+
+
+def test_cli_import_time_budget() -> None:
+    """Test that the CLI adds less than IMPORT_BUDGET_US to the import time of its framework."""
+    baseline = import_times("import typer, loguru")
+    cli = import_times("import prompt_library.cli")
+
+    overhead = {name: self_us for name, self_us in cli.items() if name not in baseline}
+    slowest = sorted(overhead.items(), key=lambda item: item[1], reverse=True)[:5]
+
+    assert sum(overhead.values()) < IMPORT_BUDGET_US, f"Slowest CLI imports: {slowest}"
+
+
+def test_help_does_not_import_subcommands() -> None:
+    """Test that listing the commands does not import any subcommand module."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from typer.testing import CliRunner\n"
+            "from prompt_library.cli import APP\n"
+            "assert CliRunner().invoke(APP, ['--help']).exit_code == 0\n"
+            "print([name for name in sys.modules if name.startswith('prompt_library.subcommands.')])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_subcommands_are_listed_and_invoked() -> None:
+    """Test that manifest subcommands show in the help and run on first use."""
+    result = runner.invoke(APP, ["--help"])
+    assert result.exit_code == 0
+    for name in get_subcommands():
+        assert name in result.stdout
+
+    result = runner.invoke(APP, ["executions", "--help"])
+    assert result.exit_code == 0
+    assert "export" in result.stdout
@@ -0,0 +1,430 @@
+"""Test the prompt_library daemon and its client."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+
+import pytest
+
+from prompt_library import daemon as daemon_module
+from prompt_library import daemon_client
+from prompt_library.daemon import HANGUP_POLL_INTERVAL, DaemonServer, serve
+from prompt_library.daemon_client import recv_frame, request, run_in_daemon, send_frame, use_daemon
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+@click.command()
+@click.argument("words", nargs=-1)
+@click.option("--stdin", "read_stdin", is_flag=True)
+@click.option("--code", type=int, default=0)
+@click.option("--crash", is_flag=True)
+@click.option("--cwd", "show_cwd", is_flag=True)
+@click.option("--sleep", type=float, default=0.0)
+def shout(words: tuple[str, ...], read_stdin: bool, code: int, crash: bool, show_cwd: bool, sleep: float) -> None:
+    """Echo the words in upper case."""
+    click.echo(" ".join(words).upper())
+    time.sleep(sleep)
+    if read_stdin:
+        click.echo(f"first: {sys.stdin.readline().strip()}")
+        click.echo(f"rest: {sys.stdin.read().split()}")
+    if show_cwd:
+        click.echo(os.getcwd())
+    if crash:
+        raise ValueError("boom")
+    click.echo("done", err=True)
+    sys.exit(code)
+
+
+def start_daemon(server: DaemonServer) -> threading.Thread:
+    """Serve a daemon in a background thread.
+
+    Args:
+        server: The daemon to serve.
+
+    Returns:
+        threading.Thread: The thread serving the daemon.
+    """
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[DaemonServer]:
+    """Run a daemon serving the shout command.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+
+    Yields:
+        DaemonServer: The running daemon.
+    """
+    server = DaemonServer(str(tmp_path / "daemon.sock"), command=shout)
+    thread = start_daemon(server)
+    yield server
+    request({"control": "stop"}, server.socket_path)
+    thread.join(timeout=5)
+
+
+def run(
+    server: DaemonServer, argv: list[str], stdin: str = "", start_timeout: float | None = None
+) -> tuple[int | None, str, str]:
+    """Run a command in a daemon and capture its output.
+
+    Args:
+        server: The daemon.
+        argv: Command line arguments.
+        stdin: Input of the command.
+        start_timeout: Seconds to wait for the daemon to start the command.
+
+    Returns:
+        tuple[int | None, str, str]: Exit code, stdout and stderr.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = run_in_daemon(
+        argv,
+        socket_path=server.socket_path,
+        stdin=io.StringIO(stdin),
+        stdout=stdout,
+        stderr=stderr,
+        start_timeout=start_timeout,
+    )
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_run_command_streams_output_and_exit_code(daemon: DaemonServer) -> None:
+    """Test that output and exit codes of a forwarded command reach the client.
+
+    Args:
+        daemon: The running daemon.
+    """
+    assert run(daemon, ["hello", "world"]) == (0, "HELLO WORLD\n", "done\n")
+    assert run(daemon, ["again", "--code", "3"])[0] == 3
+    assert run(daemon, ["--bogus"])[0] == 2
+
+
+def test_run_command_reads_stdin_on_demand(daemon: DaemonServer) -> None:
+    """Test that the command reads the stdin of the client.
+
+    Args:
+        daemon: The running daemon.
+    """
+    exit_code, stdout, _ = run(daemon, ["--stdin"], stdin="one\ntwo three\nfour\n")
+
+    assert exit_code == 0
+    assert stdout == "\nfirst: one\nrest: ['two', 'three', 'four']\n"
+
+
+def test_run_command_uses_client_cwd(daemon: DaemonServer, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that commands run in the working directory of the client and the daemon's is restored.
+
+    Args:
+        daemon: The running daemon.
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest fixture for patching.
+    """
+    cwd = os.getcwd()
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    _, stdout, _ = run(daemon, ["--cwd"])
+
+    assert stdout.splitlines()[-1] == str(workdir)
+    monkeypatch.chdir(cwd)
+    assert os.getcwd() == cwd
+
+
+def test_crashing_command_reports_traceback(daemon: DaemonServer) -> None:
+    """Test that an exception in a command is reported and the daemon keeps serving.
+
+    Args:
+        daemon: The running daemon.
+    """
+    exit_code, _, stderr = run(daemon, ["--crash"])
+
+    assert exit_code == 1
+    assert "ValueError: boom" in stderr
+    assert run(daemon, ["still", "alive"])[1] == "STILL ALIVE\n"
+
+
+def test_client_hangup_interrupts_command(tmp_path: Path) -> None:
+    """Test that a command is interrupted when its client goes away, e.g. after Ctrl-C.
+
+    The daemon serves from the main thread, like `prompt_library daemon serve`, so it can be signalled.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    server = DaemonServer(str(tmp_path / "daemon.sock"), command=shout)
+    server.timeout = 10
+    frames: list[dict[str, object] | None] = []
+
+    def interrupted_client() -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock, sock.makefile("rb") as stream:
+            sock.connect(server.socket_path)
+            send_frame(sock, {"argv": ["slow", "--sleep", "60"], "cwd": os.getcwd()})
+            frames.append(recv_frame(stream))
+            send_frame(sock, {"run": True})
+            frames.append(recv_frame(stream))
+
+    client = threading.Thread(target=interrupted_client)
+    client.start()
+    start = time.monotonic()
+    try:
+        server.handle_request()
+    finally:
+        client.join(timeout=5)
+        server.server_close()
+
+    assert time.monotonic() - start < 10
+    assert frames == [{"accepted": True}, {"stdout": "SLOW\n"}]
+    assert server.requests == 1
+
+
+def test_forwarded_command_does_not_wait_for_hangup_poll(tmp_path: Path) -> None:
+    """Test that a trivial command returns without waiting out the hangup watcher's poll interval.
+
+    The daemon serves from the main thread, where the watcher runs.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    server = DaemonServer(str(tmp_path / "daemon.sock"), command=shout)
+    server.timeout = 10
+    durations: list[float] = []
+
+    def client() -> None:
+        for _ in range(3):
+            start = time.perf_counter()
+            assert run(server, ["quick"])[:2] == (0, "QUICK\n")
+            durations.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    try:
+        for _ in range(3):
+            server.handle_request()
+    finally:
+        thread.join(timeout=10)
+        server.server_close()
+
+    assert len(durations) == 3
+    assert max(durations) < HANGUP_POLL_INTERVAL / 2
+
+
+def test_client_falls_back_when_daemon_is_busy(tmp_path: Path) -> None:
+    """Test that a client stops waiting for a busy daemon, which then skips the abandoned command.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    server = DaemonServer(str(tmp_path / "daemon.sock"), command=shout)
+    server.timeout = 5
+    try:
+        start = time.monotonic()
+        # Nobody serves the daemon yet, like while it runs a long command of another client
+        assert run(server, ["late"], start_timeout=0.2)[0] is None
+        assert time.monotonic() - start < 5
+
+        server.handle_request()
+        assert server.requests == 0
+    finally:
+        server.server_close()
+
+
+@pytest.mark.parametrize("hang", [False, True], ids=["closed", "silent"])
+def test_unconfirmed_command_is_not_run(hang: bool, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that the daemon does not run a command the client gave up on just as it was accepted.
+
+    Such a client runs the command itself, running it in the daemon as well would repeat its side effects.
+
+    Args:
+        hang: Whether the client stays connected without confirming, instead of closing the connection.
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest fixture for patching.
+    """
+    monkeypatch.setattr(daemon_module, "DAEMON_START_TIMEOUT", 0.2)
+    server = DaemonServer(str(tmp_path / "daemon.sock"), command=shout)
+    server.timeout = 5
+    gave_up = threading.Event()
+    frames: list[dict[str, object] | None] = []
+
+    def timed_out_client() -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock, sock.makefile("rb") as stream:
+            sock.connect(server.socket_path)
+            send_frame(sock, {"argv": ["twice"], "cwd": os.getcwd()})
+            frames.append(recv_frame(stream))
+            if hang:
+                gave_up.wait(timeout=5)
+
+    client = threading.Thread(target=timed_out_client)
+    client.start()
+    try:
+        server.handle_request()
+    finally:
+        gave_up.set()
+        client.join(timeout=5)
+        server.server_close()
+
+    assert frames == [{"accepted": True}]
+    assert server.requests == 0
+
+
+def test_daemon_listens_only_once_warm(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that clients find no daemon while it warms up, instead of waiting for it.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest fixture for patching.
+    """
+    socket_path = str(tmp_path / "daemon.sock")
+    during_warm: list[object] = []
+
+    def slow_warm(server: DaemonServer) -> None:
+        during_warm.append(os.path.exists(socket_path))
+        during_warm.append(request({"control": "ping"}, socket_path))
+        time.sleep(0.2)
+
+    monkeypatch.setattr(DaemonServer, "warm", slow_warm)
+    # The CLI installs its signal handlers on import, which only works in the main thread
+    import prompt_library.cli
+
+    thread = threading.Thread(target=serve, args=(socket_path,), daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    status = None
+    while status is None and time.monotonic() < deadline:
+        status = request({"control": "ping"}, socket_path)
+        time.sleep(0.01)
+
+    assert during_warm == [False, None]
+    assert status is not None
+    assert status["requests"] == 0
+    request({"control": "stop"}, socket_path)
+    thread.join(timeout=5)
+
+
+def test_control_ping_and_stop(tmp_path: Path) -> None:
+    """Test the status and shutdown of a daemon.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    server = DaemonServer(str(tmp_path / "daemon.sock"), command=shout)
+    thread = start_daemon(server)
+    run(server, ["one"])
+
+    status = request({"control": "ping"}, server.socket_path)
+    assert status is not None
+    assert (status["pid"], status["requests"]) == (os.getpid(), 1)
+    assert request({"control": "restart"}, server.socket_path) == {"error": "Unknown control action: restart"}
+
+    assert request({"control": "stop"}, server.socket_path)["stopping"]
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not os.path.exists(server.socket_path)
+    assert request({"control": "ping"}, server.socket_path) is None
+
+
+def test_socket_is_private(daemon: DaemonServer) -> None:
+    """Test that only the owner can connect to the socket.
+
+    Args:
+        daemon: The running daemon.
+    """
+    assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+def test_stale_socket_is_replaced(tmp_path: Path) -> None:
+    """Test that a socket left by a dead daemon is ignored by clients and replaced by a new daemon.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.write_text("", encoding="utf-8")
+
+    assert run_in_daemon(["hello"], socket_path=str(socket_path)) is None
+
+    server = DaemonServer(str(socket_path), command=shout)
+    thread = start_daemon(server)
+    assert run(server, ["hello"])[1] == "HELLO\n"
+
+    with pytest.raises(RuntimeError, match="already listening"):
+        DaemonServer(str(socket_path), command=shout)
+
+    request({"control": "stop"}, str(socket_path))
+    thread.join(timeout=5)
+
+
+def test_use_daemon(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test which commands are forwarded to the daemon.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest fixture for patching.
+    """
+    socket_path = tmp_path / "daemon.sock"
+    monkeypatch.setattr(daemon_client, "DAEMON_SOCKET", str(socket_path))
+    monkeypatch.delenv("PROMPT_LIBRARY_NO_DAEMON", raising=False)
+    assert not use_daemon(["version"])
+
+    socket_path.write_text("", encoding="utf-8")
+    assert use_daemon(["version"])
+    assert not use_daemon(["daemon", "stop"])
+
+    monkeypatch.setenv("PROMPT_LIBRARY_NO_DAEMON", "1")
+    assert not use_daemon(["version"])
+
+
+def test_prompt_library_cli_in_daemon(tmp_path: Path) -> None:
+    """Test running the prompt_library CLI itself through the daemon.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    server = DaemonServer(str(tmp_path / "daemon.sock"))
+    thread = start_daemon(server)
+
+    exit_code, stdout, _ = run(server, ["version"])
+    assert exit_code == 0
+    assert "prompt_library version:" in stdout
+    assert run(server, ["nope"])[0] == 2
+
+    request({"control": "stop"}, server.socket_path)
+    thread.join(timeout=5)
+
+
+def test_client_imports_only_the_standard_library() -> None:
+    """Test that the client script stays cheap to start."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys, prompt_library.daemon_client; print(json.dumps(sorted(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = {name.split(".")[0] for name in json.loads(result.stdout)}
+
+    assert not loaded & {"click", "loguru", "rich", "typer", "pydantic"}
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from typer.testing import CliRunner
+
+import pytest
+
+from prompt_library.cli import APP
+from prompt_library.common.execution_export import (
+    execution_schema,
+    executions_to_table,
+    export_executions,
+    read_executions,
+    read_legacy_executions,
+)
+from prompt_library.common.execution_log import ExecutionLogStore
+from prompt_library.common.typings import ExecutionLogRecord
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+pytest.importorskip("pyarrow")
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> ExecutionLogStore:
+    """Create an execution log with runs on two days.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+
+    Returns:
+        ExecutionLogStore: The execution log.
+    """
+    store = ExecutionLogStore(str(tmp_path / "log"))
+    store.append(
+        ExecutionLogRecord(
+            prompt="Summarize this",
+            prompt_template="summarize",
+            prompt_responses=[
+                {"model_id": "model1", "output": "short", "duration_seconds": 1.5, "score": 1},
+                {"model_id": "model2", "output": "a longer output", "error": None},
+            ],
+            recorded_at=datetime(2024, 12, 14, 9, 30, tzinfo=UTC),
+        )
+    )
+    store.append(
+        ExecutionLogRecord(
+            prompt="Write lore",
+            prompt_template="lore",
+            prompt_responses=[{"model_id": "model1", "output": {"title": "Lore"}}],
+            recorded_at=datetime(2024, 12, 15, 9, 30, tzinfo=UTC),
+        )
+    )
+    return store
+
+
+@pytest.fixture
+def executions_dir(tmp_path: Path) -> Path:
+    """Create a directory with per-run JSON files as written by record_llm_execution.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+
+    Returns:
+        Path: The directory.
+    """
+    directory = tmp_path / "executions"
+    directory.mkdir()
+    (directory / "summarize_20241214_093000.json").write_text(
+        json.dumps({
+            "prompt": "Summarize that",
+            "prompt_template": "summarize",
+            "prompt_responses": [{"model_id": "model3", "output": "legacy"}],
+        })
+    )
+    (directory / "broken_20241214_093000.json").write_text("{")
+    return directory
+
+
+def test_executions_to_table(store: ExecutionLogStore) -> None:
+    """Test flattening executions into one row per model response.
+
+    Args:
+        store: Fixture providing the execution log.
+    """
+    table = executions_to_table(store.query())
+
+    assert table.schema == execution_schema()
+    rows = table.to_pylist()
+    assert [row["model_id"] for row in rows] == ["model1", "model2", "model1"]
+    assert [row["date"] for row in rows] == ["2024-12-14", "2024-12-14", "2024-12-15"]
+    assert [row["output_length"] for row in rows] == [5, 15, len(json.dumps({"title": "Lore"}))]
+    assert rows[0]["latency_seconds"] == 1.5
+    assert rows[0]["score"] == 1.0
+    assert rows[1]["latency_seconds"] is None
+    assert rows[0]["prompt_sha256"] == rows[1]["prompt_sha256"] != rows[2]["prompt_sha256"]
+
+
+def test_read_legacy_executions(executions_dir: Path) -> None:
+    """Test reading per-run JSON files, skipping unreadable ones.
+
+    Args:
+        executions_dir: Fixture providing the per-run JSON directory.
+    """
+    (record,) = read_legacy_executions(str(executions_dir))
+
+    assert record.execution_id == "summarize_20241214_093000"
+    assert record.prompt_template == "summarize"
+    assert record.recorded_at.tzinfo is not None
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_export_executions(store: ExecutionLogStore, executions_dir: Path, tmp_path: Path, export_format: str) -> None:
+    """Test exporting a partitioned dataset and reading it back with partition filters.
+
+    Args:
+        store: Fixture providing the execution log.
+        executions_dir: Fixture providing the per-run JSON directory.
+        tmp_path: Pytest fixture providing temporary directory path.
+        export_format: Format of the dataset.
+    """
+    import pyarrow.dataset as ds
+
+    output = tmp_path / "export"
+
+    rows = export_executions(str(output), export_format, store=store, executions_dir=str(executions_dir))
+
+    assert rows == 4
+    assert (output / "date=2024-12-15" / "prompt_template=lore").is_dir()
+    df = read_executions(str(output), export_format, filters=ds.field("prompt_template") == "summarize")
+    assert sorted(df["model_id"]) == ["model1", "model2", "model3"]
+
+    # Exporting again replaces the partitions instead of duplicating rows
+    export_executions(str(output), export_format, store=store, executions_dir=str(executions_dir))
+    assert len(read_executions(str(output), export_format)) == 4
+
+
+def test_export_rejects_unknown_format(store: ExecutionLogStore, tmp_path: Path) -> None:
+    """Test that unsupported formats are rejected.
+
+    Args:
+        store: Fixture providing the execution log.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        export_executions(str(tmp_path), "csv", store=store)
+
+
+def test_executions_export_cli(store: ExecutionLogStore, tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test the executions export subcommand.
+
+    Args:
+        store: Fixture providing the execution log.
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest monkeypatch fixture.
+    """
+    store.flush()
+    monkeypatch.setenv("EXECUTION_EXPORT_DIR", str(tmp_path / "export"))
+
+    result = runner.invoke(APP, ["executions", "export", "--log-dir", store.directory, "--no-legacy"])
+
+    assert result.exit_code == 0
+    assert "Exported 3 rows" in result.stdout
+    assert (tmp_path / "export" / "date=2024-12-14" / "prompt_template=summarize").is_dir()
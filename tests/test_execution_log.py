@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import gc
+import json
+import multiprocessing
+import os
+import threading
+import weakref
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library.common.execution_log import ExecutionLogStore, _flush_open_stores
+from prompt_library.common.prompt_library_module import record_llm_execution
+from prompt_library.common.typings import ExecutionLogRecord
+
+
+if TYPE_CHECKING:
+    from pytest_mock.plugin import MockerFixture
+
+
+def make_record(template: str = "template", model_id: str = "model1", **kwargs: object) -> ExecutionLogRecord:
+    """Build an execution record with a single response.
+
+    Args:
+        template: Prompt template name.
+        model_id: Model of the response.
+        **kwargs: Extra record fields.
+
+    Returns:
+        ExecutionLogRecord: The record.
+    """
+    return ExecutionLogRecord(
+        prompt="Test prompt",
+        prompt_template=template,
+        prompt_responses=[{"model_id": model_id, "output": "response"}],
+        **kwargs,
+    )
+
+
+def write_records(directory: str, count: int) -> None:
+    """Append records from a separate process.
+
+    Args:
+        directory: Directory of the store.
+        count: Number of records to append.
+    """
+    with ExecutionLogStore(directory, batch_size=7, segment_max_bytes=4096) as store:
+        for i in range(count):
+            store.append(make_record(template=f"process-{os.getpid()}", model_id=str(i)))
+
+
+def test_append_is_batched(tmp_path: Path) -> None:
+    """Test that records are written once a batch is full or on flush.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = ExecutionLogStore(str(tmp_path), batch_size=3)
+    store.append(make_record())
+    store.append(make_record())
+    assert store.segments() == []
+
+    store.append(make_record())
+    (segment,) = store.segments()
+    assert len(Path(segment).read_text().splitlines()) == 3
+
+    store.append(make_record())
+    store.close()
+    assert len(Path(segment).read_text().splitlines()) == 4
+
+
+def test_segments_rotate(tmp_path: Path) -> None:
+    """Test that a new segment is started once the newest one is full.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = ExecutionLogStore(str(tmp_path), batch_size=1, segment_max_bytes=500, fsync=True)
+    for _ in range(10):
+        store.append(make_record())
+
+    segments = store.segments()
+    assert len(segments) > 1
+    assert [os.path.basename(path) for path in segments][:2] == ["segment-00000001.jsonl", "segment-00000002.jsonl"]
+    assert len(list(store.query())) == 10
+
+
+def test_query_filters(tmp_path: Path) -> None:
+    """Test filtering by prompt template, model, time range and limit.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    now = datetime.now(UTC)
+    store = ExecutionLogStore(str(tmp_path))
+    store.append(make_record("a", "model1", recorded_at=now - timedelta(hours=2)))
+    store.append(make_record("a", "model2", recorded_at=now - timedelta(hours=1)))
+    store.append(make_record("b", "model1", recorded_at=now))
+
+    assert [r.prompt_responses[0]["model_id"] for r in store.query(prompt_template="a")] == ["model1", "model2"]
+    assert [r.prompt_template for r in store.query(model_id="model1")] == ["a", "b"]
+    assert [r.prompt_template for r in store.query(since=now - timedelta(minutes=90))] == ["a", "b"]
+    assert [r.prompt_template for r in store.query(until=now - timedelta(minutes=30))] == ["a", "a"]
+    assert len(list(store.query(limit=2))) == 2
+    assert list(store.query(since=now + timedelta(days=1))) == []
+
+
+def test_query_skips_torn_lines(tmp_path: Path) -> None:
+    """Test that a partially written trailing line is skipped.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = ExecutionLogStore(str(tmp_path), batch_size=1)
+    record = make_record()
+    store.append(record)
+    with open(store.segments()[-1], "a", encoding="utf-8") as f:
+        f.write('{"prompt": "torn')
+
+    assert [r.execution_id for r in store.query()] == [record.execution_id]
+
+
+def test_concurrent_writers(tmp_path: Path) -> None:
+    """Test that threads and processes sharing a store never interleave lines.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = ExecutionLogStore(str(tmp_path), batch_size=5, segment_max_bytes=4096)
+    threads = [
+        threading.Thread(target=lambda: [store.append(make_record(template="thread")) for _ in range(20)])
+        for _ in range(4)
+    ]
+    processes = [
+        multiprocessing.get_context("spawn").Process(target=write_records, args=(str(tmp_path), 30)) for _ in range(2)
+    ]
+    for worker in [*threads, *processes]:
+        worker.start()
+    for worker in [*threads, *processes]:
+        worker.join()
+    store.flush()
+
+    lines = [line for path in store.segments() for line in Path(path).read_text().splitlines()]
+    assert len(lines) == 4 * 20 + 2 * 30
+    assert all(json.loads(line)["prompt"] == "Test prompt" for line in lines)
+    assert len({json.loads(line)["execution_id"] for line in lines}) == len(lines)
+
+
+def test_record_llm_execution_with_store(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test recording an execution into the store instead of a JSON file.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        mocker: Pytest mocker fixture.
+    """
+    store = ExecutionLogStore(str(tmp_path / "log"))
+    mocker.patch.dict(os.environ, {"PROMPT_EXECUTIONS_DIR": str(tmp_path / "executions")})
+    executions = [{"model_id": "model1", "output": "response1"}]
+
+    execution_id = record_llm_execution("Test prompt", executions, "test_template", store=store)
+
+    (record,) = store.query(prompt_template="test_template")
+    assert record.execution_id == execution_id
+    assert record.prompt_responses == executions
+    assert not (tmp_path / "executions").exists()
+
+
+def test_invalid_options(tmp_path: Path) -> None:
+    """Test that invalid batch and segment sizes are rejected.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    with pytest.raises(ValueError, match="Batch size"):
+        ExecutionLogStore(str(tmp_path), batch_size=0)
+    with pytest.raises(ValueError, match="Segment size"):
+        ExecutionLogStore(str(tmp_path), segment_max_bytes=0)
+
+
+def test_unclosed_store_is_released(tmp_path: Path) -> None:
+    """Test that a store dropped without close() is garbage collected and writes its buffered records.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = ExecutionLogStore(str(tmp_path), batch_size=10)
+    store.append(make_record())
+    ref = weakref.ref(store)
+
+    del store
+    gc.collect()
+
+    assert ref() is None
+    assert len(list(ExecutionLogStore(str(tmp_path)).query())) == 1
+
+
+def test_open_stores_flushed_at_exit(tmp_path: Path) -> None:
+    """Test that buffered records of open stores are written at interpreter exit.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = ExecutionLogStore(str(tmp_path), batch_size=10)
+    store.append(make_record())
+    assert not store.segments()
+
+    _flush_open_stores()
+
+    assert len(store.segments()) == 1
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+
+import pytest
+
+from prompt_library.common.json_extract import (
+    JSONScanner,
+    extract_json,
+    extract_json_blocks,
+    extract_json_from_scanner,
+    find_json_blocks,
+)
+
+
+if TYPE_CHECKING:
+    from _pytest.capture import CaptureFixture
+    from _pytest.fixtures import FixtureRequest
+
+    from pytest_mock.plugin import MockerFixture
+
+
+class Answer(BaseModel):
+    """Schema used to validate extracted JSON."""
+
+    answer: str
+    confidence: float = 1.0
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ('{"key": "value"}', {"key": "value"}),
+        ('```json\n{"key": "value"}\n```', {"key": "value"}),
+        ('```\n{"key": "value"}\n```', {"key": "value"}),
+        ("```JSON\n[1, 2]\n```", [1, 2]),
+        ('```{"key": "value"}```', {"key": "value"}),
+        ('```json {"key": "value"}```', {"key": "value"}),
+        ('Sure!\n```json\n{"key": "value"}\n```\nHope that helps.', {"key": "value"}),
+        ("42", 42),
+        ("true", True),
+        ("not json", "not json"),
+        ("{not json", "{not json"),
+        ('```python\n{"key": "value"}\n```', '```python\n{"key": "value"}\n```'),
+    ],
+)
+def test_extract_json(text: str, expected: Any) -> None:
+    """Test extracting JSON from fenced and bare responses.
+
+    Args:
+        text: The model response.
+        expected: Expected extraction result.
+    """
+    assert extract_json(text) == expected
+
+
+def test_extract_json_skips_other_languages() -> None:
+    """Test that code blocks in other languages do not shadow the JSON block."""
+    text = 'Code:\n```python\nprint("{}")\n```\nData:\n```json\n{"key": "value"}\n```'
+
+    assert find_json_blocks(text) == ['{"key": "value"}']
+    assert extract_json(text) == {"key": "value"}
+
+
+def test_extract_json_blocks() -> None:
+    """Test that every valid JSON block is returned in order."""
+    text = '```json\n{"a": 1}\n```\n```json\nbroken\n```\ntext\n```\n[2]\n```'
+
+    assert extract_json_blocks(text) == [{"a": 1}, [2]]
+    assert extract_json(text) == {"a": 1}
+
+
+def test_extract_json_does_not_parse_text_with_blocks() -> None:
+    """Test that a response whose blocks are all invalid is returned unchanged."""
+    text = "```json\nbroken\n```"
+
+    assert extract_json(text) == text
+
+
+def test_scanner_handles_arbitrary_chunks() -> None:
+    """Test feeding a response split in the middle of fences and lines."""
+    text = 'Intro\n```python\nx = 1\n```\n```json\n{"answer": "yes"}\n```\nBye'
+    scanner = JSONScanner()
+    for i in range(0, len(text), 3):
+        scanner.feed(text[i : i + 3])
+
+    assert extract_json_from_scanner(scanner) == {"answer": "yes"}
+    assert scanner.text == text
+
+
+def test_scanner_long_line_is_linear() -> None:
+    """Test that streaming a long single-line response in small chunks stays linear."""
+    items = ", ".join(f'"item {i}"' for i in range(100_000))
+    text = f"```json [{items}] ```"
+    scanner = JSONScanner()
+
+    start = time.perf_counter()
+    for i in range(0, len(text), 8):
+        scanner.feed(text[i : i + 8])
+    value = extract_json_from_scanner(scanner)
+
+    # Re-joining the partial line on every chunk took minutes for this response
+    assert time.perf_counter() - start < 2.0
+    assert len(value) == 100_000
+
+
+def test_extract_json_with_schema() -> None:
+    """Test validating the extracted JSON against a pydantic schema."""
+    assert extract_json('```json\n{"answer": "yes"}\n```', Answer) == {"answer": "yes", "confidence": 1.0}
+
+    with pytest.raises(ValueError, match="No JSON found"):
+        extract_json("no json here", Answer)
+    with pytest.raises(ValueError, match="answer"):
+        extract_json('{"confidence": 0.5}', Answer)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, Generator
 
 from _pytest.monkeypatch import MonkeyPatch
@@ -22,12 +25,18 @@ from prompt_library.common.llm_module import (
     build_openai_model_stack,
     build_small_cheap_and_fast,
     build_sonnet_3_5,
+    compile_template,
     conditional_render,
+    conditional_render_many,
     get_model_name,
+    get_provider_key,
     parse_markdown_backticks,
     prompt,
+    prompt_many,
+    prompt_stream,
     prompt_with_temp,
 )
+from prompt_library.common.response_cache import SQLiteResponseCache
 
 
 if TYPE_CHECKING:
@@ -135,6 +144,49 @@ Goodbye ${name}!
     assert "Goodbye World!" not in result
 
 
+def test_conditional_render_reuses_compiled_template() -> None:
+    """Test that rendering the same template twice compiles it only once."""
+    compile_template.cache_clear()
+    template = "% if show:\nHello ${name}!\n% endif"
+
+    conditional_render(template, {"show": True, "name": "A"})
+    conditional_render(template, {"show": False, "name": "B"})
+
+    info = compile_template.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_conditional_render_many() -> None:
+    """Test rendering one template against many contexts."""
+    template = "% if show:\nHello ${name}!\n% endif"
+    contexts = [{"show": True, "name": "A"}, {"show": False, "name": "B"}, {"show": True, "name": "C"}]
+
+    results = conditional_render_many(template, contexts)
+
+    assert results == [conditional_render(template, context) for context in contexts]
+    assert "Hello A!" in results[0]
+    assert "Hello" not in results[1]
+
+
+def test_compile_template_module_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that compiled templates are persisted to the Mako module directory.
+
+    Args:
+        tmp_path: Pytest temporary path fixture
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    monkeypatch.setenv("MAKO_MODULE_DIRECTORY", str(tmp_path))
+    compile_template.cache_clear()
+
+    result = conditional_render("Persisted ${name}", {"name": "template"})
+
+    assert result == "Persisted template"
+    assert len(list((tmp_path / "templates").glob("*.mako"))) == 1
+    assert list(tmp_path.rglob("*.py"))
+    compile_template.cache_clear()
+
+
 def test_parse_markdown_backticks() -> None:
     """Test parsing markdown code blocks."""
     # Test with Python code block
@@ -195,6 +247,145 @@ def test_prompt_with_temp(mock_llm: MockerFixture) -> None:
     assert result == "mock response"
 
 
+def test_prompt_with_cache(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that cached prompts do not call the model again.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        mocker: Pytest mocker fixture.
+    """
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite3"))
+    model = MockModel("test-model", "cached response")
+    spy = mocker.spy(model, "prompt")
+
+    assert prompt(model, "test prompt", cache=cache) == "cached response"
+    assert prompt(model, "test prompt", cache=cache) == "cached response"
+    assert prompt_with_temp(model, "test prompt", 0.5, cache=cache) == "cached response"
+    assert prompt_with_temp(model, "test prompt", 0.5, cache=cache) == "cached response"
+    assert spy.call_count == 2
+
+
+def test_prompt_with_cache_default_temperature_opt_out(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that prompts at the default temperature are not cached when sampled calls are opted out.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        mocker: Pytest mocker fixture.
+    """
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite3"), cache_nonzero_temperature=False)
+    model = MockModel("test-model", "sampled response")
+    spy = mocker.spy(model, "prompt")
+
+    prompt(model, "test prompt", cache=cache)
+    prompt(model, "test prompt", cache=cache)
+    prompt_with_temp(model, "test prompt", 0, cache=cache)
+    prompt_with_temp(model, "test prompt", 0, cache=cache)
+
+    assert spy.call_count == 3
+
+
+def test_prompt_stream(mocker: MockerFixture) -> None:
+    """Test streaming a response chunk by chunk.
+
+    Args:
+        mocker: Pytest mocker fixture.
+    """
+    model = MockModel("test-model")
+    mocker.patch.object(model, "prompt", return_value=iter(["Hel", "lo", "!"]))
+
+    stream = prompt_stream(model, "test prompt", temperature=0.2)
+
+    assert stream.time_to_first_token is None
+    assert next(stream) == "Hel"
+    assert stream.time_to_first_token is not None
+    assert stream.text() == "Hello!"
+    assert stream.done
+    model.prompt.assert_called_once_with("test prompt", stream=True, temperature=0.2)
+
+    o1_model = MockModel("o1-mini")
+    mocker.patch.object(o1_model, "prompt", return_value=iter([]))
+    assert prompt_stream(o1_model, "test prompt", temperature=0.2).text() == ""
+    o1_model.prompt.assert_called_once_with("test prompt", stream=True)
+
+
+def test_get_provider_key() -> None:
+    """Test grouping models by provider."""
+    model = MockModel("gpt-4o")
+    assert get_provider_key(model) == MockModel.__module__
+
+    model.needs_key = "openai"
+    assert get_provider_key(model) == "openai"
+
+
+def test_prompt_many() -> None:
+    """Test running every prompt on every model in deterministic order."""
+
+    class EchoModel(MockModel):
+        def prompt(self, text: str, stream: bool = False, temperature: float | None = None) -> MockResponse:
+            if text == "fail":
+                raise RuntimeError("provider error")
+            time.sleep(0.01 if self.model_id == "slow" else 0)
+            return MockResponse(f"{self.model_id}: {text}")
+
+    models = [EchoModel("slow"), EchoModel("fast")]
+    completed: list[tuple[int, int]] = []
+
+    results = prompt_many(
+        models,
+        ["a", "fail", "b"],
+        temperature=0.5,
+        on_result=lambda result: completed.append((result.prompt_index, result.model_index)),
+    )
+
+    assert [(r.prompt_index, r.model_id) for r in results] == [
+        (0, "slow"),
+        (0, "fast"),
+        (1, "slow"),
+        (1, "fast"),
+        (2, "slow"),
+        (2, "fast"),
+    ]
+    assert [r.output for r in results] == ["slow: a", "fast: a", None, None, "slow: b", "fast: b"]
+    assert results[2].error == "RuntimeError: provider error"
+    assert results[0].error is None
+    assert sorted(completed) == [(p, m) for p in range(3) for m in range(2)]
+
+
+def test_prompt_many_provider_limits() -> None:
+    """Test that per-provider concurrency limits are honoured."""
+    lock = threading.Lock()
+    in_flight: dict[str, int] = {"openai": 0, "gemini": 0}
+    max_in_flight: dict[str, int] = {"openai": 0, "gemini": 0}
+
+    class CountingModel(MockModel):
+        def prompt(self, text: str, stream: bool = False, temperature: float | None = None) -> MockResponse:
+            with lock:
+                in_flight[self.needs_key] += 1
+                max_in_flight[self.needs_key] = max(max_in_flight[self.needs_key], in_flight[self.needs_key])
+            time.sleep(0.01)
+            with lock:
+                in_flight[self.needs_key] -= 1
+            return MockResponse(text)
+
+    models = [CountingModel("gpt-4o"), CountingModel("gpt-4o-mini"), CountingModel("gemini-1.5-pro")]
+    models[0].needs_key = models[1].needs_key = "openai"
+    models[2].needs_key = "gemini"
+
+    results = prompt_many(models, [str(i) for i in range(6)], max_workers=8, provider_limits={"openai": 1})
+
+    assert all(r.error is None for r in results)
+    assert max_in_flight["openai"] == 1
+    assert max_in_flight["gemini"] > 1
+
+
+def test_prompt_many_invalid_limits() -> None:
+    """Test validation of worker and provider limits."""
+    with pytest.raises(ValueError):
+        prompt_many([MockModel("m")], ["p"], max_workers=0)
+    with pytest.raises(ValueError):
+        prompt_many([MockModel("m")], ["p"], provider_limits={"openai": 0})
+
+
 def test_get_model_name(mock_llm: MockerFixture) -> None:
     """Test getting model identifier.
 
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library.common.model_registry import DEFAULT_MODEL_SPECS, DEFAULT_STACKS, ModelRegistry
+from prompt_library.common.typings import ModelSpec
+
+
+if TYPE_CHECKING:
+    from unittest.mock import MagicMock
+
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from pytest_mock.plugin import MockerFixture
+
+
+@pytest.fixture
+def mock_llm(mocker: MockerFixture) -> MagicMock:
+    """Patch the llm package used by the registry.
+
+    Args:
+        mocker: Pytest mocker fixture
+
+    Returns:
+        MagicMock: The patched llm module, whose alias table holds a mock model per default spec
+    """
+    mock_llm = mocker.patch("prompt_library.common.model_registry.llm")
+    mock_llm.get_model_aliases.return_value = {name: mocker.Mock(model_id=name) for name in DEFAULT_MODEL_SPECS}
+    return mock_llm
+
+
+def test_stacks_reference_known_specs() -> None:
+    """Test that every default stack only references models with a spec."""
+    for names in DEFAULT_STACKS.values():
+        assert all(name in DEFAULT_MODEL_SPECS for name in names)
+
+
+def test_get_is_lazy_and_memoized(mock_llm: MagicMock, monkeypatch: MonkeyPatch) -> None:
+    """Test that models are built on first use only and reused afterwards.
+
+    Args:
+        mock_llm: The patched llm module
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "test_openai_key")
+    registry = ModelRegistry()
+    mock_llm.get_model_aliases.assert_not_called()
+
+    model = registry.get("gpt-4o")
+
+    assert model.model_id == "gpt-4o"
+    assert model.key == "test_openai_key"
+    assert registry.get("gpt-4o") is model
+    registry.get("gpt-4o-mini")
+    mock_llm.get_model_aliases.assert_called_once()
+    mock_llm.get_model.assert_not_called()
+
+
+def test_get_stack(mock_llm: MagicMock) -> None:
+    """Test that a stack returns its models in order and shares instances with get.
+
+    Args:
+        mock_llm: The patched llm module
+    """
+    registry = ModelRegistry()
+
+    o1_mini, o1_preview = registry.get_stack("o1_series")
+
+    assert [o1_mini.model_id, o1_preview.model_id] == ["o1-mini", "o1-preview"]
+    assert registry.get("o1-mini") is o1_mini
+    with pytest.raises(KeyError, match="Unknown model stack"):
+        registry.get_stack("missing")
+
+
+def test_unknown_model_falls_back_to_get_model(mock_llm: MagicMock) -> None:
+    """Test that names missing from the alias table are resolved by llm.get_model.
+
+    Args:
+        mock_llm: The patched llm module
+    """
+    registry = ModelRegistry()
+
+    model = registry.get("custom-model")
+
+    mock_llm.get_model.assert_called_once_with("custom-model")
+    assert model is mock_llm.get_model.return_value
+
+
+def test_register_and_clear(mock_llm: MagicMock, monkeypatch: MonkeyPatch) -> None:
+    """Test that registering a spec or clearing the registry rebuilds models.
+
+    Args:
+        mock_llm: The patched llm module
+        monkeypatch: Pytest monkeypatch fixture
+    """
+    monkeypatch.setenv("CUSTOM_KEY", "custom")
+    registry = ModelRegistry(specs={}, stacks={})
+    registry.register("fast", ModelSpec(model_id="gpt-4o-mini", api_key_env="CUSTOM_KEY"))
+    registry.register_stack("custom", ["fast"])
+
+    (fast,) = registry.get_stack("custom")
+    assert fast.model_id == "gpt-4o-mini"
+    assert fast.key == "custom"
+
+    registry.clear()
+    registry.get("fast")
+    assert mock_llm.get_model_aliases.call_count == 2
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from prompt_library.common.llm_module import prompt
+from prompt_library.common.model_scheduler import ModelScheduler, ScheduledModel, TokenBucket, is_transient_error
+from prompt_library.common.typings import RateLimit
+
+
+if TYPE_CHECKING:
+    from pytest_mock.plugin import MockerFixture
+
+
+class HTTPError(Exception):
+    """Exception carrying an HTTP status code like provider SDK errors do."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class RateLimitError(Exception):
+    """Exception named like the rate limit errors of provider SDKs."""
+
+
+class LazyResponse:
+    """Mock llm response that only performs the call when its text is read."""
+
+    def __init__(self, fetch: Any) -> None:
+        self._fetch = fetch
+        self._text: str | None = None
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._fetch()
+        return self._text
+
+
+class FlakyModel:
+    """Mock model failing a number of times before answering."""
+
+    needs_key = "openai"
+
+    def __init__(self, failures: list[Exception]) -> None:
+        self.model_id = "flaky"
+        self._failures = failures
+        self.calls = 0
+
+    def prompt(self, text: str, stream: bool = True, **kwargs: Any) -> LazyResponse:
+        def fetch() -> str:
+            self.calls += 1
+            if self._failures:
+                raise self._failures.pop(0)
+            return f"answer to {text}"
+
+        return LazyResponse(fetch)
+
+
+@pytest.mark.parametrize(
+    "exc,expected",
+    [
+        (HTTPError(429), True),
+        (HTTPError(503), True),
+        (HTTPError(400), False),
+        (RateLimitError("slow down"), True),
+        (TimeoutError(), True),
+        (ConnectionError(), True),
+        (ValueError("bad prompt"), False),
+    ],
+)
+def test_is_transient_error(exc: Exception, expected: bool) -> None:
+    """Test classification of retryable errors.
+
+    Args:
+        exc: Exception raised by a model call.
+        expected: Whether the error should be retried.
+    """
+    assert is_transient_error(exc) is expected
+
+
+def test_token_bucket_reserve() -> None:
+    """Test that a drained bucket reports the wait until it refills."""
+    bucket = TokenBucket(rate_per_minute=60)
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+
+
+def test_scheduler_throttles_requests() -> None:
+    """Test that calls beyond the requests per minute limit wait in the queue."""
+    sleeps: list[float] = []
+    scheduler = ModelScheduler({"openai": RateLimit(requests_per_minute=2)}, sleep=sleeps.append)
+
+    for _ in range(3):
+        scheduler.call("openai", lambda: "ok")
+    scheduler.call("gemini", lambda: "ok")
+
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(30.0, abs=0.5)
+    assert scheduler.stats("openai").calls == 3
+    assert scheduler.stats("openai").max_wait_seconds == pytest.approx(30.0, abs=0.5)
+    assert scheduler.stats().calls == 4
+
+
+def test_scheduler_retries_transient_errors() -> None:
+    """Test retrying the lazy model call through a wrapped model."""
+    sleeps: list[float] = []
+    scheduler = ModelScheduler(sleep=sleeps.append, base_delay=1.0)
+    model = FlakyModel([HTTPError(429), RateLimitError("slow down")])
+
+    scheduled = scheduler.wrap(model)
+
+    assert isinstance(scheduled, ScheduledModel)
+    assert scheduled.model_id == "flaky"
+    assert prompt(scheduled, "ping") == "answer to ping"
+    assert model.calls == 3
+    assert 0.5 <= sleeps[0] <= 1.0
+    assert 1.0 <= sleeps[1] <= 2.0
+    assert scheduler.stats("openai").retries == 2
+
+
+def test_scheduler_gives_up() -> None:
+    """Test that non-transient errors and exhausted retries are raised."""
+    scheduler = ModelScheduler(max_retries=1, sleep=lambda _: None)
+
+    with pytest.raises(ValueError):
+        prompt(scheduler.wrap(FlakyModel([ValueError("bad prompt")])), "ping")
+
+    with pytest.raises(HTTPError):
+        prompt(scheduler.wrap(FlakyModel([HTTPError(500), HTTPError(500)])), "ping")
+
+    assert scheduler.stats("openai").failures == 2
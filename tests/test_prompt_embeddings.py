@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import math
+import zlib
+
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from typer.testing import CliRunner
+
+import pytest
+
+from prompt_library.cli import APP
+from prompt_library.common.prompt_embeddings import SemanticPromptIndex
+from prompt_library.common.prompt_index import PromptIndex
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from pytest_mock.plugin import MockerFixture
+
+
+runner = CliRunner()
+
+
+class FakeEmbedder:
+    """Deterministic bag-of-words embedder standing in for a sentence-transformers model."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        """Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            list[list[float]]: One normalized 32 dimensional vector per text.
+        """
+        self.calls.append(list(texts))
+        vectors = []
+        for text in texts:
+            vector = [0.0] * 32
+            for word in text.lower().split():
+                vector[zlib.crc32(word.encode()) % 32] += 1.0
+            norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+            vectors.append([value / norm for value in vector])
+        return vectors
+
+
+@pytest.fixture
+def prompt_index(tmp_path: Path, monkeypatch: MonkeyPatch) -> PromptIndex:
+    """Create and index a small prompt library.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest monkeypatch fixture.
+
+    Returns:
+        PromptIndex: The refreshed index of the prompt library.
+    """
+    monkeypatch.setenv("PROMPT_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("PROMPT_VECTOR_DIR", str(tmp_path / "vectors"))
+    directory = tmp_path / "prompt_lib"
+    monkeypatch.setenv("PROMPT_LIBRARY_DIR", str(directory))
+    directory.mkdir()
+    (directory / "lore.xml").write_text("write a heroic backstory for a soldier")
+    (directory / "summary.xml").write_text("summarize this article into bullets")
+    (directory / "copy.xml").write_text("summarize this article into bullets")
+    (directory / "metadata.json").write_text("{}")
+    index = PromptIndex(str(directory))
+    index.refresh()
+    return index
+
+
+def test_sync_embeds_new_content_only(prompt_index: PromptIndex) -> None:
+    """Test that prompts are embedded once per distinct content, also across instances.
+
+    Args:
+        prompt_index: Fixture providing the prompt index.
+    """
+    embedder = FakeEmbedder()
+    semantic_index = SemanticPromptIndex(embed=embedder, batch_size=1)
+
+    assert semantic_index.sync(prompt_index) == 2
+    assert len(embedder.calls) == 2
+    assert len(semantic_index) == 2
+
+    reopened = SemanticPromptIndex(embed=embedder)
+    assert reopened.sync(prompt_index) == 0
+
+    (Path(prompt_index.directory) / "lore.xml").write_text("write a funny poem")
+    prompt_index.refresh()
+    assert reopened.sync(prompt_index) == 1
+    assert embedder.calls[-1] == ["write a funny poem"]
+    assert len(reopened) == 2
+
+
+def test_query_returns_nearest_prompts(prompt_index: PromptIndex) -> None:
+    """Test nearest-neighbour queries, including prompts sharing the same content.
+
+    Args:
+        prompt_index: Fixture providing the prompt index.
+    """
+    semantic_index = SemanticPromptIndex(embed=FakeEmbedder())
+    semantic_index.sync(prompt_index)
+
+    (best,) = semantic_index.query("heroic backstory", limit=1)
+    assert best.path == "lore.xml"
+
+    results = semantic_index.query("summarize article", limit=3)
+    assert {result.path for result in results[:2]} == {"summary.xml", "copy.xml"}
+    assert results[0].distance <= results[-1].distance
+
+
+def test_model_change_resets_collection(prompt_index: PromptIndex) -> None:
+    """Test that vectors of another embedding model are discarded.
+
+    Args:
+        prompt_index: Fixture providing the prompt index.
+    """
+    SemanticPromptIndex(embed=FakeEmbedder(), model_name="model-a").sync(prompt_index)
+
+    other_model = SemanticPromptIndex(embed=FakeEmbedder(), model_name="model-b")
+
+    assert len(other_model) == 0
+    assert other_model.sync(prompt_index) == 2
+
+
+def test_semantic_cli(prompt_index: PromptIndex, mocker: MockerFixture) -> None:
+    """Test the semantic index and query subcommands.
+
+    Args:
+        prompt_index: Fixture providing the prompt index.
+        mocker: Pytest mocker fixture.
+    """
+    mocker.patch("prompt_library.common.prompt_embeddings.sentence_transformer_embedder", return_value=FakeEmbedder())
+
+    result = runner.invoke(APP, ["semantic", "index"])
+    assert result.exit_code == 0
+    assert "Indexed 2 distinct prompts" in result.stdout
+
+    result = runner.invoke(APP, ["semantic", "query", "heroic backstory", "--limit", "1"])
+    assert result.exit_code == 0
+    assert "lore.xml" in result.stdout
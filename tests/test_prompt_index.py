@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library.common.prompt_index import PromptIndex, default_manifest_path, load_prompt_index
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from pytest_mock.plugin import MockerFixture
+
+
+@pytest.fixture
+def prompt_dir(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    """Create a prompt directory and keep manifests inside the temporary directory.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest monkeypatch fixture.
+
+    Returns:
+        Path: The prompt directory.
+    """
+    monkeypatch.setenv("PROMPT_INDEX_DIR", str(tmp_path / "index"))
+    directory = tmp_path / "prompts"
+    (directory / "sub").mkdir(parents=True)
+    (directory / "a.txt").write_text("content a")
+    (directory / "sub" / "b.txt").write_text("content b")
+    return directory
+
+
+def test_index_reads_directory(prompt_dir: Path) -> None:
+    """Test that the index maps relative paths to contents.
+
+    Args:
+        prompt_dir: Fixture providing the prompt directory.
+    """
+    index = PromptIndex(str(prompt_dir))
+    changes = index.refresh()
+
+    assert sorted(changes.added) == ["a.txt", os.path.join("sub", "b.txt")]
+    assert dict(index) == {"a.txt": "content a", os.path.join("sub", "b.txt"): "content b"}
+    assert index.entry("a.txt").size == len("content a")
+    assert "missing.txt" not in index
+    with pytest.raises(KeyError):
+        index["missing.txt"]
+
+    manifest = json.loads(Path(index.manifest_path).read_text())
+    assert set(manifest["files"]) == {"a.txt", os.path.join("sub", "b.txt")}
+
+
+def test_index_reuses_manifest(prompt_dir: Path, mocker: MockerFixture) -> None:
+    """Test that a new index only reads files whose stat changed since the manifest was written.
+
+    Args:
+        prompt_dir: Fixture providing the prompt directory.
+        mocker: Pytest mocker fixture.
+    """
+    PromptIndex(str(prompt_dir)).refresh()
+    (prompt_dir / "a.txt").write_text("content a, but longer")
+
+    index = PromptIndex(str(prompt_dir))
+    read = mocker.spy(index, "_read")
+    changes = index.refresh()
+
+    assert changes.modified == ["a.txt"]
+    assert not changes.added
+    read.assert_called_once_with("a.txt")
+
+    assert index[os.path.join("sub", "b.txt")] == "content b"
+    assert read.call_count == 2
+
+
+def test_index_detects_removed_and_touched_files(prompt_dir: Path) -> None:
+    """Test removals, and that a touched but unchanged file is not reported as modified.
+
+    Args:
+        prompt_dir: Fixture providing the prompt directory.
+    """
+    index = PromptIndex(str(prompt_dir))
+    index.refresh()
+    (prompt_dir / "sub" / "b.txt").unlink()
+    stat = (prompt_dir / "a.txt").stat()
+    os.utime(prompt_dir / "a.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    changes = index.refresh()
+
+    assert changes.removed == [os.path.join("sub", "b.txt")]
+    assert not changes.modified
+    assert list(index) == ["a.txt"]
+    assert not index.refresh().has_changes
+
+
+def test_load_prompt_index_reuses_instance(prompt_dir: Path, tmp_path: Path) -> None:
+    """Test that loading the same directory twice returns the same refreshed index.
+
+    Args:
+        prompt_dir: Fixture providing the prompt directory.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    index = load_prompt_index(str(prompt_dir))
+    (prompt_dir / "c.txt").write_text("content c")
+
+    assert load_prompt_index(str(prompt_dir)) is index
+    assert index["c.txt"] == "content c"
+    assert default_manifest_path(str(prompt_dir)).startswith(str(tmp_path / "index"))
+
+
+def test_update_applies_individual_paths(prompt_dir: Path, mocker: MockerFixture) -> None:
+    """Test that update re-checks the given files and directories only.
+
+    Args:
+        prompt_dir: Fixture providing the prompt directory.
+        mocker: Pytest mocker fixture.
+    """
+    index = PromptIndex(str(prompt_dir))
+    index.refresh()
+    scan = mocker.spy(index, "_scan")
+
+    (prompt_dir / "a.txt").write_text("changed content a")
+    (prompt_dir / "new").mkdir()
+    (prompt_dir / "new" / "c.txt").write_text("content c")
+    changes = index.update(["a.txt", "new", "sub"])
+
+    assert changes.modified == ["a.txt"]
+    assert changes.added == [os.path.join("new", "c.txt")]
+    assert [call.args for call in scan.call_args_list] == [("new",), ("sub",)]
+
+    (prompt_dir / "sub" / "b.txt").unlink()
+    (prompt_dir / "sub").rmdir()
+    changes = index.update(["sub"])
+
+    assert changes.removed == [os.path.join("sub", "b.txt")]
+    assert index["a.txt"] == "changed content a"
@@ -17,6 +17,7 @@ import pytest
 
 from prompt_library.common.prompt_library_module import (
     get_rankings,
+    index_prompt_library,
     pull_in_dir_recursively,
     pull_in_prompt_library,
     pull_in_testable_prompts,
@@ -453,6 +454,24 @@ def test_pull_in_prompt_library(mock_env_paths: dict[str, Path]) -> None:
     assert result["prompt2.txt"] == "prompt content 2"
 
 
+def test_index_prompt_library(mock_env_paths: dict[str, Path], monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test indexing prompt library files.
+
+    Args:
+        mock_env_paths: Fixture providing mock environment paths.
+        monkeypatch: Pytest monkeypatch fixture.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    monkeypatch.setenv("PROMPT_INDEX_DIR", str(tmp_path / "prompt_index"))
+    lib_dir = mock_env_paths["PROMPT_LIBRARY_DIR"]
+    lib_dir.mkdir(parents=True, exist_ok=True)
+    (lib_dir / "prompt1.txt").write_text("prompt content 1")
+
+    result = index_prompt_library()
+    assert dict(result) == {"prompt1.txt": "prompt content 1"}
+    assert dict(result) == pull_in_prompt_library()
+
+
 def test_pull_in_testable_prompts(mock_env_paths: dict[str, Path]) -> None:
     """Test loading testable prompt files.
 
@@ -557,6 +576,21 @@ def test_save_rankings(mock_env_paths: dict[str, Path], sample_rankings: list[Mo
         assert actual["score"] == expected.score
 
 
+def test_save_rankings_replaces_file(mock_env_paths: dict[str, Path], sample_rankings: list[ModelRanking]) -> None:
+    """Test that saving rankings replaces the file without leaving temporary files behind.
+
+    Args:
+        mock_env_paths: Fixture providing mock environment paths.
+        sample_rankings: Fixture providing sample rankings.
+    """
+    save_rankings(sample_rankings)
+    save_rankings(sample_rankings[:1])
+
+    rankings_file = mock_env_paths["LANGUAGE_MODEL_RANKINGS_FILE"]
+    assert get_rankings() == sample_rankings[:1]
+    assert os.listdir(rankings_file.parent) == [rankings_file.name]
+
+
 def test_reset_rankings(mock_env_paths: dict[str, Path]) -> None:
     """Test resetting model rankings.
 
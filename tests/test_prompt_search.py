@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import os
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from typer.testing import CliRunner
+
+import pytest
+
+from prompt_library.cli import APP
+from prompt_library.common.prompt_index import PromptIndex
+from prompt_library.common.prompt_search import PromptSearchIndex, parse_metadata, search_prompt_library, to_match_query
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from pytest_mock.plugin import MockerFixture
+
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def prompt_dir(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    """Create a small prompt library with metadata.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest monkeypatch fixture.
+
+    Returns:
+        Path: The prompt library directory.
+    """
+    monkeypatch.setenv("PROMPT_INDEX_DIR", str(tmp_path / "index"))
+    directory = tmp_path / "prompt_lib"
+    monkeypatch.setenv("PROMPT_LIBRARY_DIR", str(directory))
+    lore = directory / "lore" / "johnhelldiver"
+    lore.mkdir(parents=True)
+    (lore / "prompt.xml").write_text("<purpose>Write a backstory for John Helldiver</purpose>")
+    (lore / "metadata.json").write_text(
+        '{"promptName": "JohnHelldiverBackstory", "tags": ["fiction", "games"], "description": "Lore writing"}'
+    )
+    (directory / "summarize.xml").write_text("<purpose>Summarize the given article in three bullets</purpose>")
+    return directory
+
+
+@pytest.fixture
+def indexes(prompt_dir: Path) -> tuple[PromptIndex, PromptSearchIndex]:
+    """Build and sync the prompt and search indexes of the prompt library.
+
+    Args:
+        prompt_dir: Fixture providing the prompt library directory.
+
+    Returns:
+        Tuple of the prompt index and the synced search index.
+    """
+    index = PromptIndex(str(prompt_dir))
+    index.refresh()
+    search_index = PromptSearchIndex(directory=str(prompt_dir))
+    assert search_index.sync(index) == 2
+    return index, search_index
+
+
+def test_parse_metadata() -> None:
+    """Test reading names, tags and descriptions from metadata.json."""
+    assert parse_metadata('{"name": "x", "keywords": "a, b"}') == {"name": "x", "tags": ["a", "b"], "description": None}
+    assert parse_metadata("not json") == {"name": None, "tags": [], "description": None}
+
+
+def test_to_match_query() -> None:
+    """Test that user input is quoted and the last term is a prefix."""
+    assert to_match_query('john "hell') == '"john" """hell"*'
+    assert to_match_query("  ") == ""
+
+
+def test_search_bodies_and_metadata(indexes: tuple[PromptIndex, PromptSearchIndex]) -> None:
+    """Test searching prompt bodies, metadata tags and descriptions.
+
+    Args:
+        indexes: Fixture providing the prompt and search indexes.
+    """
+    _, search_index = indexes
+    lore_prompt = os.path.join("lore", "johnhelldiver", "prompt.xml")
+
+    assert len(search_index) == 2
+    assert [result.path for result in search_index.search("backstory")] == [lore_prompt]
+    assert [result.path for result in search_index.search("games")] == [lore_prompt]
+    assert [result.path for result in search_index.search("summ")] == ["summarize.xml"]
+    assert search_index.search("backstory article") == []
+    assert {result.path for result in search_index.search("backstory OR article", raw=True)} == {
+        lore_prompt,
+        "summarize.xml",
+    }
+
+    (result,) = search_index.search("lore")
+    assert result.name == "JohnHelldiverBackstory"
+    assert result.tags == ["fiction", "games"]
+    assert "[" in result.snippet
+
+
+def test_sync_is_incremental(indexes: tuple[PromptIndex, PromptSearchIndex], prompt_dir: Path) -> None:
+    """Test that only changed files are re-indexed, including when their metadata changes.
+
+    Args:
+        indexes: Fixture providing the prompt and search indexes.
+        prompt_dir: Fixture providing the prompt library directory.
+    """
+    index, search_index = indexes
+    assert search_index.sync(index) == 0
+
+    (prompt_dir / "summarize.xml").unlink()
+    (prompt_dir / "lore" / "johnhelldiver" / "metadata.json").write_text('{"tags": ["military"]}')
+    index.refresh()
+
+    assert search_index.sync(index) == 2
+    assert search_index.search("summarize") == []
+    assert len(search_index.search("military")) == 1
+    assert search_index.search("games") == []
+
+
+def test_search_index_is_persisted(indexes: tuple[PromptIndex, PromptSearchIndex], mocker: MockerFixture) -> None:
+    """Test that a new search index reuses the database written by a previous one.
+
+    Args:
+        indexes: Fixture providing the prompt and search indexes.
+        mocker: Pytest mocker fixture.
+    """
+    index, search_index = indexes
+    search_index.close()
+
+    reopened = PromptSearchIndex(search_index.path)
+    delete = mocker.spy(reopened, "_delete")
+
+    assert reopened.sync(index) == 0
+    delete.assert_not_called()
+    assert len(reopened.search("backstory")) == 1
+
+
+def test_search_prompt_library(prompt_dir: Path) -> None:
+    """Test the module level search API.
+
+    Args:
+        prompt_dir: Fixture providing the prompt library directory.
+    """
+    results = search_prompt_library("three bullets")
+
+    assert [result.path for result in results] == ["summarize.xml"]
+
+
+def test_search_cli(prompt_dir: Path) -> None:
+    """Test the search subcommand.
+
+    Args:
+        prompt_dir: Fixture providing the prompt library directory.
+    """
+    result = runner.invoke(APP, ["search", "rebuild"])
+    assert result.exit_code == 0
+    assert "Indexed 2 prompts" in result.stdout
+
+    result = runner.invoke(APP, ["search", "query", "article"])
+    assert result.exit_code == 0
+    assert "summarize.xml" in result.stdout
+
+    result = runner.invoke(APP, ["search", "query", "nothing-matches-this"])
+    assert "No matching prompts" in result.stdout
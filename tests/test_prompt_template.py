@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from prompt_library.common.prompt_template import (
+    CompiledPrompt,
+    ContextSlot,
+    OutputSlot,
+    compile_prompt,
+    compile_prompts,
+)
+
+
+if TYPE_CHECKING:
+    from _pytest.capture import CaptureFixture
+    from _pytest.fixtures import FixtureRequest
+
+    from pytest_mock.plugin import MockerFixture
+
+
+def test_compile_prompt_segments() -> None:
+    """Test that a prompt is split into literals and typed slots."""
+    compiled = compile_prompt("Hi {{name}}, see {{output[-2]}} and {{output[-1].key}}!")
+
+    assert [type(segment) for segment in compiled.segments] == [
+        str,
+        ContextSlot,
+        str,
+        OutputSlot,
+        str,
+        OutputSlot,
+        str,
+    ]
+    assert compiled.segments[1].name == "name"
+    assert compiled.segments[3].offset == 2
+    assert compiled.segments[3].key is None
+    assert compiled.segments[5].offset == 1
+    assert compiled.segments[5].key == "key"
+    assert compiled.output_offsets == frozenset({1, 2})
+
+
+def test_compile_prompt_is_cached() -> None:
+    """Test that compiling the same prompt twice reuses the compiled form."""
+    assert compile_prompt("cached {{name}}") is compile_prompt("cached {{name}}")
+    assert [p.source for p in compile_prompts(["a", "b"])] == ["a", "b"]
+
+
+def test_render_context_and_outputs() -> None:
+    """Test rendering context variables and previous outputs."""
+    compiled = CompiledPrompt("{{name}}: {{output[-2]}} / {{output[-1]}} / {{output[-2].key}}")
+    outputs: list[Any] = [{"key": "value"}, "plain"]
+
+    result = compiled.render({"name": "test"}, outputs)
+
+    assert result == f"test: {json.dumps({'key': 'value'})} / plain / value"
+
+
+@pytest.mark.parametrize(
+    "prompt,outputs",
+    [
+        ("{{missing}}", []),
+        ("{{output[-1]}}", []),
+        ("{{output[-2]}}", ["only one"]),
+        ("{{output[-1].key}}", ["not a dict"]),
+        ("{{output[-1].missing}}", [{"key": "value"}]),
+    ],
+)
+def test_render_leaves_unresolved_slots(prompt: str, outputs: list[Any]) -> None:
+    """Test that unresolvable slots are left untouched.
+
+    Args:
+        prompt: Prompt template containing a single slot.
+        outputs: Previous outputs available to the template.
+    """
+    assert CompiledPrompt(prompt).render({}, outputs) == prompt
+
+
+def test_render_does_not_rescan_substituted_values() -> None:
+    """Test that values inserted into the prompt are not treated as templates."""
+    compiled = CompiledPrompt("{{a}} {{b}}")
+
+    assert compiled.render({"a": "{{b}}", "b": "x"}) == "{{b}} x"
+
+
+def test_render_matches_innermost_braces() -> None:
+    """Test that extra braces around a slot are kept as literals."""
+    assert CompiledPrompt("{{{name}}}").render({"name": "x"}) == "{x}"
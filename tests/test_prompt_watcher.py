@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library.common.prompt_index import PromptIndex
+from prompt_library.common.prompt_watcher import PromptWatcher, watch_prompt_index
+from prompt_library.common.typings import PromptIndexChanges
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+@pytest.fixture
+def prompt_index(tmp_path: Path, monkeypatch: MonkeyPatch) -> PromptIndex:
+    """Create an index of a prompt directory holding a single file.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest monkeypatch fixture.
+
+    Returns:
+        PromptIndex: The index of the prompt directory.
+    """
+    monkeypatch.setenv("PROMPT_INDEX_DIR", str(tmp_path / "index"))
+    directory = tmp_path / "prompts"
+    directory.mkdir()
+    (directory / "a.txt").write_text("content a")
+    return PromptIndex(str(directory))
+
+
+def wait_for_changes(watcher: PromptWatcher, action: Callable[[], object]) -> list[PromptIndexChanges]:
+    """Run an action on the watched directory and wait until the watcher reports a change.
+
+    Args:
+        watcher: The running watcher.
+        action: Function editing the watched directory.
+
+    Returns:
+        list[PromptIndexChanges]: Changes published by the watcher.
+    """
+    published: list[PromptIndexChanges] = []
+    event = threading.Event()
+
+    def on_changes(changes: PromptIndexChanges) -> None:
+        published.append(changes)
+        event.set()
+
+    unsubscribe = watcher.subscribe(on_changes)
+    action()
+    assert event.wait(5), "watcher did not report the change"
+    unsubscribe()
+    return published
+
+
+@pytest.mark.parametrize(
+    "use_inotify",
+    [
+        pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requires inotify")),
+        False,
+    ],
+)
+def test_watcher_applies_changes(prompt_index: PromptIndex, use_inotify: bool) -> None:
+    """Test that edits are applied to the index and published to subscribers.
+
+    Args:
+        prompt_index: Fixture providing the watched index.
+        use_inotify: Whether the inotify or the polling backend is used.
+    """
+    directory = Path(prompt_index.directory)
+    with PromptWatcher(prompt_index, poll_interval=0.05, debounce=0.05, use_inotify=use_inotify) as watcher:
+        assert watcher.backend == ("inotify" if use_inotify else "polling")
+
+        published = wait_for_changes(watcher, lambda: (directory / "b.txt").write_text("content b"))
+        assert published[0].added == ["b.txt"]
+        assert prompt_index["b.txt"] == "content b"
+
+        published = wait_for_changes(watcher, lambda: (directory / "a.txt").unlink())
+        assert published[0].removed == ["a.txt"]
+        assert "a.txt" not in prompt_index
+
+        (directory / "nested").mkdir()
+        (directory / "nested" / "c.txt").write_text("content c")
+        deadline = time.monotonic() + 5
+        while os.path.join("nested", "c.txt") not in prompt_index and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert prompt_index[os.path.join("nested", "c.txt")] == "content c"
+
+
+def test_subscriber_errors_are_contained(prompt_index: PromptIndex) -> None:
+    """Test that a failing subscriber does not stop other subscribers.
+
+    Args:
+        prompt_index: Fixture providing the watched index.
+    """
+    watcher = PromptWatcher(prompt_index)
+    received: list[PromptIndexChanges] = []
+    watcher.subscribe(lambda changes: 1 / 0)
+    watcher.subscribe(received.append)
+
+    watcher._publish(PromptIndexChanges(added=["x.txt"]))
+    watcher._publish(PromptIndexChanges())
+
+    assert len(received) == 1
+
+
+def test_watch_prompt_index_starts_once(prompt_index: PromptIndex) -> None:
+    """Test that watching the same index twice reuses the running watcher.
+
+    Args:
+        prompt_index: Fixture providing the watched index.
+    """
+    watcher = watch_prompt_index(prompt_index, use_inotify=False)
+    try:
+        assert watch_prompt_index(prompt_index) is watcher
+    finally:
+        watcher.stop()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library.common import rankings_store
+from prompt_library.common.rankings_store import RankingsStore
+from prompt_library.common.ratings import ballots_from_votes
+from prompt_library.common.typings import ModelRanking
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+
+def cast_votes(path: str, model_id: str, count: int) -> None:
+    """Vote from a separate process.
+
+    Args:
+        path: Path of the database file.
+        model_id: The model to vote for.
+        count: Number of ballots.
+    """
+    store = RankingsStore(path)
+    for _ in range(count):
+        store.record_vote([model_id])
+    store.close()
+
+
+def scores(rankings: list[ModelRanking]) -> dict[str, int]:
+    """Map model ids to scores.
+
+    Args:
+        rankings: The rankings.
+
+    Returns:
+        dict[str, int]: The score of each model.
+    """
+    return {ranking.llm_model_id: ranking.score for ranking in rankings}
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> RankingsStore:
+    """Create an empty rankings store.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+
+    Returns:
+        RankingsStore: The store.
+    """
+    return RankingsStore(str(tmp_path / "rankings.sqlite3"))
+
+
+def test_record_vote(store: RankingsStore) -> None:
+    """Test that votes increment scores and add unknown models.
+
+    Args:
+        store: Fixture providing the rankings store.
+    """
+    store.reset(["model1", "model2"])
+
+    store.record_vote(["model1"])
+    rankings = store.record_vote(["model1", "model3"])
+
+    assert [ranking.llm_model_id for ranking in rankings] == ["model1", "model2", "model3"]
+    assert scores(rankings) == {"model1": 2, "model2": 0, "model3": 1}
+    assert scores(store.rankings()) == scores(rankings)
+
+
+def test_ballot_counts_once(store: RankingsStore) -> None:
+    """Test that submitting the same ballot again does not count twice.
+
+    Args:
+        store: Fixture providing the rankings store.
+    """
+    store.record_vote(["model1"], ballot_id="run-1")
+    store.record_vote(["model1", "model2"], ballot_id="run-1")
+
+    assert scores(store.rankings()) == {"model1": 1, "model2": 1}
+    assert len(store.votes()) == 2
+
+
+def test_submissions_on_same_run_all_count(store: RankingsStore) -> None:
+    """Test that voting twice on the same run records two ballots.
+
+    Args:
+        store: Fixture providing the rankings store.
+    """
+    store.reset(["model1", "model2"])
+
+    first = rankings_store.new_ballot_id("execution-1")
+    second = rankings_store.new_ballot_id("execution-1")
+    store.record_vote(["model1"], ballot_id=first, shown=["model1", "model2"])
+    store.record_vote(["model2"], ballot_id=second, shown=["model1", "model2"])
+
+    assert first != second
+    assert first.startswith("execution-1:")
+    assert scores(store.rankings()) == {"model1": 1, "model2": 1}
+    assert ballots_from_votes(store.votes()) == [(["model1"], ["model1", "model2"]), (["model2"], ["model1", "model2"])]
+
+
+def test_reset_keeps_history(store: RankingsStore) -> None:
+    """Test that a reset starts a new round while the vote log is kept.
+
+    Args:
+        store: Fixture providing the rankings store.
+    """
+    store.record_vote(["model1"])
+    store.record_vote(["model2"])
+
+    assert scores(store.reset(["model2", "model3"])) == {"model2": 0, "model3": 0}
+    store.record_vote(["model3"])
+
+    assert scores(store.rankings()) == {"model2": 0, "model3": 1}
+    assert [vote.model_id for vote in store.votes()] == ["model1", "model2", "model3"]
+    assert [vote.model_id for vote in store.votes(model_id="model1")] == ["model1"]
+
+
+def test_rebuild_derives_scores_from_votes(store: RankingsStore) -> None:
+    """Test that scores recomputed from the vote log match the incremental ones.
+
+    Args:
+        store: Fixture providing the rankings store.
+    """
+    store.record_vote(["model1"])
+    store.reset(["model1", "model2"])
+    for model_ids in (["model1"], ["model2", "model1"], ["model3"]):
+        store.record_vote(model_ids)
+    expected = store.rankings()
+
+    assert store.rebuild() == expected
+    assert scores(expected) == {"model1": 2, "model2": 1, "model3": 1}
+
+
+def test_import_rankings(store: RankingsStore) -> None:
+    """Test seeding a store with existing scores, once when asked to import into an empty store.
+
+    Args:
+        store: Fixture providing the rankings store.
+    """
+    rankings = [ModelRanking(llm_model_id="model1", score=3), ModelRanking(llm_model_id="model2", score=0)]
+
+    assert store.import_rankings(rankings, if_empty=True) == rankings
+    assert store.import_rankings(rankings, if_empty=True) == rankings
+    assert len(store.votes()) == 1
+    assert store.rebuild() == rankings
+
+
+def test_concurrent_processes_do_not_lose_votes(tmp_path: Path) -> None:
+    """Test that votes from several processes are all counted.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    path = str(tmp_path / "rankings.sqlite3")
+    RankingsStore(path).reset(["model1", "model2"])
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=cast_votes, args=(path, f"model{i % 2 + 1}", 25)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert scores(RankingsStore(path).rankings()) == {"model1": 50, "model2": 50}
+
+
+def test_get_rankings_store_imports_json(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that the default store imports the rankings JSON file when created empty.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+        monkeypatch: Pytest monkeypatch fixture.
+    """
+    rankings_file = tmp_path / "rankings.json"
+    rankings_file.write_text(json.dumps([{"llm_model_id": "model1", "score": 4}]))
+    monkeypatch.setenv("LANGUAGE_MODEL_RANKINGS_FILE", str(rankings_file))
+    monkeypatch.setenv("LANGUAGE_MODEL_RANKINGS_DB", str(tmp_path / "rankings.sqlite3"))
+    monkeypatch.setattr(rankings_store, "_default_store", None)
+
+    store = rankings_store.get_rankings_store()
+
+    assert store is rankings_store.get_rankings_store()
+    assert scores(store.rankings()) == {"model1": 4}
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+import pytest
+
+from prompt_library.common.rankings_store import RankingsStore
+from prompt_library.common.ratings import (
+    BradleyTerryModel,
+    EloModel,
+    ballot_comparisons,
+    ballots_from_votes,
+    fit_ratings,
+)
+
+
+def simulate(strengths: dict[str, float], comparisons: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    """Draw pairwise outcomes from a Bradley–Terry model.
+
+    Args:
+        strengths: Log-strength of each model.
+        comparisons: Number of comparisons.
+        seed: Random seed.
+
+    Returns:
+        tuple[list[str], list[str]]: Winners and losers.
+    """
+    rng = np.random.default_rng(seed)
+    model_ids = list(strengths)
+    log_strengths = np.array([strengths[model_id] for model_id in model_ids])
+    first = rng.integers(len(model_ids), size=comparisons)
+    second = (first + rng.integers(1, len(model_ids), size=comparisons)) % len(model_ids)
+    first_wins = rng.random(comparisons) < 1 / (1 + np.exp(log_strengths[second] - log_strengths[first]))
+    winners = np.where(first_wins, first, second)
+    losers = np.where(first_wins, second, first)
+    return [model_ids[i] for i in winners], [model_ids[i] for i in losers]
+
+
+def test_ballot_comparisons() -> None:
+    """Test expanding top-k ballots into pairwise comparisons."""
+    assert ballot_comparisons(["a", "b"], ["a", "b", "c", "d"]) == [("a", "c"), ("a", "d"), ("b", "c"), ("b", "d")]
+    assert ballot_comparisons(["a"], ["a"]) == []
+    assert ballot_comparisons([], ["a", "b"]) == []
+
+
+def test_ballots_from_store_votes(tmp_path: Path) -> None:
+    """Test grouping the vote log of a rankings store into ballots.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    store = RankingsStore(str(tmp_path / "rankings.sqlite3"))
+    store.record_vote(["a"], shown=["a", "b", "c"])
+    store.record_vote(["c"], shown=["b", "c"])
+
+    ballots = ballots_from_votes(store.votes())
+
+    assert [(sorted(winners), sorted(shown)) for winners, shown in ballots] == [
+        (["a"], ["a", "b", "c"]),
+        (["c"], ["b", "c"]),
+    ]
+    assert {rating.model_id: rating.comparisons for rating in fit_ratings(store.votes())} == {"a": 2, "b": 2, "c": 2}
+
+
+def test_bradley_terry_recovers_strengths() -> None:
+    """Test that fitted ratings match the simulated strengths within their confidence intervals."""
+    strengths = {"strong": 1.0, "average": 0.0, "weak": -1.0}
+    model = BradleyTerryModel()
+    model.add_many(*simulate(strengths, 20_000))
+
+    ratings = {rating.model_id: rating for rating in model.fit()}
+
+    points = 400 / np.log(10)
+    for model_id, strength in strengths.items():
+        rating = ratings[model_id]
+        assert rating.lower < 1000 + points * strength < rating.upper
+        assert rating.upper - rating.lower < 50
+    assert list(ratings) == ["strong", "average", "weak"]
+
+
+def test_bradley_terry_uncertainty_shrinks_with_votes() -> None:
+    """Test that confidence intervals narrow as comparisons accumulate."""
+    winners, losers = simulate({"a": 0.5, "b": 0.0}, 2_000)
+    model = BradleyTerryModel()
+    model.add_many(winners[:100], losers[:100])
+    (few, _) = model.fit()
+
+    model.add_many(winners[100:], losers[100:])
+    (many, _) = model.fit()
+
+    assert many.upper - many.lower < (few.upper - few.lower) / 3
+
+
+def test_bradley_terry_incremental_matches_batch() -> None:
+    """Test that adding votes one by one gives the same fit as adding them at once."""
+    winners, losers = simulate({"a": 0.3, "b": 0.0, "c": -0.2, "d": 0.1}, 500)
+    batch = BradleyTerryModel()
+    batch.add_many(winners, losers)
+
+    incremental = BradleyTerryModel()
+    for winner, loser in zip(winners, losers, strict=True):
+        incremental.add(winner, loser)
+        if len(incremental.model_ids) == 4:
+            incremental.fit(max_iterations=5)
+
+    for expected, actual in zip(batch.fit(), incremental.fit(), strict=True):
+        assert actual.model_id == expected.model_id
+        assert actual.rating == pytest.approx(expected.rating)
+        assert actual.lower == pytest.approx(expected.lower)
+
+
+def test_bradley_terry_handles_unbeaten_models() -> None:
+    """Test that a model that never lost still gets a finite rating."""
+    model = BradleyTerryModel(["a", "b", "c"])
+    for _ in range(10):
+        model.add("a", "b")
+
+    ratings = {rating.model_id: rating for rating in model.fit()}
+
+    assert np.isfinite(ratings["a"].rating)
+    assert ratings["a"].rating > ratings["c"].rating > ratings["b"].rating
+    assert ratings["c"].comparisons == 0
+
+
+def test_bradley_terry_fit_is_fast() -> None:
+    """Test that refitting hundreds of thousands of votes is well under a second."""
+    model = BradleyTerryModel()
+    model.add_many(*simulate({f"model{i}": i / 10 for i in range(20)}, 300_000))
+
+    start = time.perf_counter()
+    ratings = model.fit()
+
+    assert time.perf_counter() - start < 1.0
+    assert ratings[0].model_id == "model19"
+    assert sum(rating.wins for rating in ratings) == 300_000
+
+
+def test_elo_updates_online() -> None:
+    """Test Elo updates per comparison."""
+    model = EloModel(k=32)
+    model.add("a", "b")
+
+    a, b = model.fit()
+    assert (a.model_id, a.rating, b.rating) == ("a", 1016.0, 984.0)
+    assert a.lower is None
+
+    model.add_ballot(["b"], ["a", "b", "c"])
+    ratings = {rating.model_id: rating.rating for rating in model.fit()}
+    assert ratings["b"] > 984.0
+    assert ratings["c"] < 1000.0
+
+
+def test_fit_ratings_rejects_unknown_method() -> None:
+    """Test that unknown rating methods are rejected."""
+    with pytest.raises(ValueError, match="Unknown rating method"):
+        fit_ratings([], method="glicko")
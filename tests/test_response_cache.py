@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import time
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library.common.response_cache import ResponseCache, SQLiteResponseCache, make_cache_key, normalize_options
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from pytest_mock.plugin import MockerFixture
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> SQLiteResponseCache:
+    """Create a response cache in a temporary directory.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+
+    Returns:
+        SQLiteResponseCache: An empty cache.
+    """
+    return SQLiteResponseCache(str(tmp_path / "cache" / "responses.sqlite3"))
+
+
+def test_make_cache_key_normalizes_options() -> None:
+    """Test that equivalent options produce the same key and different inputs do not."""
+    assert normalize_options({"temperature": 1, "top_p": None}) == {"temperature": 1.0}
+    assert make_cache_key("gpt-4o", "hi", {"temperature": 1}) == make_cache_key("gpt-4o", "hi", {"temperature": 1.0})
+    assert make_cache_key("gpt-4o", "hi") == make_cache_key("gpt-4o", "hi", {"temperature": None})
+    assert make_cache_key("gpt-4o", "hi") != make_cache_key("gpt-4o-mini", "hi")
+    assert make_cache_key("gpt-4o", "hi") != make_cache_key("gpt-4o", "hi", {"temperature": 0.5})
+
+
+def test_get_or_fetch_caches_response(cache: SQLiteResponseCache) -> None:
+    """Test that a second identical call is served from the cache.
+
+    Args:
+        cache: Empty response cache.
+    """
+    calls: list[str] = []
+
+    def fetch() -> str:
+        calls.append("called")
+        return "response"
+
+    assert cache.get_or_fetch("model", "prompt", {"temperature": 0.5}, fetch) == "response"
+    assert cache.get_or_fetch("model", "prompt", {"temperature": 0.5}, fetch) == "response"
+    assert len(calls) == 1
+    assert len(cache) == 1
+
+
+def test_cache_persists_on_disk(tmp_path: Path) -> None:
+    """Test that cached responses survive reopening the database.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    path = str(tmp_path / "responses.sqlite3")
+    first = SQLiteResponseCache(path)
+    first.set("key", "value")
+    first.close()
+
+    assert SQLiteResponseCache(path).get("key") == "value"
+
+
+def test_cache_ttl(cache: SQLiteResponseCache) -> None:
+    """Test that expired entries are treated as missing.
+
+    Args:
+        cache: Empty response cache.
+    """
+    cache.ttl = 0.01
+    cache.set("key", "value")
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction(tmp_path: Path) -> None:
+    """Test that the least recently used entry is evicted first.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    assert cache.get("a") == "1"
+    time.sleep(0.01)
+    cache.set("c", "3")
+
+    assert len(cache) == 2
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_cache_nonzero_temperature_opt_out(tmp_path: Path) -> None:
+    """Test that sampled responses bypass the cache when opted out.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite3"), cache_nonzero_temperature=False)
+    responses = iter(["first", "second", "third"])
+
+    assert cache.get_or_fetch("model", "prompt", {"temperature": 0.7}, lambda: next(responses)) == "first"
+    assert cache.get_or_fetch("model", "prompt", {"temperature": 0.7}, lambda: next(responses)) == "second"
+    assert cache.get_or_fetch("model", "prompt", {"temperature": 0}, lambda: next(responses)) == "third"
+    assert cache.get_or_fetch("model", "prompt", {"temperature": 0}, lambda: next(responses)) == "third"
+
+
+def test_cache_nonzero_temperature_opt_out_default_temperature(tmp_path: Path) -> None:
+    """Test that calls at the provider default temperature bypass the cache when opted out.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    cache = SQLiteResponseCache(str(tmp_path / "responses.sqlite3"), cache_nonzero_temperature=False)
+    responses = iter(["first", "second", "third", "fourth"])
+
+    assert cache.get_or_fetch("model", "prompt", None, lambda: next(responses)) == "first"
+    assert cache.get_or_fetch("model", "prompt", None, lambda: next(responses)) == "second"
+    assert cache.get_or_fetch("model", "prompt", {"temperature": None}, lambda: next(responses)) == "third"
+    assert cache.get_or_fetch("model", "prompt", {"temperature": None}, lambda: next(responses)) == "fourth"
+
+
+def test_response_cache_is_abstract() -> None:
+    """Test that the storage methods must be implemented by subclasses."""
+    with pytest.raises(TypeError):
+        ResponseCache()  # type: ignore[abstract]
+
+
+def test_cache_default_path_from_env(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test that the cache location is read from RESPONSE_CACHE_FILE.
+
+    Args:
+        monkeypatch: Pytest monkeypatch fixture.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    path = tmp_path / "env" / "cache.sqlite3"
+    monkeypatch.setenv("RESPONSE_CACHE_FILE", str(path))
+
+    cache = SQLiteResponseCache()
+
+    assert cache.path == str(path)
+    assert path.exists()
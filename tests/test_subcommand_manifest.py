@@ -0,0 +1,189 @@
+"""Test the cached subcommand manifest."""
+
+from __future__ import annotations
+
+import json
+import os
+
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from prompt_library import subcommand_manifest
+from prompt_library.subcommand_manifest import SubcommandEntry, discover_subcommands, scan_subcommands
+
+
+if TYPE_CHECKING:
+    from _pytest.monkeypatch import MonkeyPatch
+
+    from pytest_mock.plugin import MockerFixture
+
+
+SUBCOMMANDS_DIR = Path(subcommand_manifest.__file__).parent / "subcommands"
+
+
+@pytest.fixture
+def commands_dir(tmp_path: Path) -> Path:
+    """Create a directory with two subcommand modules.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+
+    Returns:
+        Path: The directory of the subcommand modules.
+    """
+    directory = tmp_path / "commands"
+    directory.mkdir()
+    (directory / "alpha_cmd.py").write_text(
+        '"""Alpha docstring"""\n\nAPP = AsyncTyperImproved(help="Alpha command")\n', encoding="utf-8"
+    )
+    (directory / "beta_cmd.py").write_text('"""Beta command\n\nMore details.\n"""\n', encoding="utf-8")
+    (directory / "helpers.py").write_text("", encoding="utf-8")
+    return directory
+
+
+def test_scan_subcommands_reads_help_without_importing(commands_dir: Path) -> None:
+    """Test that help texts come from the APP help argument or the module docstring.
+
+    Args:
+        commands_dir: Directory with subcommand modules that cannot be imported.
+    """
+    assert scan_subcommands(commands_dir, "plugins.commands") == [
+        SubcommandEntry(name="alpha", module="plugins.commands.alpha_cmd", help="Alpha command"),
+        SubcommandEntry(name="beta", module="plugins.commands.beta_cmd", help="Beta command"),
+    ]
+
+
+def test_builtin_subcommands_match_modules(tmp_path: Path) -> None:
+    """Test that every builtin subcommand module is discovered and loads its Typer app.
+
+    Args:
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    subcommands = discover_subcommands(plugins=False, manifest_file=str(tmp_path / "manifest.json"))
+
+    assert set(subcommands) == {path.name[: -len("_cmd.py")] for path in SUBCOMMANDS_DIR.glob("*_cmd.py")}
+    assert subcommands["search"].help == "Search the prompt library"
+    assert subcommands["dummy"].load().info.help == "dummy command"
+
+
+def test_manifest_is_cached_until_directory_changes(commands_dir: Path, tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that the directory is only scanned again when its mtime changes.
+
+    Args:
+        commands_dir: Directory with subcommand modules.
+        tmp_path: Pytest fixture providing temporary directory path.
+        mocker: Pytest fixture for mocking.
+    """
+    manifest_file = str(tmp_path / "cache" / "manifest.json")
+    scan = mocker.spy(subcommand_manifest, "scan_subcommands")
+
+    first = discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=manifest_file)
+    second = discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=manifest_file)
+
+    assert first == second
+    assert scan.call_count == 1
+
+    (commands_dir / "gamma_cmd.py").write_text('"""Gamma command"""\n', encoding="utf-8")
+    os.utime(commands_dir, ns=(0, os.stat(commands_dir).st_mtime_ns + 1_000_000_000))
+    third = discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=manifest_file)
+
+    assert scan.call_count == 2
+    assert list(third) == ["alpha", "beta", "gamma"]
+
+    discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=manifest_file, refresh=True)
+    assert scan.call_count == 3
+
+
+def test_manifest_is_refreshed_when_a_module_is_edited(commands_dir: Path, tmp_path: Path) -> None:
+    """Test that editing a subcommand module in place, which keeps the directory mtime, refreshes its help.
+
+    Args:
+        commands_dir: Directory with subcommand modules.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    manifest_file = str(tmp_path / "manifest.json")
+    assert discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=manifest_file)["beta"].help == (
+        "Beta command"
+    )
+
+    directory_mtime = os.stat(commands_dir).st_mtime_ns
+    module = commands_dir / "beta_cmd.py"
+    module.write_text('"""Edited beta command"""\n', encoding="utf-8")
+    os.utime(module, ns=(0, os.stat(module).st_mtime_ns + 1_000_000_000))
+    os.utime(commands_dir, ns=(0, directory_mtime))
+
+    subcommands = discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=manifest_file)
+
+    assert subcommands["beta"].help == "Edited beta command"
+
+
+def test_corrupt_manifest_is_rebuilt(commands_dir: Path, tmp_path: Path) -> None:
+    """Test that an unreadable manifest is ignored and replaced.
+
+    Args:
+        commands_dir: Directory with subcommand modules.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text("{not json", encoding="utf-8")
+
+    subcommands = discover_subcommands(commands_dir, "commands", plugins=False, manifest_file=str(manifest_file))
+
+    assert list(subcommands) == ["alpha", "beta"]
+    assert json.loads(manifest_file.read_text(encoding="utf-8"))["version"] == subcommand_manifest.MANIFEST_VERSION
+
+
+def test_entry_point_plugins(
+    commands_dir: Path, tmp_path: Path, mocker: MockerFixture, monkeypatch: MonkeyPatch
+) -> None:
+    """Test that entry point plugins are discovered and cannot shadow builtin subcommands.
+
+    Args:
+        commands_dir: Directory with subcommand modules.
+        tmp_path: Pytest fixture providing temporary directory path.
+        mocker: Pytest fixture for mocking.
+        monkeypatch: Pytest fixture for patching.
+    """
+    entry_points = [
+        EntryPoint(name="gamma", value="gamma_plugin.cli:APP", group=subcommand_manifest.ENTRY_POINT_GROUP),
+        EntryPoint(name="alpha", value="shadow_plugin.cli:APP", group=subcommand_manifest.ENTRY_POINT_GROUP),
+    ]
+    discovered = mocker.patch("importlib.metadata.entry_points", return_value=entry_points)
+    site_packages = tmp_path / "site-packages"
+    site_packages.mkdir()
+    monkeypatch.setattr(subcommand_manifest.sys, "path", [str(site_packages)])
+    manifest_file = str(tmp_path / "manifest.json")
+
+    subcommands = discover_subcommands(commands_dir, "commands", manifest_file=manifest_file)
+    discover_subcommands(commands_dir, "commands", manifest_file=manifest_file)
+
+    assert subcommands["gamma"] == SubcommandEntry(
+        name="gamma", module="gamma_plugin.cli", attribute="APP", source="unknown"
+    )
+    assert subcommands["alpha"].module == "commands.alpha_cmd"
+    discovered.assert_called_once_with(group=subcommand_manifest.ENTRY_POINT_GROUP)
+
+    # Installing a distribution updates its sys.path entry
+    os.utime(site_packages, ns=(0, os.stat(site_packages).st_mtime_ns + 1_000_000_000))
+    discover_subcommands(commands_dir, "commands", manifest_file=manifest_file)
+    assert discovered.call_count == 2
+
+
+def test_unwritable_manifest_still_discovers(commands_dir: Path, tmp_path: Path) -> None:
+    """Test that discovery works when the manifest cannot be written.
+
+    Args:
+        commands_dir: Directory with subcommand modules.
+        tmp_path: Pytest fixture providing temporary directory path.
+    """
+    blocker = tmp_path / "blocker"
+    blocker.write_text("", encoding="utf-8")
+
+    subcommands = discover_subcommands(
+        commands_dir, "commands", plugins=False, manifest_file=str(blocker / "manifest.json")
+    )
+
+    assert list(subcommands) == ["alpha", "beta"]